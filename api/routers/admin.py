@@ -0,0 +1,68 @@
+from __future__ import annotations
+import hmac
+from pathlib import Path
+from typing import Any, Dict, Optional
+from fastapi import APIRouter, Header, HTTPException, Query
+from api.utils.constants import ADMIN_TOKEN, MODELS_DIR
+from api.services.registry import REGISTRY
+from api.services.cache import UPLOAD_CACHE, PREDICTION_CACHE
+from api.utils import prefork
+import logging
+
+log = logging.getLogger(__name__)
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+def _check_token(token: Optional[str]) -> None:
+    # no token configured means no admin access at all (main.py does not even mount the router)
+    if not ADMIN_TOKEN or not hmac.compare_digest((token or "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(403, "Invalid admin token.")
+
+def _models_dir(models_dir: Optional[str]) -> Path:
+    # artifacts are unpickled, so only directories under MODELS_DIR may be loaded
+    src = Path(models_dir).resolve() if models_dir else MODELS_DIR
+    if src != MODELS_DIR and MODELS_DIR not in src.parents:
+        raise HTTPException(400, f"models_dir must be inside {MODELS_DIR}")
+    if not src.is_dir():
+        raise HTTPException(400, f"Not a directory: {src}")
+    return src
+
+@router.get("/model")
+def model_status() -> Dict[str, Any]:
+    return REGISTRY.status()
+
+@router.post("/reload", summary="Load, validate and atomically swap in model artifacts")
+def reload_model(
+    wait: bool = Query(False, description="Block until the new bundle is active"),
+    models_dir: Optional[str] = Query(None, description="Directory to load from (default MODELS_DIR)"),
+    x_admin_token: Optional[str] = Header(None),
+) -> Dict[str, Any]:
+    _check_token(x_admin_token)
+    src = _models_dir(models_dir)
+
+    if prefork.master_pid() is not None:
+        # one worker must not swap alone; the master reloads and rolls all of them
+        if src != MODELS_DIR or wait:
+            raise HTTPException(400, "With multiple workers only an async reload of MODELS_DIR is supported; "
+                                     "poll /admin/model for the new version.")
+        return {"started": True, "prefork_master": prefork.request_reload(), **REGISTRY.status()}
+
+    if not wait:
+        started = REGISTRY.reload_in_background(src)
+        return {"started": started, **REGISTRY.status()}
+
+    try:
+        REGISTRY.reload(src)
+    except Exception as e:
+        raise HTTPException(422, f"Reload rejected: {e}")
+    return REGISTRY.status()
+
+@router.get("/cache", summary="Parsed-upload and per-row prediction cache statistics")
+def cache_status() -> Dict[str, Any]:
+    return {**UPLOAD_CACHE.stats(), "predictions": PREDICTION_CACHE.stats()}
+
+@router.post("/cache/clear", summary="Drop all in-memory cached uploads, results and row predictions")
+def cache_clear(x_admin_token: Optional[str] = Header(None)) -> Dict[str, Any]:
+    _check_token(x_admin_token)
+    UPLOAD_CACHE.clear()
+    PREDICTION_CACHE.clear()
+    return cache_status()
@@ -1,25 +1,46 @@
 from __future__ import annotations
 
+import asyncio
+import csv
+import io
+import json
 import logging
+import zipfile
+from concurrent.futures import Future
 from pathlib import Path
-from typing import Any, Dict, List
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Type
 
+import numpy as np
 import pandas as pd
 from fastapi import APIRouter, Depends, File, HTTPException, UploadFile, Query
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
 from pydantic import BaseModel, Field
 
-from api.utils.io import read_table, normalize_schema
+from api.utils.io import read_table, read_table_chunks, normalize_schema
 from api.utils.constants import (
-    assert_artifacts_available,
-    log_artifact_paths,
     PARAMS_JSON_PATH,
+    PREDICT_STREAM_CHUNK_ROWS,
+    INFERENCE_BULK_ROWS,
+    CURVE_PREP_WORKERS,
+    CURVE_BATCH_MAX_CURVES,
+    CURVE_BATCH_MAX_MB,
+    CURVE_BLS_WORKERS,
 )
+from api.utils.timing import stage
+from api.services.registry import REGISTRY, ModelBundle
 from api.services.pipeline import (
     predict_tab,
+    tab_output,
+    predict_matrix,
     predict_curve,            # ONNX curve model (optional; returns None if unavailable)
+    predict_curves,
     get_model_and_features,   # for SHAP/fallback
     align_features,           # for SHAP/fallback
 )
+from api.services.batching import BATCHER
+from api.services.cache import UPLOAD_CACHE
+from api.services.executor import EXECUTOR, INTERACTIVE, BULK, Overloaded
 from api.services.shap_utils import explain_samples
 from api.services.conformal import load_tau, top1_with_confidence
 from api.services.vetting import apply_qc
@@ -31,78 +52,237 @@ from api.models.response import PredictResponse
 log = logging.getLogger(__name__)
 router = APIRouter(prefix="/inference", tags=["inference"])
 
-def _artifacts_ok():
-    log_artifact_paths()
-    assert_artifacts_available(["PREPROCESSOR_PATH", "FEATURE_LIST_PATH", "TAB_MODEL_PATH"])
+def _bundle() -> ModelBundle:
+    try:
+        return REGISTRY.get()
+    except Exception as e:
+        log.error("Model bundle unavailable: %s", e)
+        raise HTTPException(503, f"Model artifacts unavailable: {e}")
+
+async def _offload(lane: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run ``fn`` on the inference executor instead of Starlette's shared threadpool."""
+    try:
+        return await EXECUTOR.run(lane, fn, *args, **kwargs)
+    except Overloaded as e:
+        raise HTTPException(503, str(e), headers={"Retry-After": "1"})
+
+def _rows_lane(n_rows: int) -> str:
+    return BULK if n_rows >= INFERENCE_BULK_ROWS else INTERACTIVE
+
+def _encoded(out: Any, model: Optional[Type[BaseModel]] = None) -> Response:
+    """Validate/encode a result on the executor thread; a large body would otherwise be encoded on the event loop."""
+    with stage("serialize"):
+        if model is not None:
+            return Response(model.model_validate(out).model_dump_json(), media_type="application/json")
+        return JSONResponse(jsonable_encoder(out))
 
 @router.get("/health", summary="Healthcheck")
 def health() -> Dict[str, Any]:
-    return {"status": "ok"}
+    return {"status": "ok", "model_ready": REGISTRY.ready}
+
+@router.get("/ready", summary="Readiness: model bundle loaded")
+def ready() -> Dict[str, Any]:
+    status = REGISTRY.status()
+    if not status["ready"]:
+        raise HTTPException(503, status)
+    return status
 
 @router.post(
     "/predict",
     response_model=PredictResponse,
     summary="Predict from JSON rows (tabular model)",
 )
-def predict(req: PredictRequest, _=Depends(_artifacts_ok)):
+async def predict(req: PredictRequest, bundle: ModelBundle = Depends(_bundle)):
     if not req.rows:
         raise HTTPException(400, "Empty payload: 'rows' must contain at least one row.")
+    lane = _rows_lane(len(req.rows))
+    if not BATCHER.enabled:
+        return await _offload(lane, _predict_rows, req, bundle)
 
-    df = pd.DataFrame(req.rows)
-    df = normalize_schema(df, req.mission)
+    # await the batch on the event loop: a waiting call holds no executor thread, so a batch can
+    # coalesce more concurrent requests than there are inference workers
+    future = await _offload(lane, _submit_rows, req, bundle)
+    try:
+        with stage("batch_wait", rows=len(req.rows)):
+            proba = await asyncio.wrap_future(future)
+    except Exception as e:
+        log.exception("Inference failed: %s", e)
+        raise HTTPException(500, f"Inference failed: {e}")
+    return await _offload(lane, _rows_response, proba, req, bundle, admit=False)
+
+def _normalized_rows(req: PredictRequest) -> pd.DataFrame:
+    with stage("read", rows=len(req.rows)):
+        df = pd.DataFrame(req.rows)
+    with stage("normalize", rows=len(df)):
+        return normalize_schema(df, req.mission)
 
+def _predict_rows(req: PredictRequest, bundle: ModelBundle) -> Response:
+    df = _normalized_rows(req)
     try:
-        out = predict_tab(df, return_labels=req.return_labels)
+        out = predict_tab(df, return_labels=req.return_labels, bundle=bundle)
     except Exception as e:
         log.exception("Inference failed: %s", e)
         raise HTTPException(500, f"Inference failed: {e}")
 
-    return out
+    return _encoded(out, PredictResponse)
+
+def _submit_rows(req: PredictRequest, bundle: ModelBundle) -> Future:
+    df = _normalized_rows(req)
+    if df.empty:
+        future: Future = Future()
+        future.set_result(np.zeros((0, len(bundle.classes or ()))))
+        return future
+    try:
+        return BATCHER.submit(df, bundle)
+    except Exception as e:
+        log.exception("Inference failed: %s", e)
+        raise HTTPException(500, f"Inference failed: {e}")
+
+def _rows_response(proba: np.ndarray, req: PredictRequest, bundle: ModelBundle) -> Response:
+    return _encoded(tab_output(np.asarray(proba), bundle, return_labels=req.return_labels), PredictResponse)
 
 @router.post(
     "/predict-file",
     response_model=PredictResponse,
     summary="Predict from uploaded file (CSV/TSV/FITS; tabular model)",
 )
-def predict_file(
+async def predict_file(
     file: UploadFile = File(...),
     mission: str = Query(None, description="kepler | k2 | tess — if raw columns file, specify mission"),
-    _=Depends(_artifacts_ok),
+    stream: bool = Query(False, description="Stream per-row results instead of one JSON body"),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Streamed output format"),
+    chunk_rows: int = Query(PREDICT_STREAM_CHUNK_ROWS, ge=1, le=200_000, description="Rows per streamed chunk"),
+    bundle: ModelBundle = Depends(_bundle),
 ):
     if not file or not file.filename:
         raise HTTPException(400, "No file uploaded.")
 
+    suffix = Path(file.filename).suffix.lower()
+    if stream:
+        chunks = read_table_chunks(file.file, suffix=suffix, chunk_rows=chunk_rows)
+        body = _stream_predictions(chunks, mission, bundle, format)
+        try:
+            # parse/score the first chunk now so bad input still gets a proper status code
+            first = await _offload(BULK, next, body, None)
+        except HTTPException:
+            raise
+        except Exception as e:
+            log.exception("File inference failed: %s", e)
+            raise HTTPException(500, f"File inference failed: {e}")
+
+        async def lines():
+            # later chunks were admitted with the first one; they only queue behind other work
+            chunk = first
+            while chunk is not None:
+                yield chunk
+                chunk = await EXECUTOR.run(BULK, next, body, None, admit=False)
+
+        media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+        return StreamingResponse(lines(), media_type=media_type)
+
+    data = await file.read()
+    return await _offload(BULK, _predict_upload, data, suffix, mission, bundle)
+
+def _predict_upload(data: bytes, suffix: str, mission: str | None, bundle: ModelBundle) -> Response:
     try:
-        df = read_table(file.file.read(), suffix=Path(file.filename).suffix.lower())
-        df = normalize_schema(df, mission)
-        return predict_tab(df)
+        key = _upload_key(data, suffix, mission)
+        out = UPLOAD_CACHE.result(key, bundle.version)
+        if out is None:
+            out = predict_tab(_upload_frame(key, data, suffix, mission), bundle=bundle)
+            UPLOAD_CACHE.put_result(key, bundle.version, out)
+        return _encoded(out, PredictResponse)
     except HTTPException:
         raise
     except Exception as e:
         log.exception("File inference failed: %s", e)
         raise HTTPException(500, f"File inference failed: {e}")
 
+def _upload_key(data: bytes, suffix: str, mission: str | None) -> str:
+    with stage("hash"):
+        return UPLOAD_CACHE.key(data, mission, suffix)
+
+def _upload_frame(key: str, data: bytes, suffix: str, mission: str | None) -> pd.DataFrame:
+    """Normalized upload, parsed at most once per distinct (bytes, mission, suffix)."""
+    df = UPLOAD_CACHE.frame(key)
+    if df is None:
+        with stage("read") as st:
+            df = read_table(data, suffix=suffix)
+            st.rows = len(df)
+        with stage("normalize", rows=len(df)):
+            df = normalize_schema(df, mission)
+        UPLOAD_CACHE.put_frame(key, df)
+    return df
+
+def _stream_predictions(
+    chunks: Iterable[pd.DataFrame],
+    mission: str | None,
+    bundle: ModelBundle,
+    fmt: str,
+) -> Iterator[str]:
+    """One encoded block of rows per input chunk; only one chunk is alive at a time."""
+    row = 0
+    header_done = False
+    try:
+        for chunk in chunks:
+            with stage("normalize", rows=len(chunk)):
+                df = normalize_schema(chunk, mission)
+            if df.empty:
+                continue
+            with stage("align", rows=len(df)):
+                X = bundle.plan.matrix(df)
+            proba = predict_matrix(X, bundle)
+            ids = ([None if pd.isna(v) else str(v) for v in df["object_id"]]
+                   if "object_id" in df.columns else [None] * len(df))
+            buf = io.StringIO()
+            if fmt == "csv":
+                w = csv.writer(buf, lineterminator="\n")
+                if not header_done:
+                    classes = bundle.classes or [f"class_{i}" for i in range(proba.shape[1])]
+                    w.writerow(["row", "object_id", *(f"p_{c}" for c in classes)])
+                    header_done = True
+                for i, (oid, p) in enumerate(zip(ids, proba.tolist())):
+                    w.writerow([row + i, oid if oid is not None else "", *p])
+            else:
+                for i, (oid, p) in enumerate(zip(ids, proba.tolist())):
+                    buf.write(json.dumps({"row": row + i, "object_id": oid, "proba": p}))
+                    buf.write("\n")
+            row += len(df)
+            yield buf.getvalue()
+    except Exception as e:
+        if row == 0:
+            raise
+        # headers are already sent; report the failure in-band and stop
+        log.exception("Streaming inference failed after %d rows: %s", row, e)
+        if fmt == "csv":
+            yield f"# error after {row} rows: {e}\n"
+        else:
+            yield json.dumps({"error": f"Streaming inference failed: {e}", "rows_done": row}) + "\n"
+
 @router.post(
     "/explain",
     summary="Explain first N rows via SHAP (tree models) or fallback feature importances",
 )
-def explain(
+async def explain(
     req: PredictRequest,
     top_n: int = Query(1, ge=1, le=256, description="How many first rows to explain"),
     max_display: int = Query(10, ge=1, le=64, description="Top features to display per row"),
-    _=Depends(_artifacts_ok),
+    bundle: ModelBundle = Depends(_bundle),
 ):
     if not req.rows:
         raise HTTPException(400, "Empty payload: 'rows' must contain at least one row.")
+    # SHAP is the most expensive call we serve, whatever the row count
+    return await _offload(BULK, _explain_rows, req, top_n, max_display, bundle)
 
+def _explain_rows(req: PredictRequest, top_n: int, max_display: int, bundle: ModelBundle) -> Response:
     df = pd.DataFrame(req.rows)
     df = normalize_schema(df, req.mission)
-    model, feat_names = get_model_and_features()
-    X = align_features(df).head(top_n)
+    model, feat_names = get_model_and_features(bundle)
+    X = align_features(df, bundle).head(top_n)
 
     try:
-        out = explain_samples(model, X, feat_names, max_display=max_display)
-        return out
+        with stage("explain", rows=len(X)):
+            out = explain_samples(model, X, feat_names, max_display=max_display)
+        return _encoded(out)
     except Exception as e:
         log.exception("Explain failed: %s", e)
         raise HTTPException(500, f"Explain failed: {e}")
@@ -130,22 +310,25 @@ def conformal(req: ConformalRequest):
     "/vet",
     summary="QC vetting flags from qc.yaml (ratio, impact, depth) + is_valid",
 )
-def vet(req: PredictRequest):
+async def vet(req: PredictRequest):
     if not req.rows:
         raise HTTPException(400, "Empty payload: 'rows' must contain at least one row.")
+    return await _offload(_rows_lane(len(req.rows)), _vet_rows, req)
 
+def _vet_rows(req: PredictRequest) -> Response:
     df = pd.DataFrame(req.rows)
     df = normalize_schema(df, req.mission)
 
     try:
-        out_df = apply_qc(df)
+        with stage("qc", rows=len(df)):
+            out_df = apply_qc(df)
         flags = (
             out_df[["qc_ratio_high", "qc_impact_high", "qc_depth_low", "is_valid"]]
             .fillna(False)
             .astype(bool)
             .to_dict(orient="records")
         )
-        return {"n": int(len(out_df)), "flags": flags}
+        return _encoded({"n": int(len(out_df)), "flags": flags})
     except Exception as e:
         log.exception("Vetting failed: %s", e)
         raise HTTPException(500, f"Vetting failed: {e}")
@@ -154,70 +337,163 @@ def vet(req: PredictRequest):
     "/upload",
     summary="Upload and parse dataset file (CSV/Parquet) for frontend",
 )
-def upload_dataset(
+async def upload_dataset(
     file: UploadFile = File(...),
     mission: str = Query(None, description="kepler | k2 | tess — if raw columns file, specify mission"),
 ):
     if not file or not file.filename:
         raise HTTPException(400, "No file uploaded.")
+    data = await file.read()
+    return await _offload(BULK, _upload_rows, file.filename, data, mission)
 
+def _upload_rows(filename: str, data: bytes, mission: str | None) -> Response:
     try:
-        df = read_table(file.file.read(), suffix=Path(file.filename).suffix.lower())
-        df = normalize_schema(df, mission)
-        
-        # Replace NaN values with None for JSON serialization
-        df = df.fillna("")
+        suffix = Path(filename).suffix.lower()
+        df = _upload_frame(_upload_key(data, suffix, mission), data, suffix, mission)
         
         # Limit to first 1000 rows for frontend display
         max_rows = 1000
         original_count = len(df)
         if len(df) > max_rows:
             df = df.head(max_rows)
-            
+
+        # Replace NaN values with None for JSON serialization (after truncating:
+        # the cached frame is shared and only the displayed rows need it)
+        df = df.fillna("")
+
         rows = df.to_dict(orient="records")
-        return {
-            "filename": file.filename,
+        return _encoded({
+            "filename": filename,
             "rows": rows,
             "count": len(rows),
             "total_count": original_count,
             "truncated": original_count > max_rows,
             "columns": list(df.columns)
-        }
+        })
     except Exception as e:
         log.exception("Upload failed: %s", e)
         raise HTTPException(500, f"Upload failed: {e}")
 
 @router.post(
     "/predict-curve",
-    summary="Predict from a lightcurve file (CSV/TSV/FITS) using ONNX model (if available)",
+    summary="Predict from a lightcurve file (CSV/TSV/FITS, or a .zip of sectors to stitch) using ONNX model (if available)",
 )
-def predict_curve_endpoint(
+async def predict_curve_endpoint(
     file: UploadFile = File(...),
     period_days: float | None = Query(None),
     duration_hours: float | None = Query(None),
-    _=Depends(_artifacts_ok),   
+    auto_period: bool = Query(False, description="Without period_days, fold on a transit found by a BLS search"),
+    bundle: ModelBundle = Depends(_bundle),
 ):
     if not file or not file.filename:
         raise HTTPException(400, "No file uploaded.")
+    data = await file.read()
+    suffix = Path(file.filename).suffix.lower()
+    # one target per call: latency-sensitive like a small /predict, unless it is an archive of sectors to
+    # stitch or needs a BLS search (seconds to minutes on multi-year curves); those go to the bulk lane
+    # and its backpressure
+    lane = BULK if suffix == ".zip" or (auto_period and not period_days) else INTERACTIVE
+    return await _offload(lane, _predict_curve_file, data, suffix,
+                          period_days, duration_hours, bundle, auto_period)
 
+def _predict_curve_file(data: bytes, suffix: str, period_days: float | None,
+                        duration_hours: float | None, bundle: ModelBundle,
+                        auto_period: bool = False) -> Dict[str, Any]:
     try:
-        lc = curves.load_lightcurve(
-            file.file.read(),
-            suffix=Path(file.filename).suffix.lower(),
-        )
-        vec = curves.prepare_curve_input(
-            lc,
-            period_days=period_days,
-            duration_hours=duration_hours,
-            fold_if_possible=True,
-        )
-        proba = predict_curve(vec)
+        with stage("read"):
+            if suffix == ".zip":  # sectors/quarters of one target, stitched
+                try:
+                    lc = curves.load_archive(data)
+                except (ValueError, zipfile.BadZipFile) as e:
+                    raise HTTPException(400, f"Invalid light-curve archive: {e}")
+            else:
+                lc = curves.load_lightcurve(data, suffix=suffix)
+        transit = None
+        if auto_period and not period_days:
+            with stage("period_search"):
+                transit = curves.find_transit(lc, workers=CURVE_BLS_WORKERS)
+            if transit is not None:
+                period_days, duration_hours = transit.period_days, transit.duration_hours
+        with stage("curve_prep"):
+            vec = curves.prepare_curve_input(
+                lc,
+                period_days=period_days,
+                duration_hours=duration_hours,
+                fold_if_possible=True,
+                t0=transit.t0 if transit is not None else None,
+            )
+        proba = predict_curve(vec, bundle=bundle)
         if proba is None:
             raise HTTPException(501, "Curve model is not available on this server.")
-        return {"proba": [proba], "n": 1}
+        out = {"proba": [proba], "n": 1}
+        if auto_period:
+            out["transit"] = transit.to_dict() if transit is not None else None
+        return out
 
     except HTTPException:
         raise
     except Exception as e:
         log.exception("Predict-curve failed: %s", e)
         raise HTTPException(500, f"Predict-curve failed: {e}")
+
+@router.post(
+    "/predict-curves",
+    summary="Predict many lightcurves at once: a .zip of CSV/TSV/FITS files or a multi-HDU FITS file",
+)
+async def predict_curves_endpoint(
+    file: UploadFile = File(...),
+    period_days: float | None = Query(None, description="Fold period for curves without one in manifest.csv"),
+    duration_hours: float | None = Query(None),
+    auto_period: bool = Query(False, description="Fold curves without a period on a transit found by a BLS search"),
+    bundle: ModelBundle = Depends(_bundle),
+):
+    if not file or not file.filename:
+        raise HTTPException(400, "No file uploaded.")
+    if bundle.cnn_session is None:
+        raise HTTPException(501, "Curve model is not available on this server.")
+    data = await file.read()
+    return await _offload(BULK, _predict_curves_file, data, Path(file.filename).suffix.lower(),
+                          period_days, duration_hours, bundle, auto_period)
+
+def _predict_curves_file(data: bytes, suffix: str, period_days: float | None,
+                         duration_hours: float | None, bundle: ModelBundle,
+                         auto_period: bool = False) -> Response:
+    try:
+        with stage("read"):
+            sources = curves.curve_sources(
+                data, suffix,
+                max_curves=CURVE_BATCH_MAX_CURVES,
+                max_bytes=int(CURVE_BATCH_MAX_MB * 1024 * 1024),
+            )
+    except (ValueError, zipfile.BadZipFile) as e:
+        raise HTTPException(400, f"Invalid curve batch: {e}")
+
+    try:
+        with stage("curve_prep", rows=len(sources)):
+            prepared = curves.prepare_curves(
+                sources, period_days=period_days, duration_hours=duration_hours,
+                auto_period=auto_period, workers=CURVE_PREP_WORKERS,
+            )
+        ok = [i for i, p in enumerate(prepared) if p.error is None]
+        proba = predict_curves([prepared[i].vector for i in ok], bundle=bundle) if ok else None
+        scored = dict(zip(ok, proba.tolist())) if proba is not None else {}
+
+        results = []
+        for i, (src, p) in enumerate(zip(sources, prepared)):
+            if i in scored:
+                item = {"name": src.name, "proba": scored[i]}
+            else:
+                item = {"name": src.name, "proba": None, "error": str(p.error)}
+            if auto_period:
+                item["transit"] = p.transit.to_dict() if p.transit is not None else None
+            results.append(item)
+        return _encoded({
+            "n": len(results),
+            "n_ok": len(scored),
+            "results": results,
+        })
+    except HTTPException:
+        raise
+    except Exception as e:
+        log.exception("Predict-curves failed: %s", e)
+        raise HTTPException(500, f"Predict-curves failed: {e}")
@@ -2,8 +2,13 @@ from __future__ import annotations
 from pathlib import Path
 from typing import Any, Dict
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import PlainTextResponse
 from api.utils.constants import MODELS_DIR
-from api.services.pipeline import _lazy_boot_tabular, get_model_and_features
+from api.utils.timing import render_prometheus
+from api.services.pipeline import get_model_and_features
+from api.services.registry import REGISTRY
+from api.services.cache import UPLOAD_CACHE, PREDICTION_CACHE
+from api.services.executor import EXECUTOR
 from api.services.shap_utils import compute_global_importance
 import json
 import logging
@@ -23,8 +28,39 @@ def summary() -> Dict[str, Any]:
 
 @router.get("/feature-importance")
 def feature_importance() -> Dict[str, Any]:
-    _lazy_boot_tabular()
-    model, features = get_model_and_features()
+    try:
+        model, features = get_model_and_features()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Model not loaded: {e}")
     if model is None or not features:
         raise HTTPException(status_code=500, detail="Model not loaded.")
     return {"importance": compute_global_importance(model, features)}
+
+def _cache_samples(metric: str) -> Dict[str, float]:
+    stats = UPLOAD_CACHE.stats()
+    samples = {f'cache="upload_{kind}"': stats[kind][metric] for kind in ("frames", "results")}
+    samples['cache="predictions"'] = PREDICTION_CACHE.stats()[metric]
+    return samples
+
+def _executor_samples(metric: str) -> Dict[str, float]:
+    return {f'lane="{lane}"': stats[metric] for lane, stats in EXECUTOR.stats().items()}
+
+@router.get("/runtime", response_class=PlainTextResponse, summary="Stage latency histograms (Prometheus text format)")
+def runtime() -> PlainTextResponse:
+    status = REGISTRY.status()
+    extra = {
+        "starharbor_cache_hits_total": ("counter", "Cache hits.", _cache_samples("hits")),
+        "starharbor_cache_misses_total": ("counter", "Cache misses.", _cache_samples("misses")),
+        "starharbor_cache_bytes": ("gauge", "Bytes held in memory by a cache.", _cache_samples("bytes")),
+        "starharbor_inference_queued": ("gauge", "Calls waiting in an inference lane.", _executor_samples("queued")),
+        "starharbor_inference_running": ("gauge", "Calls running in an inference lane.", _executor_samples("running")),
+        "starharbor_inference_completed_total": ("counter", "Calls finished by an inference lane.", _executor_samples("completed")),
+        "starharbor_inference_rejected_total": (
+            "counter", "Calls refused with 503 because the lane was full.", _executor_samples("rejected"),
+        ),
+        "starharbor_model_info": (
+            "gauge", "Active model bundle (value is 1 when loaded).",
+            {f'version="{status.get("version") or ""}"': 1 if status["ready"] else 0},
+        ),
+    }
+    return PlainTextResponse(render_prometheus(extra), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from api.services.pipeline import predict_matrix
+from api.services.registry import ModelBundle
+from api.utils.constants import PREDICT_BATCH_WINDOW_MS, PREDICT_BATCH_MAX_ROWS
+from api.utils.timing import stage
+
+log = logging.getLogger(__name__)
+
+
+@dataclass
+class _Pending:
+    X: np.ndarray
+    bundle: ModelBundle
+    future: Future = field(default_factory=Future)
+
+
+class MicroBatcher:
+    """Coalesces small predict calls into one ``predict_matrix`` call.
+
+    Callers align their rows on their own thread and hand the matrix over;
+    a single worker collects requests for up to ``window_ms`` (or until
+    ``max_rows`` rows are queued), scores them together and fans the
+    probability rows back out. Requests are only merged with others that
+    hold the same model bundle.
+    """
+
+    def __init__(self, window_ms: float = 3.0, max_rows: int = 512) -> None:
+        self.window = max(window_ms, 0.0) / 1000.0
+        self.max_rows = max(int(max_rows), 1)
+        self._queue: "queue.Queue[Optional[_Pending]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.window > 0
+
+    def submit(self, df_norm: pd.DataFrame, bundle: ModelBundle) -> Future:
+        with stage("align", rows=len(df_norm)):
+            item = _Pending(bundle.plan.matrix(df_norm), bundle)
+        self._ensure_started()
+        self._queue.put(item)
+        return item.future
+
+    def predict(self, df_norm: pd.DataFrame, bundle: ModelBundle) -> np.ndarray:
+        """Blocking ``submit``: holds the calling thread until the batch is scored.
+
+        Async handlers should await the future from ``submit`` instead (see
+        the /inference/predict route), so waiting callers do not each pin an
+        executor thread and cap a batch at the thread count.
+        """
+        future = self.submit(df_norm, bundle)
+        with stage("batch_wait", rows=len(df_norm)):
+            return future.result()
+
+    def stop(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                return
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _ensure_started(self) -> None:
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="predict-batcher", daemon=True)
+                self._thread.start()
+
+    def _collect(self, first: _Pending) -> List[_Pending]:
+        batch = [first]
+        rows = len(first.X)
+        deadline = time.monotonic() + self.window
+        while rows < self.max_rows:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # let _run see the stop marker
+                break
+            batch.append(item)
+            rows += len(item.X)
+        return batch
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+            groups: Dict[int, List[_Pending]] = {}
+            for item in self._collect(first):
+                groups.setdefault(id(item.bundle), []).append(item)
+            for items in groups.values():
+                self._score(items)
+
+    @staticmethod
+    def _score(items: List[_Pending]) -> None:
+        try:
+            X = items[0].X if len(items) == 1 else np.concatenate([it.X for it in items])
+            proba = np.asarray(predict_matrix(X, items[0].bundle))
+        except Exception as e:
+            for it in items:
+                it.future.set_exception(e)
+            return
+        start = 0
+        for it in items:
+            stop = start + len(it.X)
+            it.future.set_result(proba[start:stop])
+            start = stop
+
+
+BATCHER = MicroBatcher(window_ms=PREDICT_BATCH_WINDOW_MS, max_rows=PREDICT_BATCH_MAX_ROWS)
@@ -0,0 +1,256 @@
+from __future__ import annotations
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+# Box Least Squares transit search (Kovacs, Zucker & Mazeh 2002), vectorized.
+#
+# The curve is first binned in time (``bin_minutes``, by default a third of
+# the shortest trial duration), then folded at a block
+# of trial periods at once: every (period, point) pair lands in one of
+# ``n_bins`` phase bins, and a single bincount per block gives the per-bin
+# flux sums and counts. Box sums for every start bin and trial duration come
+# from cumulative sums over the (wrapped) phase bins, so each period costs
+# O(points + bins * durations) with no Python loop below the block level.
+#
+# For mean-subtracted flux y with in-transit sum s over a fraction r of the
+# points, the BLS power is s^2 / (r (1 - r)) and the depth -s / (r (1 - r)).
+
+DEFAULT_DURATIONS_HOURS: Tuple[float, ...] = (1.0, 1.5, 2.0, 3.0, 4.0, 6.0, 9.0, 12.0)
+
+# (period, point) pairs folded per step: bounds the fold temporaries to a few MB per thread
+FOLD_CHUNK_POINTS = 1 << 18
+# (period, phase bin) cells per block: bounds the box-sum arrays of one block the same way
+BLOCK_BINS = 1 << 17
+
+
+@dataclass(frozen=True)
+class TransitSearch:
+    period_days: float
+    t0: float               # mid-transit time, in the curve's time units
+    duration_hours: float
+    depth: float            # relative to the out-of-transit level
+    snr: float
+    power: float
+    n_transits: int
+    oversample: float       # effective period-grid oversampling; below 1, short transits can be missed
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def period_grid(baseline: float, min_period: float, max_period: float,
+                min_duration_days: float, oversample: float = 3.0, max_periods: int = 20000) -> np.ndarray:
+    """Log-spaced trial periods (days).
+
+    Neighbouring periods drift the last transit by at most
+    ``min_duration / oversample`` relative to the first over ``baseline``,
+    i.e. d ln P = min_duration / (oversample * baseline). Longer baselines
+    need more periods; past ``max_periods`` the grid is capped and coarser
+    (see :func:`grid_oversample`).
+    """
+    step = min_duration_days / (oversample * baseline)
+    n = int(np.ceil(np.log(max_period / min_period) / step)) + 1
+    if n > max_periods:
+        log.warning("BLS period grid capped at %d of %d periods (baseline %.0f d): effective oversampling %.2f",
+                    max_periods, n, baseline, oversample * (max_periods - 1) / (n - 1))
+    return np.geomspace(min_period, max_period, int(np.clip(n, 2, max_periods)))
+
+
+def grid_oversample(periods: np.ndarray, baseline: float, min_duration_days: float) -> float:
+    """Oversampling actually achieved by ``periods`` (the ``oversample`` of :func:`period_grid` unless capped)."""
+    step = np.log(periods[-1] / periods[0]) / max(len(periods) - 1, 1)
+    return float(min_duration_days / (step * baseline)) if step > 0 else float("inf")
+
+
+def _bin_time(t: np.ndarray, y: np.ndarray, width: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    idx = np.floor((t - t[0]) / width).astype(np.int64)
+    counts = np.bincount(idx)
+    keep = counts > 0
+    tb = np.bincount(idx, weights=t)[keep] / counts[keep]
+    yb = np.bincount(idx, weights=y)[keep] / counts[keep]
+    return tb, yb, counts[keep].astype(np.float64)
+
+
+def _phase_sums(t: np.ndarray, yw: np.ndarray, w: np.ndarray, periods: np.ndarray,
+                n_bins: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-period phase-bin sums of ``yw`` and ``w``, shape (periods, n_bins).
+
+    Folded a few periods at a time, so the (period, point) temporaries stay
+    under ``FOLD_CHUNK_POINTS`` elements however long the curve is.
+    """
+    m, n = len(periods), len(t)
+    ysum = np.zeros(m * n_bins)
+    wsum = np.zeros(m * n_bins)
+    step = max(1, FOLD_CHUNK_POINTS // max(n, 1))
+    for a in range(0, m, step):
+        b = min(a + step, m)
+        phase = t[None, :] * (1.0 / periods[a:b])[:, None]
+        phase -= np.floor(phase)
+        phase *= n_bins
+        bins = phase.astype(np.int64)
+        del phase
+        np.minimum(bins, n_bins - 1, out=bins)
+        bins += np.arange(b - a)[:, None] * n_bins
+        flat = bins.ravel()
+        ysum[a * n_bins:b * n_bins] = np.bincount(flat, weights=np.tile(yw, b - a), minlength=(b - a) * n_bins)
+        wsum[a * n_bins:b * n_bins] = np.bincount(flat, weights=np.tile(w, b - a), minlength=(b - a) * n_bins)
+    return ysum.reshape(m, n_bins), wsum.reshape(m, n_bins)
+
+
+def _search_block(t: np.ndarray, y: np.ndarray, w: np.ndarray, periods: np.ndarray,
+                  durations: np.ndarray, n_bins: int, max_duty: float) -> Tuple[np.ndarray, ...]:
+    """Best (power, start bin, box width in bins, in-transit flux sum, in-transit weight) per period."""
+    m = len(periods)
+    ysum, wsum = _phase_sums(t, y * w, w, periods, n_bins)
+
+    # one box width per duration for the whole block: its periods differ by a few percent at most,
+    # far less than the spacing of the duration trials
+    widths = np.maximum(np.rint(durations / np.sqrt(periods[0] * periods[-1]) * n_bins).astype(np.int64), 1)
+    widths[widths > max_duty * n_bins] = 0
+    kmax = int(widths.max())
+    # cumulative sums over the phase bins wrapped by kmax, so a box may straddle phase 0
+    cy = np.zeros((m, n_bins + kmax + 1))
+    cw = np.zeros((m, n_bins + kmax + 1))
+    np.cumsum(np.concatenate([ysum, ysum[:, :kmax]], axis=1), axis=1, out=cy[:, 1:])
+    np.cumsum(np.concatenate([wsum, wsum[:, :kmax]], axis=1), axis=1, out=cw[:, 1:])
+
+    best = np.full(m, -np.inf)
+    best_start = np.zeros(m, dtype=np.int64)
+    best_dur = np.zeros(m, dtype=np.int64)
+    best_s = np.zeros(m)
+    best_r = np.zeros(m)
+    rows = np.arange(m)
+    for d, k in enumerate(widths):
+        if not k:
+            continue  # longer than max_duty of the period
+        s = cy[:, k:k + n_bins] - cy[:, :n_bins]
+        r = cw[:, k:k + n_bins] - cw[:, :n_bins]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            power = np.where((s < 0) & (r > 0) & (r < 1), s * s / (r * (1 - r)), -np.inf)
+        j = power.argmax(axis=1)
+        p = power[rows, j]
+        better = p > best
+        best = np.where(better, p, best)
+        best_start = np.where(better, j, best_start)
+        best_dur = np.where(better, d, best_dur)
+        best_s = np.where(better, s[rows, j], best_s)
+        best_r = np.where(better, r[rows, j], best_r)
+    return best, best_start, widths[best_dur], best_s, best_r
+
+
+def search_transit(
+    t: np.ndarray,
+    y: np.ndarray,
+    *,
+    min_period: float = 0.5,
+    max_period: Optional[float] = None,
+    durations_hours: Sequence[float] = DEFAULT_DURATIONS_HOURS,
+    oversample: float = 3.0,
+    bins_per_duration: float = 3.0,
+    bin_minutes: Optional[float] = None,
+    detrend_days: Optional[float] = 1.0,
+    max_duty: float = 0.15,
+    min_transits: int = 2,
+    block_periods: int = 128,
+    workers: int = 1,
+) -> Optional[TransitSearch]:
+    """Strongest box-shaped dip in ``(t, y)`` (t in days), or ``None`` if there is no room to search.
+
+    Periods run from ``min_period`` to ``max_period`` (default: the baseline
+    over ``min_transits``); ``workers`` threads search blocks of the grid.
+    Unless ``detrend_days`` is None, the binned curve is first divided by its
+    running median over that window, which must be well above the longest
+    duration. The caller decides whether ``snr`` is high enough to trust,
+    and ``oversample`` says whether the period grid was capped.
+    """
+    t = np.asarray(t, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    ok = np.isfinite(t) & np.isfinite(y)
+    t, y = t[ok], y[ok]
+    if len(t) < 20:
+        return None
+    order = np.argsort(t)
+    t, y = t[order], y[order]
+    baseline = t[-1] - t[0]
+    max_period = min(max_period or np.inf, baseline / max(min_transits, 1))
+    durations = np.asarray(sorted(durations_hours), dtype=np.float64) / 24.0
+    if not np.isfinite(baseline) or max_period <= min_period or durations[0] >= max_period:
+        return None
+
+    level = np.median(y)
+    if not np.isfinite(level) or level == 0:
+        return None
+    # time bins no wider than the phase bins below (a third of the shortest duration by default)
+    bin_days = bin_minutes / 1440.0 if bin_minutes else durations[0] / bins_per_duration
+    tb, yb, counts = _bin_time(t, y / level, bin_days)
+    if detrend_days:
+        trend = pd.Series(yb, index=pd.to_datetime(tb - tb[0], unit="D")).rolling(
+            pd.Timedelta(days=detrend_days), center=True, min_periods=1).median().to_numpy()
+        yb = yb / trend
+    yb = yb - 1.0
+    w = counts / counts.sum()
+    yb = yb - np.dot(w, yb)
+    tref = tb[0]
+    tb = tb - tref
+
+    periods = period_grid(baseline, min_period, max_period, durations[0], oversample=oversample)
+
+    def n_bins(block: np.ndarray) -> int:
+        # phase bins of at most 1/bins_per_duration of the shortest duration, at the block's longest period
+        return int(np.clip(np.ceil(bins_per_duration * block[-1] / durations[0]), 32, 8192))
+
+    # up to block_periods per block, fewer at long periods so a block's (period, bin) arrays stay small
+    blocks = []
+    i = 0
+    while i < len(periods):
+        size = min(block_periods, len(periods) - i)
+        size = max(1, min(size, BLOCK_BINS // n_bins(periods[i:i + size])))
+        blocks.append(periods[i:i + size])
+        i += size
+
+    def run(block: np.ndarray):
+        return (*_search_block(tb, yb, w, block, durations, n_bins(block), max_duty),
+                np.full(len(block), n_bins(block)))
+
+    if workers > 1 and len(blocks) > 1:
+        with ThreadPoolExecutor(max_workers=min(workers, len(blocks)), thread_name_prefix="bls") as pool:
+            parts = list(pool.map(run, blocks))
+    else:
+        parts = [run(b) for b in blocks]
+    power, start, width, s, r, nbins = (np.concatenate(x) for x in zip(*parts))
+    if not np.isfinite(power).any():
+        return None
+
+    i = int(power.argmax())
+    period = float(periods[i])
+    duration = int(width[i]) * period / int(nbins[i])
+    t0 = tref + (start[i] * period / int(nbins[i]) + duration / 2.0) % period  # first epoch in the data
+    depth = float(-s[i] / (r[i] * (1 - r[i])))
+
+    # noise from the out-of-transit scatter of the binned curve
+    phase = ((tb + tref - t0) / period + 0.5) % 1.0 - 0.5
+    half = duration / period / 2.0
+    out = np.abs(phase) > half
+    n_in = int((~out).sum())
+    sigma = 1.4826 * np.median(np.abs(yb[out] - np.median(yb[out]))) if out.sum() > 2 else np.nan
+    snr = float(depth / sigma * np.sqrt(n_in)) if np.isfinite(sigma) and sigma > 0 and n_in else 0.0
+    epochs = np.unique(np.rint((tb[~out] + tref - t0) / period))
+
+    return TransitSearch(
+        period_days=period,
+        t0=float(t0),
+        duration_hours=float(duration * 24.0),
+        depth=depth,
+        snr=snr,
+        power=float(power[i]),
+        n_transits=int(len(epochs)),
+        oversample=grid_oversample(periods, baseline, durations[0]),
+    )
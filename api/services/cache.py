@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from api.utils.constants import (
+    UPLOAD_CACHE_MB,
+    UPLOAD_CACHE_DIR,
+    UPLOAD_CACHE_DISK_MB,
+    PREDICT_CACHE_MB,
+    PREDICT_CACHE_TTL_S,
+    PREDICT_CACHE_MAX_ROWS,
+)
+
+log = logging.getLogger(__name__)
+
+_MB = 1024 * 1024
+
+
+class LRUCache:
+    """Thread-safe LRU bounded by the total ``sizeof`` of its values (bytes).
+
+    A single value larger than the whole budget is not stored. ``max_bytes``
+    of 0 disables the cache (every ``get`` is a miss, ``put`` is a no-op).
+    With ``ttl`` (seconds) an entry also expires that long after its ``put``.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int], ttl: float = 0) -> None:
+        self.max_bytes = max(int(max_bytes), 0)
+        self.ttl = max(float(ttl), 0.0)
+        self._sizeof = sizeof
+        self._data: "OrderedDict[Hashable, Tuple[Any, int, float]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Iterable[Hashable]) -> List[Optional[Any]]:
+        """Values for ``keys`` in order (``None`` for a miss), under one lock acquisition."""
+        now = time.monotonic()
+        out: List[Optional[Any]] = []
+        with self._lock:
+            for key in keys:
+                entry = self._data.get(key)
+                if entry is not None and entry[2] < now:
+                    del self._data[key]
+                    self._bytes -= entry[1]
+                    entry = None
+                if entry is None:
+                    self.misses += 1
+                    out.append(None)
+                    continue
+                self._data.move_to_end(key)
+                self.hits += 1
+                out.append(entry[0])
+        return out
+
+    def put(self, key: Hashable, value: Any) -> None:
+        self.put_many([(key, value)])
+
+    def put_many(self, items: Iterable[Tuple[Hashable, Any]]) -> None:
+        sized = [(key, value, int(self._sizeof(value))) for key, value in items]
+        expires = time.monotonic() + self.ttl if self.ttl else float("inf")
+        with self._lock:
+            for key, value, size in sized:
+                if size > self.max_bytes:
+                    continue
+                old = self._data.pop(key, None)
+                if old is not None:
+                    self._bytes -= old[1]
+                self._data[key] = (value, size, expires)
+                self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted, _) = self._data.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
+
+
+def _frame_size(df: pd.DataFrame) -> int:
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+def _result_size(out: dict) -> int:
+    # python floats in nested lists: ~24 bytes each plus an 8-byte list slot
+    proba = out.get("proba") or []
+    width = len(proba[0]) if proba else 0
+    return 256 + len(proba) * (56 + 32 * width)
+
+
+def _proba_size(row: np.ndarray) -> int:
+    # the array itself plus its header, the (version, digest) key and the OrderedDict slot
+    return row.nbytes + 320
+
+
+class UploadCache:
+    """Parsed uploads addressed by content: sha256(bytes) + mission + suffix.
+
+    Holds the normalized DataFrame (in memory, optionally spilled to Parquet
+    under ``disk_dir``) and, per model version, the ``predict_tab`` output for
+    that upload. Cached frames are shared between requests and must be treated
+    as read-only.
+    """
+
+    def __init__(self, max_mb: float, disk_dir: Optional[Path] = None, disk_max_mb: float = 1024) -> None:
+        budget = int(max_mb * _MB)
+        self.frames = LRUCache(budget - budget // 4, _frame_size)
+        self.results = LRUCache(budget // 4, _result_size)
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = int(disk_max_mb * _MB)
+        self._disk_lock = threading.Lock()
+        self.disk_hits = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.frames.max_bytes > 0 or self.disk_dir is not None
+
+    @staticmethod
+    def key(data: bytes, mission: Optional[str], suffix: Optional[str]) -> str:
+        h = hashlib.sha256(data)
+        h.update(f"|{(mission or '').strip().lower()}|{(suffix or '').lower()}".encode())
+        return h.hexdigest()
+
+    def frame(self, key: str) -> Optional[pd.DataFrame]:
+        df = self.frames.get(key)
+        if df is not None or self.disk_dir is None:
+            return df
+        path = self.disk_dir / f"{key}.parquet"
+        try:
+            df = pd.read_parquet(path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            log.warning("Dropping unreadable upload cache file %s: %s", path, e)
+            path.unlink(missing_ok=True)
+            return None
+        os.utime(path)  # LRU order on disk follows mtime
+        self.disk_hits += 1
+        self.frames.put(key, df)
+        return df
+
+    def put_frame(self, key: str, df: pd.DataFrame) -> None:
+        self.frames.put(key, df)
+        if self.disk_dir is not None:
+            self._spill(key, df)
+
+    def result(self, key: str, version: str) -> Optional[dict]:
+        return self.results.get((key, version))
+
+    def put_result(self, key: str, version: str, out: dict) -> None:
+        self.results.put((key, version), out)
+
+    def clear(self) -> None:
+        self.frames.clear()
+        self.results.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "frames": self.frames.stats(),
+            "results": self.results.stats(),
+            "disk_dir": str(self.disk_dir) if self.disk_dir else None,
+            "disk_hits": self.disk_hits,
+        }
+
+    def _spill(self, key: str, df: pd.DataFrame) -> None:
+        path = self.disk_dir / f"{key}.parquet"
+        tmp = path.with_suffix(f".{threading.get_ident()}.tmp")
+        try:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            df.to_parquet(tmp)
+            os.replace(tmp, path)
+        except Exception as e:
+            # e.g. object columns with mixed types; the memory tier still has it
+            log.debug("Not spilling upload %s to disk: %s", key[:12], e)
+            tmp.unlink(missing_ok=True)
+            return
+        self._prune_disk()
+
+    def _prune_disk(self) -> None:
+        with self._disk_lock:
+            files = []
+            for p in self.disk_dir.glob("*.parquet"):
+                try:
+                    st = p.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((st.st_mtime, st.st_size, p))
+            total = sum(size for _, size, _ in files)
+            for _, size, p in sorted(files, key=lambda f: f[0]):
+                if total <= self.disk_max_bytes:
+                    break
+                p.unlink(missing_ok=True)
+                total -= size
+
+
+UPLOAD_CACHE = UploadCache(
+    UPLOAD_CACHE_MB,
+    disk_dir=Path(UPLOAD_CACHE_DIR) if UPLOAD_CACHE_DIR else None,
+    disk_max_mb=UPLOAD_CACHE_DISK_MB,
+)
+
+
+class PredictionCache:
+    """Class probabilities per aligned feature row, for the model version that scored it.
+
+    Rows are addressed by a 128-bit BLAKE2b digest of their float64 bytes, so
+    the same KOI scored again (alone or inside any batch) is a hit; the model
+    version is part of the key and the cache is cleared when the registry
+    swaps bundles. Calls of more than ``max_rows`` rows bypass it: hashing a
+    bulk upload costs more than it saves, and repeated uploads are already
+    answered by ``UploadCache``.
+    """
+
+    def __init__(self, max_mb: float, ttl: float = 0, max_rows: int = 1000) -> None:
+        self.rows = LRUCache(int(max_mb * _MB), _proba_size, ttl=ttl)
+        self.max_rows = max(int(max_rows), 0)
+
+    def usable(self, n: int) -> bool:
+        return self.rows.max_bytes > 0 and 0 < n <= self.max_rows
+
+    @staticmethod
+    def keys(X: np.ndarray, version: str) -> List[Tuple[str, bytes]]:
+        data = np.ascontiguousarray(X, dtype=np.float64).tobytes()
+        width = X.shape[1] * 8
+        return [
+            (version, hashlib.blake2b(data[i:i + width], digest_size=16).digest())
+            for i in range(0, len(data), width)
+        ]
+
+    def get_many(self, keys: List[Tuple[str, bytes]]) -> List[Optional[np.ndarray]]:
+        return self.rows.get_many(keys)
+
+    def put_many(self, keys: List[Tuple[str, bytes]], proba: np.ndarray) -> None:
+        # one small array per row, so evicting a row frees it
+        self.rows.put_many((key, row.copy()) for key, row in zip(keys, proba))
+
+    def clear(self) -> None:
+        self.rows.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self.rows.stats(), "ttl_s": self.rows.ttl, "max_rows": self.max_rows}
+
+
+PREDICTION_CACHE = PredictionCache(PREDICT_CACHE_MB, ttl=PREDICT_CACHE_TTL_S, max_rows=PREDICT_CACHE_MAX_ROWS)
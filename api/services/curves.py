@@ -2,22 +2,86 @@ from __future__ import annotations
 
 import io
 import logging
+import warnings
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Dict, Optional, Tuple, Union
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
 
 import numpy as np
 import pandas as pd
 
+from api.services.bls import TransitSearch, search_transit
+from api.utils import fits_io
+from api.utils.constants import (
+    CURVE_DETREND,
+    CURVE_BLS_MIN_SNR,
+    CURVE_QUALITY_BITMASK,
+    CURVE_ARCHIVE_MAX_FILES,
+    CURVE_ARCHIVE_MAX_MB,
+)
+
 log = logging.getLogger(__name__)
 
+DETREND_METHODS = ("savgol", "median", "biweight", "spline")
+
+TIME_COLUMNS = ("time", "btjd", "bkjd", "t_bjd", "BJD", "TIME")
+FLUX_COLUMNS = ("flux", "PDCSAP_FLUX", "SAP_FLUX", "flux_norm", "FLUX")
+CURVE_SUFFIXES = {".csv", ".tsv", ".fits", ".fit"}
+
 def load_lightcurve(
     src: Union[str, Path, bytes],
     *,
     suffix: Optional[str] = None,
-    time_col_candidates=("time", "btjd", "bkjd", "t_bjd", "BJD", "TIME"),
-    flux_col_candidates=("flux", "PDCSAP_FLUX", "SAP_FLUX", "flux_norm", "FLUX"),
+    time_col_candidates=TIME_COLUMNS,
+    flux_col_candidates=FLUX_COLUMNS,
+    quality: Union[str, int, None] = CURVE_QUALITY_BITMASK,
 ) -> pd.DataFrame:
+    sfx = (Path(src).suffix if isinstance(src, (str, Path)) else suffix or "").lower()
+    if sfx in {".fits", ".fit"}:
+        # every light-curve HDU (sectors/quarters) stitched, QUALITY-flagged cadences dropped
+        return _segments_frame(_fits_segments(src, time_col_candidates, flux_col_candidates, quality))
     df = _read_table(src, suffix=suffix)
+    return _lightcurve_frame(df, time_col_candidates, flux_col_candidates)
+
+def load_stitched(
+    parts: Sequence[Tuple[Union[str, Path, bytes], Optional[str]]],
+    *,
+    quality: Union[str, int, None] = CURVE_QUALITY_BITMASK,
+) -> pd.DataFrame:
+    """One light curve from several files of the same target, ``(src, suffix)`` each.
+
+    FITS parts contribute their arrays directly; CSV/TSV parts go through
+    ``load_lightcurve``. Each part is scaled to its median before stitching.
+    """
+    segments: List[fits_io.Segment] = []
+    for src, suffix in parts:
+        sfx = (Path(src).suffix if isinstance(src, (str, Path)) else suffix or "").lower()
+        if sfx in {".fits", ".fit"}:
+            segments.extend(_fits_segments(src, TIME_COLUMNS, FLUX_COLUMNS, quality))
+        else:
+            lc = load_lightcurve(src, suffix=sfx)
+            segments.append(fits_io.Segment(str(sfx), lc["time"].to_numpy(), lc["flux"].to_numpy()))
+    return _segments_frame(segments)
+
+def _fits_segments(src, time_col_candidates, flux_col_candidates, quality) -> List[fits_io.Segment]:
+    try:
+        segments = fits_io.read_segments(src, time_columns=time_col_candidates,
+                                         flux_columns=flux_col_candidates, quality=quality)
+    except ImportError as e:
+        raise RuntimeError(f"FITS provided but astropy is not installed: {e}")
+    if not segments:
+        raise ValueError("Could not find time/flux columns in the provided table.")
+    return segments
+
+def _segments_frame(segments: Sequence[fits_io.Segment]) -> pd.DataFrame:
+    t, f = fits_io.stitch(segments)
+    return pd.DataFrame({"time": t, "flux": f})
+
+def _lightcurve_frame(df: pd.DataFrame, time_col_candidates=TIME_COLUMNS,
+                      flux_col_candidates=FLUX_COLUMNS) -> pd.DataFrame:
     lower = {c.lower(): c for c in df.columns}
     t_col = _first_present(lower, time_col_candidates)
     f_col = _first_present(lower, flux_col_candidates)
@@ -38,7 +102,7 @@ def load_lightcurve(
 def preprocess_lightcurve(
     lc: pd.DataFrame,
     *,
-    detrend: bool = True,
+    detrend: Union[bool, str] = True,
     clip_sigma: float = 4.0,
     normalize: bool = True,
     resample_len: int = 2048,
@@ -57,7 +121,7 @@ def preprocess_lightcurve(
             t, y = t[m], y[m]
 
     if detrend:
-        y = _detrend(y)
+        y = _detrend(y, CURVE_DETREND if detrend is True else detrend)
 
     if normalize:
         ymin, ymax = np.nanmin(y), np.nanmax(y)
@@ -113,41 +177,197 @@ def prepare_curve_input(
     duration_hours: Optional[float] = None,
     resample_len: int = 2048,
     fold_if_possible: bool = True,
+    t0: Optional[float] = None,
 ) -> np.ndarray:
     if fold_if_possible and period_days and period_days > 0:
         _, y = fold_lightcurve(
-            lc, period_days=period_days, t0=None,
+            lc, period_days=period_days, t0=t0,
             duration_hours=duration_hours, resample_len=resample_len
         )
         return y
     return preprocess_lightcurve(lc, resample_len=resample_len)
 
-def guess_period_naive(lc: pd.DataFrame) -> Optional[float]:
-    try:
-        from astropy.timeseries import LombScargle  # type: ignore
-    except Exception:
-        log.info("astropy.timeseries not available; skip period guess.")
-        return None
+@dataclass
+class CurveSource:
+    """One light curve of a batch upload; ``load()`` parses it (run on a prep thread)."""
+    name: str
+    load: Callable[[], pd.DataFrame]
+    period_days: Optional[float] = None
+    duration_hours: Optional[float] = None
+
+
+def curve_sources(
+    data: bytes,
+    suffix: str,
+    *,
+    max_curves: int = 10000,
+    max_bytes: int = 512 * 1024 * 1024,
+) -> List[CurveSource]:
+    """Split a batch upload into light curves.
+
+    A ``.zip`` holds one CSV/TSV/FITS curve per member, plus an optional
+    ``manifest.csv`` with ``file,period_days,duration_hours`` per member; a
+    FITS file gives one curve per table HDU that has time/flux columns; any
+    other supported file is a single curve.
+    """
+    sfx = (suffix or "").lower()
+    if sfx == ".zip":
+        sources = _zip_sources(data, max_curves=max_curves, max_bytes=max_bytes)
+    elif sfx in {".fits", ".fit"}:
+        sources = _fits_sources(data)
+    elif sfx in CURVE_SUFFIXES:
+        sources = [CurveSource("curve", partial(load_lightcurve, data, suffix=sfx))]
+    else:
+        raise ValueError(f"Unsupported file type: {sfx or '(none)'}; expected .zip, .fits, .csv or .tsv")
+    if len(sources) > max_curves:
+        raise ValueError(f"Too many light curves ({len(sources)} > {max_curves}).")
+    return sources
+
+
+def _zip_sources(data: bytes, *, max_curves: int, max_bytes: int) -> List[CurveSource]:
+    blobs, params = _zip_members(data, max_curves=max_curves, max_bytes=max_bytes)
+    sources = []
+    for name, blob in blobs:
+        period, duration = params.get(name, params.get(Path(name).name, (None, None)))
+        sfx = Path(name).suffix.lower()
+        sources.append(CurveSource(name, partial(load_lightcurve, blob, suffix=sfx), period, duration))
+    return sources
+
+
+def load_archive(
+    data: bytes,
+    *,
+    max_files: int = CURVE_ARCHIVE_MAX_FILES,
+    max_bytes: int = int(CURVE_ARCHIVE_MAX_MB * 1024 * 1024),
+) -> pd.DataFrame:
+    """A ``.zip`` of sectors/quarters of one target (CSV/TSV/FITS members) as one stitched curve.
+
+    The member count and declared uncompressed size are checked before anything is decompressed.
+    """
+    blobs, _ = _zip_members(data, max_curves=max_files, max_bytes=max_bytes)
+    if not blobs:
+        raise ValueError("Archive holds no .csv, .tsv or .fits light curves.")
+    return load_stitched([(blob, Path(name).suffix.lower()) for name, blob in blobs])
+
+
+def _zip_members(data: bytes, *, max_curves: int, max_bytes: int):
+    with zipfile.ZipFile(io.BytesIO(data)) as zf:
+        members = [
+            info for info in zf.infolist()
+            if not info.is_dir()
+            and not info.filename.startswith("__MACOSX/")
+            and not Path(info.filename).name.startswith(".")
+        ]
+        manifest = next((m for m in members if Path(m.filename).name.lower() == "manifest.csv"), None)
+        members = sorted(
+            (m for m in members if m is not manifest and Path(m.filename).suffix.lower() in CURVE_SUFFIXES),
+            key=lambda m: m.filename,
+        )
+        if len(members) > max_curves:
+            raise ValueError(f"Too many light curves ({len(members)} > {max_curves}).")
+        if sum(m.file_size for m in members) + (manifest.file_size if manifest is not None else 0) > max_bytes:
+            raise ValueError(f"Archive expands to more than {max_bytes // (1024 * 1024)} MB.")
+        params = _read_manifest(zf.read(manifest)) if manifest is not None else {}
+        # decompress up front: members are then parsed concurrently without sharing the archive
+        blobs = [(m.filename, zf.read(m)) for m in members]
+    return blobs, params
 
-    t = lc["time"].values.astype(float)
-    y = lc["flux"].values.astype(float)
-    if len(t) < 10:
-        return None
 
-    baseline = np.nanmax(t) - np.nanmin(t)
-    if not np.isfinite(baseline) or baseline <= 0:
+def _read_manifest(data: bytes) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    df = pd.read_csv(io.BytesIO(data))
+    lower = {c.lower().strip(): c for c in df.columns}
+    if "file" not in lower:
+        raise ValueError("manifest.csv needs a 'file' column.")
+
+    def column(name: str) -> List[Optional[float]]:
+        if name not in lower:
+            return [None] * len(df)
+        values = pd.to_numeric(df[lower[name]], errors="coerce")
+        return [float(v) if np.isfinite(v) else None for v in values]
+
+    return dict(zip(df[lower["file"]].astype(str).str.strip(),
+                    zip(column("period_days"), column("duration_hours"))))
+
+
+def _fits_sources(data: bytes) -> List[CurveSource]:
+    # one curve per light-curve HDU; only their time/flux/QUALITY columns are read
+    segments = _fits_segments(data, TIME_COLUMNS, FLUX_COLUMNS, CURVE_QUALITY_BITMASK)
+    return [CurveSource(seg.name, partial(_segments_frame, [seg])) for seg in segments]
+
+
+@dataclass
+class PreparedCurve:
+    vector: Optional[np.ndarray] = None
+    error: Optional[Exception] = None
+    transit: Optional[TransitSearch] = None  # set when the period came from find_transit
+
+
+def prepare_curves(
+    sources: Sequence[CurveSource],
+    *,
+    period_days: Optional[float] = None,
+    duration_hours: Optional[float] = None,
+    resample_len: int = 2048,
+    auto_period: bool = False,
+    workers: int = 1,
+) -> List[PreparedCurve]:
+    """``prepare_curve_input`` for every source on ``workers`` threads, in order.
+
+    A curve that fails to load or preprocess carries its exception instead of
+    failing the batch. ``period_days``/``duration_hours`` apply to sources
+    without their own; with ``auto_period`` a curve that has neither is
+    folded on the transit ``find_transit`` recovers, if any.
+    """
+    def run(src: CurveSource) -> PreparedCurve:
+        try:
+            lc = src.load()
+            period = src.period_days if src.period_days is not None else period_days
+            duration = src.duration_hours if src.duration_hours is not None else duration_hours
+            transit = find_transit(lc) if auto_period and not period else None
+            if transit is not None:
+                period, duration = transit.period_days, transit.duration_hours
+            vec = prepare_curve_input(
+                lc,
+                period_days=period,
+                duration_hours=duration,
+                resample_len=resample_len,
+                fold_if_possible=True,
+                t0=transit.t0 if transit is not None else None,
+            )
+            return PreparedCurve(vector=vec, transit=transit)
+        except Exception as e:
+            return PreparedCurve(error=e)
+
+    workers = max(1, min(int(workers), len(sources)))
+    if workers == 1:
+        return [run(src) for src in sources]
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="curve-prep") as pool:
+        return list(pool.map(run, sources))
+
+def find_transit(
+    lc: pd.DataFrame,
+    *,
+    min_snr: float = CURVE_BLS_MIN_SNR,
+    workers: int = 1,
+    **kwargs,
+) -> Optional[TransitSearch]:
+    """Box Least Squares search (``api.services.bls``) over a ``load_lightcurve`` frame.
+
+    Returns the strongest periodic transit if its SNR reaches ``min_snr``,
+    else ``None``; extra keyword arguments go to ``bls.search_transit``.
+    """
+    if lc.empty or "time" not in lc or "flux" not in lc:
         return None
-    fmin = 1.0 / (baseline * 2.0)
-    fmax = 24.0  
-    freq = np.linspace(fmin, fmax, 5000)
-    try:
-        pwr = LombScargle(t, y).power(freq)
-        best = freq[np.argmax(pwr)]
-        period_days = 1.0 / best if best > 0 else None
-        return float(period_days) if period_days else None
-    except Exception as e:
-        log.info("LombScargle failed: %s", e)
+    found = search_transit(lc["time"].to_numpy(dtype=float), lc["flux"].to_numpy(dtype=float),
+                           workers=workers, **kwargs)
+    if found is None or not found.snr >= min_snr:
         return None
+    return found
+
+def guess_period_naive(lc: pd.DataFrame) -> Optional[float]:
+    # kept for existing callers: the period of find_transit's detection
+    found = find_transit(lc)
+    return found.period_days if found is not None else None
 
 def _read_table(src: Union[str, Path, bytes], *, suffix: Optional[str]) -> pd.DataFrame:
     if isinstance(src, (str, Path)):
@@ -155,46 +375,29 @@ def _read_table(src: Union[str, Path, bytes], *, suffix: Optional[str]) -> pd.Da
         sfx = p.suffix.lower()
         if sfx in {".csv", ".tsv"}:
             sep = "," if sfx == ".csv" else "\t"
-            return pd.read_csv(p, sep=sep, engine="python", low_memory=False)
+            return pd.read_csv(p, sep=sep, engine="python")
         if sfx in {".fits", ".fit"}:
-            try:
-                from astropy.io import fits
-                from astropy.table import Table
-            except Exception as e:
-                raise RuntimeError(f"FITS provided but astropy is not installed: {e}")
-            with fits.open(str(p)) as hdul:
-                h = next((h for h in hdul if getattr(h, "data", None) is not None), None)
-                if h is None:
-                    raise ValueError("No table HDU with data found in FITS.")
-                tab = Table(h.data)
-                df = tab.to_pandas()
-                df.columns = [c.decode() if isinstance(c, bytes) else c for c in df.columns]
-                return df
+            return _read_fits_table(p)
         raise ValueError(f"Unsupported file type: {sfx}")
 
     # bytes-like
     sfx = (suffix or "").lower()
     if sfx in {".csv", ".tsv"}:
         sep = "," if sfx == ".csv" else "\t"
-        return pd.read_csv(io.BytesIO(src), sep=sep, engine="python", low_memory=False)
+        return pd.read_csv(io.BytesIO(src), sep=sep, engine="python")
     if sfx in {".fits", ".fit"}:
-        try:
-            from astropy.io import fits
-            from astropy.table import Table
-        except Exception as e:
-            raise RuntimeError(f"FITS provided but astropy is not installed: {e}")
-        with fits.open(io.BytesIO(src)) as hdul:
-            h = next((h for h in hdul if getattr(h, "data", None) is not None), None)
-            if h is None:
-                raise ValueError("No table HDU with data found in FITS.")
-            tab = Table(h.data)
-            df = tab.to_pandas()
-            df.columns = [c.decode() if isinstance(c, bytes) else c for c in df.columns]
-            return df
+        return _read_fits_table(src)
 
     raise ValueError("Provide a valid suffix '.csv'|'.tsv'|'.fits' for bytes input.")
 
 
+def _read_fits_table(src: Union[Path, bytes]) -> pd.DataFrame:
+    try:
+        return fits_io.read_table(src)
+    except ImportError as e:
+        raise RuntimeError(f"FITS provided but astropy is not installed: {e}")
+
+
 def _first_present(lower_map: Dict[str, str], cands) -> Optional[str]:
     for c in cands:
         if c.lower() in lower_map:
@@ -202,34 +405,106 @@ def _first_present(lower_map: Dict[str, str], cands) -> Optional[str]:
     return None
 
 
-def _detrend(y: np.ndarray) -> np.ndarray:
+def _detrend(y: np.ndarray, method: str = "savgol") -> np.ndarray:
     y = y.astype(float)
     if y.size < 9:
         return y - np.nanmedian(y)
 
+    trend = None
+    if method == "savgol":
+        trend = _savgol_trend(y)
+    elif method == "biweight":
+        trend = _biweight_trend(y, _window(len(y)))
+    elif method == "spline":
+        trend = _spline_trend(y, _window(len(y)))
+    elif method != "median":
+        raise ValueError(f"Unknown detrend method {method!r}; expected one of {DETREND_METHODS}")
+    if trend is not None:
+        return y - trend + np.nanmedian(y)
+
+    # rolling median: method="median", and the fallback when scipy is missing or fails
+    k = _window(len(y))
+    if k >= len(y):
+        return y - np.nanmedian(y)
+    return y - _rolling_median(y, k) + np.nanmedian(y)
+
+
+def _window(n: int) -> int:
+    k = max(9, n // 50)
+    return k + 1 if k % 2 == 0 else k
+
+
+def _savgol_trend(y: np.ndarray) -> Optional[np.ndarray]:
     try:
         from scipy.signal import savgol_filter  
         win = max(9, (len(y) // 50) * 2 + 1)  
         win = min(win, len(y) - (1 - len(y) % 2))  
         poly = 2
-        trend = savgol_filter(y, window_length=win, polyorder=poly, mode="interp")
-        return y - trend + np.nanmedian(y)
+        return savgol_filter(y, window_length=win, polyorder=poly, mode="interp")
     except Exception:
-        pass
+        return None
 
-    # fallback
-    k = max(9, len(y) // 50)
-    if k % 2 == 0:
-        k += 1
-    if k >= len(y):
-        return y - np.nanmedian(y)
 
+def _rolling_median(y: np.ndarray, k: int) -> np.ndarray:
+    # centred window of k samples over the edge-padded curve, NaNs ignored; pandas keeps
+    # the window in a skip list, so this is O(n log k) instead of a median per sample
     pad = k // 2
     ypad = np.pad(y, (pad, pad), mode="edge")
-    med = np.empty_like(y)
-    for i in range(len(y)):
-        med[i] = np.nanmedian(ypad[i:i + k])
-    return y - med + np.nanmedian(y)
+    med = pd.Series(ypad).rolling(k, min_periods=1).median().to_numpy()
+    return med[k - 1:]
+
+
+def _biweight_trend(y: np.ndarray, k: int, c: float = 5.0, iters: int = 5) -> np.ndarray:
+    # Tukey biweight location of the centred k-sample window, evaluated every k // 8
+    # samples and interpolated in between (the trend is smooth on that scale), so
+    # the cost is ~8 window lengths per sample instead of k
+    from numpy.lib.stride_tricks import sliding_window_view
+
+    n, pad = len(y), k // 2
+    centers = np.unique(np.r_[np.arange(0, n, max(1, k // 8)), n - 1])
+    win = sliding_window_view(np.pad(y, (pad, pad), mode="edge"), k)[centers]
+    finite = np.isfinite(win)
+    vals = np.where(finite, win, 0.0)
+    with np.errstate(divide="ignore", invalid="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN windows
+        loc = np.nanmedian(win, axis=1)
+        for _ in range(iters):
+            dev = win - loc[:, None]
+            mad = np.nanmedian(np.abs(dev), axis=1)
+            u = dev / (c * mad[:, None])
+            w = np.where(finite & (np.abs(u) < 1), (1 - u ** 2) ** 2, 0.0)
+            sw = w.sum(axis=1)
+            loc = np.where((sw > 0) & (mad > 0), (w * vals).sum(axis=1) / sw, loc)
+    ok = np.isfinite(loc)
+    if not ok.any():
+        return np.full(n, np.nan)
+    return np.interp(np.arange(n), centers[ok], loc[ok])
+
+
+def _spline_trend(y: np.ndarray, k: int, iters: int = 3, sigma: float = 3.0) -> Optional[np.ndarray]:
+    # cubic least-squares spline with a knot every k samples, refit without >sigma outliers
+    # (transits, flares); None when scipy is missing or the fit is degenerate
+    try:
+        from scipy.interpolate import LSQUnivariateSpline
+    except Exception:
+        return None
+
+    x = np.arange(len(y), dtype=float)
+    use = np.isfinite(y)
+    trend = None
+    try:
+        for _ in range(iters):
+            xs, ys = x[use], y[use]
+            knots = np.arange(xs[0] + k, xs[-1] - k / 2, k)
+            trend = LSQUnivariateSpline(xs, ys, knots, k=3)(x)
+            resid = y - trend
+            sig = 1.4826 * np.nanmedian(np.abs(resid[use]))
+            if not (np.isfinite(sig) and sig > 0):
+                break
+            use = np.isfinite(y) & (np.abs(resid) <= sigma * sig)
+    except Exception:
+        return trend
+    return trend
 
 
 def _resample_to_fixed(t: np.ndarray, y: np.ndarray, *, resample_len: int) -> np.ndarray:
@@ -246,16 +521,17 @@ def _resample_to_fixed(t: np.ndarray, y: np.ndarray, *, resample_len: int) -> np
 
 
 def _nanfix_1d(x: np.ndarray, fill_value: float = 0.5) -> np.ndarray:
-    x = x.copy()
-    n = len(x)
-    # forward
-    for i in range(1, n):
-        if not np.isfinite(x[i]) and np.isfinite(x[i - 1]):
-            x[i] = x[i - 1]
-    # backward
-    for i in range(n - 2, -1, -1):
-        if not np.isfinite(x[i]) and np.isfinite(x[i + 1]):
-            x[i] = x[i + 1]
-    # final
-    x[~np.isfinite(x)] = fill_value
-    return x
+    # forward fill, then backward fill the leading gap; fill_value only if nothing is finite
+    x = np.array(x, copy=True)
+    finite = np.isfinite(x)
+    if finite.all():
+        return x
+    if not finite.any():
+        x[:] = fill_value
+        return x
+    # index of the most recent finite sample at every position
+    src = np.where(finite, np.arange(len(x)), 0)
+    np.maximum.accumulate(src, out=src)
+    first = int(finite.argmax())
+    src[:first] = first
+    return x[src]
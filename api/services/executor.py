@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from api.utils.constants import (
+    INFERENCE_WORKERS,
+    INFERENCE_QUEUE_INTERACTIVE,
+    INFERENCE_QUEUE_BULK,
+)
+from api.utils.timing import record
+
+log = logging.getLogger(__name__)
+
+INTERACTIVE = "interactive"
+BULK = "bulk"
+
+
+class Overloaded(RuntimeError):
+    """The lane's queue is full; the caller should answer 503 and let the client retry."""
+
+    def __init__(self, lane: str, queued: int) -> None:
+        super().__init__(f"{lane} inference queue is full ({queued} waiting)")
+        self.lane = lane
+        self.queued = queued
+
+
+@dataclass
+class _Lane:
+    name: str
+    max_queued: int
+    max_running: int
+    queue: Deque[Tuple] = field(default_factory=deque)
+    running: int = 0
+    completed: int = 0
+    rejected: int = 0
+
+
+class InferenceExecutor:
+    """Fixed pool of inference threads fed from prioritised, bounded lanes.
+
+    Lanes are listed highest priority first; a free thread always takes the
+    oldest call of the first lane that has one queued and is under its
+    ``max_running``. The bulk lane is capped below the pool size, so one
+    thread is always left for interactive calls however many large uploads
+    are in flight; with ``workers=1`` the pool gets a second thread for
+    that. ``submit`` refuses new work (``Overloaded``) once a
+    lane's queue is full instead of letting latency grow without bound.
+
+    Calls run in a copy of the caller's context, so ``stage()`` timings
+    still land in the request's Server-Timing header.
+    """
+
+    def __init__(self, workers: int = INFERENCE_WORKERS,
+                 lanes: Optional[List[Tuple[str, int, int]]] = None) -> None:
+        self.workers = max(int(workers), 1)
+        if lanes is None:
+            # bulk runs on at most workers-1 threads; a single worker still
+            # needs a thread bulk cannot take, so the pool grows by one
+            bulk_running = max(self.workers - 1, 1)
+            self.workers = max(self.workers, bulk_running + 1)
+            lanes = [
+                (INTERACTIVE, INFERENCE_QUEUE_INTERACTIVE, self.workers),
+                (BULK, INFERENCE_QUEUE_BULK, bulk_running),
+            ]
+        self._lanes: Dict[str, _Lane] = {
+            name: _Lane(name, max(int(q), 0), max(int(r), 1)) for name, q, r in lanes
+        }
+        for ln in list(self._lanes.values())[1:]:
+            if ln.max_running >= self.workers:
+                log.warning("inference lane %r may take all %d threads; higher-priority calls can wait behind it",
+                            ln.name, self.workers)
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self._stopping = False
+
+    def submit(self, lane: str, fn: Callable[..., Any], *args: Any, admit: bool = True, **kwargs: Any) -> Future:
+        """Queue ``fn(*args, **kwargs)`` on ``lane``.
+
+        ``admit=False`` skips the queue limit, for follow-up work of a call
+        that was already admitted (the next chunk of a streamed response).
+        """
+        ln = self._lanes[lane]
+        future: Future = Future()
+        item = (future, contextvars.copy_context(), fn, args, kwargs, time.perf_counter())
+        with self._cond:
+            if admit and ln.max_queued and len(ln.queue) >= ln.max_queued:
+                ln.rejected += 1
+                raise Overloaded(lane, len(ln.queue))
+            self._ensure_started()
+            ln.queue.append(item)
+            self._cond.notify()
+        return future
+
+    async def run(self, lane: str, fn: Callable[..., Any], *args: Any, admit: bool = True, **kwargs: Any) -> Any:
+        return await asyncio.wrap_future(self.submit(lane, fn, *args, admit=admit, **kwargs))
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        with self._cond:
+            return {
+                ln.name: {
+                    "queued": len(ln.queue),
+                    "running": ln.running,
+                    "completed": ln.completed,
+                    "rejected": ln.rejected,
+                    "max_queued": ln.max_queued,
+                    "max_running": ln.max_running,
+                }
+                for ln in self._lanes.values()
+            }
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+            threads, self._threads = self._threads, []
+        for t in threads:
+            t.join(timeout=5)
+        with self._cond:
+            self._stopping = False
+
+    def _ensure_started(self) -> None:
+        # caller holds self._cond; threads start on first use, never at import
+        # (a pre-fork master must stay single-threaded)
+        if self._threads:
+            return
+        for i in range(self.workers):
+            t = threading.Thread(target=self._run, name=f"inference-{i}", daemon=True)
+            t.start()
+            self._threads.append(t)
+
+    def _next(self) -> Optional[Tuple[_Lane, Tuple]]:
+        for ln in self._lanes.values():
+            if ln.queue and ln.running < ln.max_running:
+                ln.running += 1
+                return ln, ln.queue.popleft()
+        return None
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                picked = self._next()
+                while picked is None:
+                    if self._stopping:
+                        return
+                    self._cond.wait()
+                    picked = self._next()
+            ln, (future, ctx, fn, args, kwargs, queued_at) = picked
+            try:
+                if future.set_running_or_notify_cancel():
+                    ctx.run(self._call, ln.name, future, fn, args, kwargs, queued_at)
+            finally:
+                with self._cond:
+                    ln.running -= 1
+                    ln.completed += 1
+                    self._cond.notify()
+
+    @staticmethod
+    def _call(lane: str, future: Future, fn: Callable[..., Any], args, kwargs, queued_at: float) -> None:
+        record(f"queue_{lane}", time.perf_counter() - queued_at)
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+
+EXECUTOR = InferenceExecutor()
@@ -0,0 +1,126 @@
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, FrozenSet, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+log = logging.getLogger(__name__)
+
+R_SUN_IN_R_EARTH = 109.16  # 1 R_sun ≈ 109.16 R_earth
+
+
+@dataclass(frozen=True)
+class DerivedFeature:
+    """One engineered column: ``target = fn(*sources)``.
+
+    ``fn`` receives float64 arrays for ``sources`` plus a per-call scratch
+    dict for intermediates shared between kernels (e.g. sqrt(depth)).
+    """
+    target: str
+    sources: Tuple[str, ...]
+    fn: Callable[..., np.ndarray]
+
+
+def _k_from_depth(scratch: Dict[str, np.ndarray], depth: np.ndarray) -> np.ndarray:
+    k = scratch.get("k")
+    if k is None:
+        k = scratch["k"] = np.sqrt(depth / 1e6)
+    return k
+
+
+# Dependency order matters: k_vs_rp reads k_est after it has been computed.
+DERIVED_FEATURES: Tuple[DerivedFeature, ...] = (
+    DerivedFeature("log_period", ("period_days",),
+                   lambda s, p: np.log10(np.clip(p, 0.1, None))),
+    DerivedFeature("log_duration", ("duration_hours",),
+                   lambda s, d: np.log10(np.clip(d, 0.1, None))),
+    DerivedFeature("log_teff", ("stellar_teff_k",),
+                   lambda s, t: np.log10(np.clip(t, 1000, None))),
+    DerivedFeature("dur_over_p13", ("duration_hours", "period_days"),
+                   lambda s, d, p: d / ((p * 24) ** (1 / 3))),
+    DerivedFeature("duration_ratio", ("duration_hours", "period_days"),
+                   lambda s, d, p: d / (p * 24)),
+    DerivedFeature("k_est", ("depth_ppm", "stellar_radius_rsun"),
+                   lambda s, depth, r: _k_from_depth(s, depth)),
+    DerivedFeature("rp_est_rearth", ("depth_ppm", "stellar_radius_rsun"),
+                   lambda s, depth, r: _k_from_depth(s, depth) * (r * R_SUN_IN_R_EARTH)),
+    DerivedFeature("depth_over_rstar", ("depth_ppm", "stellar_radius_rsun"),
+                   lambda s, depth, r: depth / (r * 1e6)),
+    DerivedFeature("k_vs_rp", ("k_est", "rp_rearth"),
+                   lambda s, k, rp: k / np.clip(rp, 0.1, None)),
+    DerivedFeature("insolation_rel_earth", ("insolation_earth",),
+                   lambda s, i: np.log10(np.clip(i, 0.01, None))),
+    DerivedFeature("period_rounded", ("period_days",),
+                   lambda s, p: np.round(p, 1)),
+)
+
+
+def _as_float(col: pd.Series) -> np.ndarray:
+    if col.dtype == "object":
+        col = pd.to_numeric(col, errors="coerce")
+    return col.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+class FeaturePlan:
+    """Feature alignment compiled once per ``feature_list.json``.
+
+    ``matrix(df)`` writes every model feature straight into a preallocated
+    float64 array: input columns are coerced to numbers, derived columns are
+    computed in dependency order, anything else stays NaN. The input frame
+    is never copied.
+    """
+
+    def __init__(self, features: Sequence[str]) -> None:
+        self.features: Tuple[str, ...] = tuple(features)
+        self.index: Dict[str, int] = {c: i for i, c in enumerate(self.features)}
+        self.feature_set: FrozenSet[str] = frozenset(self.features)
+        self.derived: Tuple[DerivedFeature, ...] = tuple(
+            k for k in DERIVED_FEATURES if k.target in self.feature_set
+        )
+
+    def __len__(self) -> int:
+        return len(self.features)
+
+    def matrix(self, df: pd.DataFrame) -> np.ndarray:
+        n = len(df)
+        out = np.full((n, len(self.features)), np.nan, dtype=np.float64, order="F")
+        columns = set(df.columns)
+
+        for name in columns & self.feature_set:
+            out[:, self.index[name]] = _as_float(df[name])
+
+        values: Dict[str, np.ndarray] = {}
+        computed: List[str] = []
+        scratch: Dict[str, np.ndarray] = {}
+
+        def source(name: str) -> np.ndarray:
+            arr = values.get(name)
+            if arr is None:
+                idx = self.index.get(name)
+                arr = out[:, idx] if idx is not None else _as_float(df[name])
+                values[name] = arr
+            return arr
+
+        try:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                for k in self.derived:
+                    if not all(s in self.feature_set or s in columns for s in k.sources):
+                        continue
+                    res = k.fn(scratch, *(source(s) for s in k.sources))
+                    out[:, self.index[k.target]] = res
+                    values[k.target] = out[:, self.index[k.target]]
+                    computed.append(k.target)
+        except Exception as e:
+            log.warning("Error computing derived features (computed %s): %s", computed, e)
+
+        return out
+
+    def frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        return pd.DataFrame(self.matrix(df), index=df.index, columns=list(self.features), copy=False)
+
+
+def compile_feature_plan(features: Sequence[str]) -> FeaturePlan:
+    return FeaturePlan(features)
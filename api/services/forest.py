@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Optional, Tuple, Union
+
+import numpy as np
+
+# Packed forest: every tree of a fitted scikit-learn forest flattened into one
+# array of fixed-size node records,
+#
+#     feature        int32    split feature (0 for leaves)
+#     threshold      float64  split threshold; +inf for leaves
+#     left           int32    global index of the left child; the right child is left + 1,
+#                             a leaf points at itself
+#     missing_right  uint8    1 where NaN goes right (sklearn's missing_go_to_left == 0)
+#
+# plus a (nodes, classes) table of normalized leaf class fractions. Scoring walks
+# all trees for a block of rows at once: each step is one gather of the current
+# node records and one comparison, for every (row, tree) still above a leaf.
+# Rows go left where float32(x) <= threshold, as in scikit-learn, so the walk
+# reaches the same leaves and probabilities differ only in summation order.
+#
+# ``fold_scaler`` rewrites the thresholds into raw feature units: a folded forest
+# takes the untransformed float64 matrix and goes left exactly where the original
+# would after StandardScaler, so scoring skips the preprocessing pass.
+
+NODE_DTYPE = np.dtype([
+    ("feature", "<i4"),
+    ("threshold", "<f8"),
+    ("left", "<i4"),
+    ("missing_right", "u1"),
+])
+
+FORMAT = "starharbor-packed-forest"
+VERSION = 2  # v1 stored float32 thresholds (rounded down), still readable
+
+PathLike = Union[str, Path]
+
+
+def _bfs_order(children_left: np.ndarray, children_right: np.ndarray) -> np.ndarray:
+    """Node ids in an order where every internal node's children are adjacent (left first)."""
+    order = [0]
+    level = np.array([0])
+    while len(level):
+        internal = level[children_left[level] != -1]
+        level = np.column_stack([children_left[internal], children_right[internal]]).ravel()
+        order.extend(level.tolist())
+    return np.asarray(order, dtype=np.int64)
+
+
+def file_sha256(path: PathLike) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class PackedForest:
+    """Vectorized ``predict_proba`` over a forest packed by ``pack_forest``."""
+
+    def __init__(self, nodes: np.ndarray, values: np.ndarray, roots: np.ndarray,
+                 classes: np.ndarray, n_features: int, depth: int, source: str = "",
+                 folded: bool = False) -> None:
+        self.nodes = nodes.astype(NODE_DTYPE, copy=False)
+        self.values = values
+        self.roots = roots
+        self.classes_ = classes
+        self.n_features_in_ = int(n_features)
+        self.depth = int(depth)
+        self.source = source
+        self.folded = bool(folded)  # expects raw (unscaled) features
+        # contiguous per-field copies: one gather each is cheaper than gathering whole records
+        self._feature = np.ascontiguousarray(nodes["feature"]).astype(np.intp)
+        self._threshold = np.ascontiguousarray(nodes["threshold"])
+        self._left = np.ascontiguousarray(nodes["left"]).astype(np.intp)
+        self._missing_right = nodes["missing_right"].astype(bool)
+        self._leaf = self._left == np.arange(len(nodes))
+
+    @property
+    def n_trees(self) -> int:
+        return int(len(self.roots))
+
+    def predict_proba(self, X: Any, block_rows: int = 256) -> np.ndarray:
+        if self.folded:
+            X = np.asarray(X, dtype=np.float64)
+            if np.isinf(X).any():  # StandardScaler.transform would have refused it
+                raise ValueError("Input X contains infinity or a value too large for dtype('float64').")
+        else:
+            X = np.asarray(X, dtype=np.float32).astype(np.float64)
+        if X.ndim != 2 or X.shape[1] != self.n_features_in_:
+            raise ValueError(f"X has shape {X.shape}, expected (n, {self.n_features_in_})")
+        out = np.empty((len(X), self.values.shape[1]), dtype=np.float64)
+        for start in range(0, len(X), block_rows):
+            out[start:start + block_rows] = self._block(np.ascontiguousarray(X[start:start + block_rows]))
+        return out
+
+    def predict(self, X: Any) -> np.ndarray:
+        return self.classes_[self.predict_proba(X).argmax(axis=1)]
+
+    def _block(self, X: np.ndarray) -> np.ndarray:
+        n, n_features = X.shape
+        T = self.n_trees
+        flat = X.ravel()
+        has_nan = bool(np.isnan(flat).any())
+        idx = np.tile(self.roots, n)                                    # (row, tree) -> reached node
+        # walk only the (row, tree) pairs still above a leaf, compacted as they finish
+        pos = np.flatnonzero(~self._leaf[idx])
+        cur = idx[pos]
+        offset = (pos // T) * n_features
+        while len(cur):
+            x = flat[offset + self._feature[cur]]
+            right = x > self._threshold[cur]
+            if has_nan:
+                right |= np.isnan(x) & self._missing_right[cur]
+            cur = self._left[cur] + right
+            done = self._leaf[cur]
+            if done.any():
+                idx[pos[done]] = cur[done]
+                keep = ~done
+                pos, cur, offset = pos[keep], cur[keep], offset[keep]
+        proba = self.values[idx].reshape(n, T, -1).sum(axis=1)
+        proba /= T
+        return proba
+
+    # ── persistence ───────────────────────────────────────
+    def save(self, path: PathLike) -> Path:
+        """``np.savez`` archive (no pickles); written to a temp name and renamed."""
+        path = Path(path)
+        meta = {
+            "format": FORMAT,
+            "version": VERSION,
+            "n_features": self.n_features_in_,
+            "depth": self.depth,
+            "source": self.source,
+            "folded": self.folded,
+        }
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.savez(f, nodes=self.nodes, values=self.values, roots=self.roots,
+                     classes=self.classes_, meta=np.array(json.dumps(meta)))
+        os.replace(tmp, path)
+        return path
+
+    @classmethod
+    def load(cls, path: PathLike) -> "PackedForest":
+        with np.load(path, allow_pickle=False) as z:
+            meta = json.loads(str(z["meta"]))
+            if meta.get("format") != FORMAT or int(meta.get("version", 0)) > VERSION:
+                raise ValueError(f"{path} is not a v{VERSION} packed forest")
+            return cls(z["nodes"], z["values"], z["roots"], z["classes"],
+                       meta["n_features"], meta["depth"], meta.get("source", ""),
+                       folded=meta.get("folded", False))
+
+
+def pack_forest(model: Any, source: str = "") -> PackedForest:
+    """Pack a fitted single-output scikit-learn forest classifier (RandomForest, ExtraTrees)."""
+    estimators = getattr(model, "estimators_", None)
+    if not estimators or not hasattr(model, "predict_proba"):
+        raise TypeError(f"{type(model).__name__} is not a fitted forest classifier")
+    if getattr(model, "n_outputs_", 1) != 1:
+        raise TypeError("multi-output forests are not supported")
+
+    nodes, values, roots = [], [], []
+    base = 0
+    for est in estimators:
+        tree = est.tree_
+        order = _bfs_order(tree.children_left, tree.children_right)
+        pos = np.empty(tree.node_count, dtype=np.int64)
+        pos[order] = base + np.arange(len(order))
+
+        left = tree.children_left[order]
+        leaf = left == -1
+        rec = np.zeros(len(order), dtype=NODE_DTYPE)
+        rec["feature"] = np.where(leaf, 0, tree.feature[order])
+        rec["threshold"] = np.where(leaf, np.inf, tree.threshold[order])
+        rec["left"] = np.where(leaf, pos[order], pos[np.where(leaf, 0, left)])
+        missing_left = getattr(tree, "missing_go_to_left", None)
+        if missing_left is not None:
+            rec["missing_right"] = np.where(leaf, 0, missing_left[order] == 0)
+
+        v = tree.value[order, 0, :].astype(np.float64)
+        norm = v.sum(axis=1, keepdims=True)
+        norm[norm == 0] = 1.0
+        nodes.append(rec)
+        values.append(v / norm)
+        roots.append(base)
+        base += len(order)
+
+    return PackedForest(
+        nodes=np.concatenate(nodes),
+        values=np.concatenate(values),
+        roots=np.asarray(roots, dtype=np.int32),
+        classes=np.asarray(model.classes_),
+        n_features=model.n_features_in_,
+        depth=max(est.tree_.max_depth for est in estimators),
+        source=source,
+    )
+
+
+def _float_key(a: np.ndarray) -> np.ndarray:
+    """float64 -> int64 with the same ordering (its own inverse)."""
+    bits = a.view(np.int64)
+    return bits ^ ((bits >> 63) & np.int64(0x7FFFFFFFFFFFFFFF))
+
+
+def _scaler_params(scaler: Any, n_features: int) -> Tuple[np.ndarray, np.ndarray]:
+    if not foldable(scaler):
+        raise TypeError(f"only a fitted StandardScaler can be folded, not {type(scaler).__name__}")
+    if scaler.n_features_in_ != n_features:
+        raise ValueError(f"scaler has {scaler.n_features_in_} features, forest {n_features}")
+    mean = np.asarray(scaler.mean_, dtype=np.float64) if scaler.with_mean else np.zeros(n_features)
+    scale = np.asarray(scaler.scale_, dtype=np.float64) if scaler.with_std else np.ones(n_features)
+    return mean, scale
+
+
+def foldable(scaler: Any) -> bool:
+    return type(scaler).__name__ == "StandardScaler" and hasattr(scaler, "n_features_in_")
+
+
+def fold_scaler(packed: PackedForest, scaler: Any) -> PackedForest:
+    """``packed`` rewritten to take raw features, with ``scaler`` folded into the thresholds.
+
+    A row goes left where float32((x - mean) / scale) <= threshold. That is
+    monotone in x, so per split it holds exactly for x <= some float64 x*;
+    x* is found by bisecting the float64 bit patterns (64 steps, all splits
+    at once) with the scaler's own arithmetic, so the folded forest goes left
+    for exactly the same raw values, not just approximately.
+    """
+    if packed.folded:
+        raise ValueError("forest is already folded")
+    mean, scale = _scaler_params(scaler, packed.n_features_in_)
+    internal = np.flatnonzero(~packed._leaf)
+    f = packed._feature[internal]
+    m, sc, thr = mean[f], scale[f], packed._threshold[internal]
+
+    lo = np.full(len(internal), _float_key(np.array([-np.inf]))[0])  # always goes left
+    hi = np.full(len(internal), _float_key(np.array([np.inf]))[0])   # never does
+    with np.errstate(over="ignore", invalid="ignore"):
+        for _ in range(64):
+            mid = (lo >> 1) + (hi >> 1) + (lo & hi & 1)
+            x = _float_key(mid).view(np.float64)
+            left = ((x - m) / sc).astype(np.float32) <= thr
+            lo = np.where(left, mid, lo)
+            hi = np.where(left, hi, mid)
+
+    nodes = packed.nodes.copy()
+    nodes["threshold"][internal] = _float_key(lo).view(np.float64)
+    return PackedForest(nodes, packed.values, packed.roots, packed.classes_, packed.n_features_in_,
+                        packed.depth, packed.source, folded=True)
+
+
+def source_id(*paths: Optional[Path]) -> str:
+    return "+".join(file_sha256(p) if p is not None and p.exists() else "" for p in paths)
+
+
+def load_or_pack(model: Any, packed_path: Path, source_path: Optional[Path] = None,
+                 scaler: Any = None, scaler_path: Optional[Path] = None) -> PackedForest:
+    """The packed file when it was built from these artifacts, else a fresh pack of ``model``.
+
+    With ``scaler`` the result is folded (takes raw features); ``scaler_path``
+    is then part of the source the file must match.
+    """
+    source = source_id(source_path, scaler_path) if scaler is not None else source_id(source_path)
+    if packed_path.exists():
+        try:
+            packed = PackedForest.load(packed_path)
+            if packed.source == source and packed.folded == (scaler is not None):
+                return packed
+        except ValueError:
+            pass  # another format version; rebuild
+    packed = pack_forest(model, source=source)
+    return fold_scaler(packed, scaler) if scaler is not None else packed
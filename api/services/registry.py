@@ -0,0 +1,485 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import joblib
+import numpy as np
+
+from api.services.features import FeaturePlan, compile_feature_plan
+from api.services.forest import PackedForest, foldable, load_or_pack
+from api.utils import feature_store
+from api.utils.constants import (
+    MODELS_DIR,
+    PREPROCESSOR_PATH,
+    FEATURE_LIST_PATH,
+    TARGET_MAP_PATH,
+    TAB_MODEL_PATH,
+    TAB_PACKED_PATH,
+    TAB_BACKEND,
+    TAB_FOLD_SCALER,
+    FUSE_MODEL_PATH,
+    SCALER_PATH,
+    CNN_ONNX_PATH,
+    PARAMS_JSON_PATH,
+    X_VAL_PATH,
+    Y_VAL_PATH,
+)
+
+log = logging.getLogger(__name__)
+
+DEFAULT_TARGET_MAP: Tuple[str, ...] = ("fp", "candidate", "confirmed")
+
+# packed and sklearn probabilities only differ by summation order
+PACKED_TOLERANCE = 1e-9
+
+# files whose change triggers a reload when the watcher is on
+WATCHED_ARTIFACTS: Tuple[str, ...] = (
+    "preprocessor.pkl",
+    "feature_list.json",
+    "target_map.json",
+    "tab_xgb.pkl",
+    "cnn.onnx",
+    "fuse.joblib",
+    "scaler.bin",
+    "params.json",
+)
+
+# artifacts ``load_bundle`` reads, all hashed into the bundle version
+VERSIONED_ARTIFACTS: Tuple[str, ...] = (
+    "features", "preprocessor", "tab_model", "target_map", "cnn", "fuse", "curve_scaler", "params",
+)
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """Immutable set of artifacts that serve one model version.
+
+    Routers receive a bundle per request and pass it down to the pipeline,
+    so every stage of a request sees the same preprocessor/model pair.
+    """
+    version: str
+    features: Tuple[str, ...]
+    preprocessor: Any
+    tab_model: Any
+    target_map: Optional[Tuple[str, ...]] = None
+    cnn_session: Any = None
+    curve_scaler: Any = None
+    fuse: Any = None
+    params: Mapping[str, Any] = field(default_factory=lambda: MappingProxyType({}))
+    source_dir: Optional[Path] = None
+    plan: Optional[FeaturePlan] = None
+    packed_forest: Optional[PackedForest] = None
+    cnn_input: Optional[Tuple[str, Tuple[Any, ...]]] = None  # (name, shape) of the ONNX input
+
+    def __post_init__(self) -> None:
+        if self.plan is None:
+            object.__setattr__(self, "plan", compile_feature_plan(self.features))
+        if self.cnn_input is None and self.cnn_session is not None:
+            inp = self.cnn_session.get_inputs()[0]
+            object.__setattr__(self, "cnn_input", (inp.name, tuple(inp.shape)))
+
+    @property
+    def classes(self) -> Optional[list]:
+        return list(self.target_map) if self.target_map else None
+
+
+def _load_json(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except Exception:
+        return {}
+
+
+def _load_target_map(path: Path) -> Optional[Tuple[str, ...]]:
+    if not path.exists():
+        return None
+    try:
+        target_dict = json.loads(path.read_text(encoding="utf-8"))
+        # index -> class name
+        names = [""] * len(target_dict)
+        for class_name, idx in target_dict.items():
+            names[idx] = class_name
+        return tuple(names)
+    except Exception as e:
+        log.warning("Failed to load target map: %s", e)
+        return DEFAULT_TARGET_MAP
+
+
+def _load_cnn_session(path: Path):
+    try:
+        import onnxruntime as ort  # type: ignore
+    except Exception as e:
+        log.info("onnxruntime not available, curve model disabled: %s", e)
+        return None
+
+    if not path.exists():
+        log.info("CNN_ONNX_PATH not found: %s", path)
+        return None
+    try:
+        log.info("Loading ONNX model: %s", path)
+        return ort.InferenceSession(str(path), providers=["CPUExecutionProvider"])
+    except Exception as e:
+        log.warning("Failed to load ONNX model %s: %s", path, e)
+        return None
+
+
+def _load_optional_joblib(path: Path, what: str):
+    if not path.exists():
+        return None
+    try:
+        log.info("Loading %s: %s", what, path)
+        return joblib.load(path)
+    except Exception as e:
+        log.warning("Failed to load %s %s: %s", what, path, e)
+        return None
+
+
+def _artifacts_version(paths) -> str:
+    h = hashlib.sha256()
+    for p in paths:
+        h.update(p.name.encode("utf-8"))
+        if p.exists():
+            h.update(p.read_bytes())
+    return h.hexdigest()[:12]
+
+
+def artifact_paths(models_dir: Optional[Path] = None) -> Dict[str, Path]:
+    """Artifact locations for ``models_dir``; ``None`` means the configured
+    paths from api.utils.constants (including their ENV overrides)."""
+    if models_dir is None or Path(models_dir).resolve() == MODELS_DIR:
+        return {
+            "preprocessor": PREPROCESSOR_PATH,
+            "features": FEATURE_LIST_PATH,
+            "target_map": TARGET_MAP_PATH,
+            "tab_model": TAB_MODEL_PATH,
+            "tab_packed": TAB_PACKED_PATH,
+            "fuse": FUSE_MODEL_PATH,
+            "curve_scaler": SCALER_PATH,
+            "cnn": CNN_ONNX_PATH,
+            "params": PARAMS_JSON_PATH,
+            "x_val": X_VAL_PATH,
+            "y_val": Y_VAL_PATH,
+        }
+    d = Path(models_dir).resolve()
+    return {
+        "preprocessor": d / "preprocessor.pkl",
+        "features": d / "feature_list.json",
+        "target_map": d / "target_map.json",
+        "tab_model": d / "tab_xgb.pkl",
+        "tab_packed": d / "tab_packed.npz",
+        "fuse": d / "fuse.joblib",
+        "curve_scaler": d / "scaler.bin",
+        "cnn": d / "cnn.onnx",
+        "params": d / "params.json",
+        "x_val": d / "X_val.parquet",
+        "y_val": d / "y_val.parquet",
+    }
+
+
+def _load_packed_forest(tab_model: Any, preprocessor: Any, paths: Dict[str, Path]) -> Optional[PackedForest]:
+    if TAB_BACKEND == "sklearn":
+        return None
+    # a folded forest takes raw features, so packed calls skip preprocessor.transform
+    scaler = preprocessor if TAB_FOLD_SCALER and foldable(preprocessor) else None
+    try:
+        packed = load_or_pack(tab_model, paths["tab_packed"], paths["tab_model"], scaler, paths["preprocessor"])
+    except Exception as e:
+        log.warning("TAB_BACKEND=%s but the tabular model cannot be packed, using sklearn: %s", TAB_BACKEND, e)
+        return None
+    log.info("Packed forest ready: %d trees, %d nodes, scaler folded: %s",
+             packed.n_trees, len(packed.nodes), packed.folded)
+    return packed
+
+
+def load_bundle(models_dir: Optional[Path] = None) -> ModelBundle:
+    """Read every model artifact from disk and return a ready bundle.
+
+    Tabular artifacts are required; curve/fuse artifacts are optional and
+    come back as ``None`` when missing or unreadable.
+    """
+    paths = artifact_paths(models_dir)
+    features = tuple(json.loads(paths["features"].read_text(encoding="utf-8")))
+    preprocessor = joblib.load(paths["preprocessor"])
+    tab_model = joblib.load(paths["tab_model"])
+    target_map = _load_target_map(paths["target_map"])
+
+    params = _load_json(paths["params"]) if paths["params"].exists() else {}
+
+    return ModelBundle(
+        version=_artifacts_version([paths[k] for k in VERSIONED_ARTIFACTS]),
+        features=features,
+        preprocessor=preprocessor,
+        tab_model=tab_model,
+        target_map=target_map,
+        cnn_session=_load_cnn_session(paths["cnn"]),
+        curve_scaler=_load_optional_joblib(paths["curve_scaler"], "curve scaler"),
+        fuse=_load_optional_joblib(paths["fuse"], "fuse model"),
+        params=MappingProxyType(dict(params)),
+        source_dir=paths["tab_model"].parent,
+        packed_forest=_load_packed_forest(tab_model, preprocessor, paths),
+    )
+
+
+def validate_bundle(bundle: ModelBundle, models_dir: Optional[Path] = None) -> Dict[str, Any]:
+    """Smoke-test a freshly loaded bundle before it goes live.
+
+    Checks that the preprocessor/model agree with ``feature_list.json`` and,
+    when ``X_val`` is present (feature store or Parquet), scores it and checks
+    the probabilities.
+    Raises ``ValueError`` when the bundle must not be activated.
+    """
+    n_features = len(bundle.features)
+    for name, obj in (("preprocessor", bundle.preprocessor), ("tab_model", bundle.tab_model)):
+        n_in = getattr(obj, "n_features_in_", None)
+        if n_in is not None and int(n_in) != n_features:
+            raise ValueError(f"{name} expects {n_in} features, feature_list.json has {n_features}")
+
+    paths = artifact_paths(models_dir)
+    if not (paths["x_val"].exists() or feature_store.exists(paths["x_val"])):
+        log.info("No %s, skipping validation scoring", paths["x_val"])
+        return {"validated": False}
+
+    # memory-mapped X_val.npy when retraining wrote one in float64, else the Parquet split:
+    # a float32 store would score rounded inputs
+    X_val = feature_store.read_matrix(paths["x_val"], dtype=np.float64)
+    missing = [c for c in bundle.features if c not in X_val.columns]
+    if missing:
+        raise ValueError(f"X_val is missing feature columns: {missing[:5]}")
+    # float64 like FeaturePlan.matrix, whatever dtype the store was written in
+    X_val = X_val[list(bundle.features)].astype(np.float64)
+
+    X_tr = bundle.preprocessor.transform(X_val)
+    proba = np.asarray(bundle.tab_model.predict_proba(X_tr))
+    n_classes = len(bundle.target_map) if bundle.target_map else proba.shape[1]
+    if proba.shape != (len(X_val), n_classes):
+        raise ValueError(f"Unexpected proba shape {proba.shape} on X_val")
+    if not np.all(np.isfinite(proba)) or not np.allclose(proba.sum(axis=1), 1.0, atol=1e-6):
+        raise ValueError("Model produced invalid probabilities on X_val")
+
+    report: Dict[str, Any] = {"validated": True, "n_val": int(len(X_val))}
+    if bundle.packed_forest is not None:
+        packed = bundle.packed_forest
+        diff = float(np.abs(packed.predict_proba(X_val.to_numpy() if packed.folded else X_tr) - proba).max())
+        if diff > PACKED_TOLERANCE:
+            raise ValueError(f"Packed forest disagrees with the model on X_val (max |dp| = {diff:.3g})")
+        report["packed_max_abs_diff"] = diff
+    if paths["y_val"].exists() or feature_store.exists(paths["y_val"]):
+        y_val = feature_store.read_matrix(paths["y_val"])["target"].to_numpy()
+        if len(y_val) == len(proba):
+            report["val_accuracy"] = float(np.mean(proba.argmax(axis=1) == y_val))
+    return report
+
+
+class ModelRegistry:
+    """Holds the active :class:`ModelBundle`.
+
+    ``load()`` is called once from the FastAPI lifespan; concurrent callers
+    that arrive before it finishes wait on the lock instead of loading the
+    artifacts again. ``reload()`` builds and validates a new bundle off to
+    the side and then swaps the reference in one assignment, so requests
+    never wait on it and never see a mix of old and new artifacts.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        self._bundle: Optional[ModelBundle] = None
+        self._error: Optional[str] = None
+        self._loaded_at: Optional[float] = None
+        self._last_reload: Dict[str, Any] = {}
+        self._on_swap: List[Callable[[ModelBundle], None]] = []
+
+    @property
+    def ready(self) -> bool:
+        return self._bundle is not None
+
+    @property
+    def reloading(self) -> bool:
+        return self._reload_lock.locked()
+
+    def load(self) -> ModelBundle:
+        bundle = self._bundle
+        if bundle is not None:
+            return bundle
+        with self._lock:
+            if self._bundle is None:
+                try:
+                    self._bundle = load_bundle()
+                    self._loaded_at = time.time()
+                    self._error = None
+                    log.info("Model bundle loaded: version=%s", self._bundle.version)
+                except Exception as e:
+                    self._error = str(e)
+                    raise
+            return self._bundle
+
+    def get(self) -> ModelBundle:
+        return self._bundle or self.load()
+
+    def on_swap(self, fn: Callable[[ModelBundle], None]) -> None:
+        """Call ``fn(new_bundle)`` after every successful swap (e.g. to drop per-version caches)."""
+        self._on_swap.append(fn)
+
+    def reload(self, models_dir: Optional[Path] = None, *, validate: bool = True) -> ModelBundle:
+        """Load artifacts from ``models_dir`` and make them the active bundle.
+
+        On any load/validation error the current bundle stays active and the
+        exception is re-raised.
+        """
+        with self._reload_lock:
+            started = time.time()
+            try:
+                new = load_bundle(models_dir)
+                current = self._bundle
+                if current is not None and current.version == new.version:
+                    self._last_reload = {"status": "unchanged", "version": new.version, "at": started}
+                    return current
+                report = validate_bundle(new, models_dir) if validate else {"validated": False}
+            except Exception as e:
+                log.warning("Model reload failed, keeping current bundle: %s", e)
+                self._last_reload = {"status": "failed", "error": str(e), "at": started}
+                raise
+
+            previous = self._bundle
+            self._bundle = new
+            self._loaded_at = time.time()
+            self._error = None
+            self._last_reload = {
+                "status": "swapped",
+                "version": new.version,
+                "previous": previous.version if previous else None,
+                "seconds": round(self._loaded_at - started, 3),
+                "at": started,
+                **report,
+            }
+            log.info("Model bundle swapped: %s -> %s", self._last_reload["previous"], new.version)
+            for fn in self._on_swap:
+                try:
+                    fn(new)
+                except Exception as e:
+                    log.warning("Model swap hook %r failed: %s", fn, e)
+            return new
+
+    def reload_in_background(self, models_dir: Optional[Path] = None) -> bool:
+        """Start ``reload()`` on a daemon thread; ``False`` if one is running."""
+        if self.reloading:
+            return False
+
+        def _run():
+            try:
+                self.reload(models_dir)
+            except Exception:
+                pass  # already logged and recorded in status()
+
+        threading.Thread(target=_run, name="model-reload", daemon=True).start()
+        return True
+
+    def after_fork(self, model_jobs: Optional[int] = 1) -> None:
+        """Prepare an inherited bundle for use in a forked worker process.
+
+        The preprocessor and forest are plain memory and stay shared with the
+        parent copy-on-write. An ONNX Runtime session owns a thread pool that
+        does not survive ``fork()``, so the worker opens its own. ``model_jobs``
+        caps the forest's ``n_jobs``: with one process per core, per-request
+        threads would only compete with the other workers.
+        """
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()
+        bundle = self._bundle
+        if bundle is None:
+            return
+        if model_jobs is not None and hasattr(bundle.tab_model, "n_jobs"):
+            bundle.tab_model.n_jobs = model_jobs
+        if bundle.cnn_session is not None:
+            session = _load_cnn_session(artifact_paths(bundle.source_dir)["cnn"])
+            self._bundle = replace(bundle, cnn_session=session)
+
+    def status(self) -> Dict[str, Any]:
+        bundle = self._bundle
+        return {
+            "ready": bundle is not None,
+            "version": bundle.version if bundle else None,
+            "loaded_at": self._loaded_at,
+            "curve_model": bool(bundle and bundle.cnn_session is not None),
+            "reloading": self.reloading,
+            "last_reload": dict(self._last_reload) or None,
+            "error": self._error,
+        }
+
+
+def _artifacts_signature(models_dir: Path) -> Tuple:
+    sig = []
+    for name in WATCHED_ARTIFACTS:
+        p = models_dir / name
+        try:
+            st = p.stat()
+            sig.append((name, st.st_mtime_ns, st.st_size))
+        except FileNotFoundError:
+            sig.append((name, None, None))
+    return tuple(sig)
+
+
+class ArtifactWatcher:
+    """Polls MODELS_DIR and reloads the registry when artifacts change.
+
+    A change must be seen on two consecutive polls with the same signature
+    before reloading, so a retrain that is still writing files is not picked
+    up halfway.
+    """
+
+    def __init__(self, registry: "ModelRegistry", models_dir: Path = MODELS_DIR, interval: float = 5.0) -> None:
+        self.registry = registry
+        self.models_dir = Path(models_dir)
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._active = _artifacts_signature(self.models_dir)
+        self._pending: Optional[Tuple] = None
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+        log.info("Watching %s for model changes every %.1fs", self.models_dir, self.interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def poll(self) -> bool:
+        """One check of ``models_dir``; ``True`` when it swapped in a new bundle."""
+        sig = _artifacts_signature(self.models_dir)
+        if sig == self._active:
+            self._pending = None
+            return False
+        if sig != self._pending:
+            self._pending = sig  # still changing; wait for it to settle
+            return False
+        self._active, self._pending = sig, None
+        before = self.registry.status()["version"]
+        try:
+            return self.registry.reload(self.models_dir).version != before
+        except Exception:
+            return False  # keep serving the current bundle; retry on next change
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll()
+
+
+REGISTRY = ModelRegistry()
+
+
+def get_bundle() -> ModelBundle:
+    return REGISTRY.get()
@@ -19,12 +19,82 @@ FEATURE_LIST_PATH: Path = MODELS_DIR / "feature_list.json"
 TARGET_MAP_PATH: Path = Path(os.getenv("TARGET_MAP_PATH", MODELS_DIR / "target_map.json")).resolve()
 
 TAB_MODEL_PATH: Path = MODELS_DIR / "tab_xgb.pkl"
+TAB_PACKED_PATH: Path = MODELS_DIR / "tab_packed.npz"
 FUSE_MODEL_PATH: Path = Path(os.getenv("FUSE_MODEL_PATH", MODELS_DIR / "fuse.joblib")).resolve()
 SCALER_PATH: Path = Path(os.getenv("SCALER_PATH", MODELS_DIR / "scaler.bin")).resolve()
 
 CNN_ONNX_PATH: Path = Path(os.getenv("CNN_ONNX_PATH", MODELS_DIR / "cnn.onnx")).resolve()
 PARAMS_JSON_PATH: Path = Path(os.getenv("PARAMS_JSON_PATH", MODELS_DIR / "params.json")).resolve()
 
+X_VAL_PATH: Path = MODELS_DIR / "X_val.parquet"
+Y_VAL_PATH: Path = MODELS_DIR / "y_val.parquet"
+
+# seconds between MODELS_DIR polls for hot reload; 0 disables the watcher
+MODEL_WATCH_INTERVAL: float = float(os.getenv("MODEL_WATCH_INTERVAL", "0") or 0)
+ADMIN_TOKEN: str = os.getenv("ADMIN_TOKEN", "")
+
+# /inference/predict micro-batching; a window of 0 disables it
+PREDICT_BATCH_WINDOW_MS: float = float(os.getenv("PREDICT_BATCH_WINDOW_MS", "0") or 0)
+PREDICT_BATCH_MAX_ROWS: int = int(os.getenv("PREDICT_BATCH_MAX_ROWS", "512") or 512)
+
+# rows per chunk for /inference/predict-file?stream=true
+PREDICT_STREAM_CHUNK_ROWS: int = int(os.getenv("PREDICT_STREAM_CHUNK_ROWS", "5000") or 5000)
+
+# parsed-upload cache (/inference/upload, /inference/predict-file); 0 MB disables the memory tier,
+# an empty UPLOAD_CACHE_DIR disables the Parquet disk tier
+UPLOAD_CACHE_MB: float = float(os.getenv("UPLOAD_CACHE_MB", "256") or 0)
+UPLOAD_CACHE_DIR: str = os.getenv("UPLOAD_CACHE_DIR", "")
+UPLOAD_CACHE_DISK_MB: float = float(os.getenv("UPLOAD_CACHE_DISK_MB", "1024") or 0)
+
+# per-row prediction cache in front of the tabular model; 0 MB disables it, a TTL of 0 keeps entries until
+# evicted or the model is swapped, and calls above PREDICT_CACHE_MAX_ROWS rows skip it
+PREDICT_CACHE_MB: float = float(os.getenv("PREDICT_CACHE_MB", "32") or 0)
+PREDICT_CACHE_TTL_S: float = float(os.getenv("PREDICT_CACHE_TTL_S", "3600") or 0)
+PREDICT_CACHE_MAX_ROWS: int = int(os.getenv("PREDICT_CACHE_MAX_ROWS", "1000") or 0)
+
+# inference executor: worker threads (0 = one per core, at least 2 so one is always free for
+# interactive calls), queued calls per lane before answering 503 (0 = unbounded), and the row count from
+# which a /predict call runs in the bulk lane
+INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", "0") or 0) or max(2, os.cpu_count() or 1)
+INFERENCE_QUEUE_INTERACTIVE: int = int(os.getenv("INFERENCE_QUEUE_INTERACTIVE", "256") or 256)
+INFERENCE_QUEUE_BULK: int = int(os.getenv("INFERENCE_QUEUE_BULK", "8") or 8)
+INFERENCE_BULK_ROWS: int = int(os.getenv("INFERENCE_BULK_ROWS", "1000") or 1000)
+
+# tabular scoring engine: "sklearn" (predict_proba) or "auto" (the packed forest of api.services.forest
+# for calls of at most TAB_PACKED_MAX_ROWS rows, where sklearn's per-call overhead dominates; bulk calls
+# stay on sklearn, which is faster there). "packed" is accepted as a synonym of "auto".
+TAB_BACKEND: str = (os.getenv("TAB_BACKEND", "sklearn") or "sklearn").lower()
+TAB_PACKED_MAX_ROWS: int = int(os.getenv("TAB_PACKED_MAX_ROWS", "128") or 128)
+# fold a StandardScaler preprocessor into the packed forest's thresholds, so packed calls skip transform()
+TAB_FOLD_SCALER: bool = os.getenv("TAB_FOLD_SCALER", "1").lower() not in ("0", "false", "no")
+
+# light-curve detrending when a curve is not folded: "savgol" (scipy, rolling median without it),
+# "median" (rolling median), "biweight" or "spline"
+CURVE_DETREND: str = (os.getenv("CURVE_DETREND", "savgol") or "savgol").lower()
+
+# /inference/predict-curves: curves per ONNX run, preprocessing threads (0 = one per core), and limits on
+# the number of curves and the uncompressed size of an uploaded archive
+CURVE_BATCH_SIZE: int = int(os.getenv("CURVE_BATCH_SIZE", "256") or 256)
+CURVE_PREP_WORKERS: int = int(os.getenv("CURVE_PREP_WORKERS", "0") or 0) or (os.cpu_count() or 1)
+CURVE_BATCH_MAX_CURVES: int = int(os.getenv("CURVE_BATCH_MAX_CURVES", "10000") or 10000)
+CURVE_BATCH_MAX_MB: float = float(os.getenv("CURVE_BATCH_MAX_MB", "512") or 512)
+
+# auto_period: smallest Box Least Squares SNR accepted as a transit to fold on
+CURVE_BLS_MIN_SNR: float = float(os.getenv("CURVE_BLS_MIN_SNR", "7.0") or 7.0)
+# threads of one BLS search (/inference/predict-curve); small, since several searches may run at once
+CURVE_BLS_WORKERS: int = max(1, min(int(os.getenv("CURVE_BLS_WORKERS", "2") or 2), os.cpu_count() or 1))
+
+# /inference/predict-curve with a .zip of sectors/quarters: most files and uncompressed MB stitched into one curve
+CURVE_ARCHIVE_MAX_FILES: int = int(os.getenv("CURVE_ARCHIVE_MAX_FILES", "200") or 200)
+CURVE_ARCHIVE_MAX_MB: float = float(os.getenv("CURVE_ARCHIVE_MAX_MB", "256") or 256)
+
+# QUALITY flags that drop a FITS light-curve cadence: "default" (spacecraft events), "hard" (any flag),
+# "none" or an integer bitmask
+CURVE_QUALITY_BITMASK: str = os.getenv("CURVE_QUALITY_BITMASK", "default") or "default"
+
+# dtype of the memory-mapped X_*.npy feature store written next to the Parquet splits
+FEATURE_STORE_DTYPE: str = os.getenv("FEATURE_STORE_DTYPE", "float32") or "float32"
+
 def assert_artifacts_available(required: Iterable[str] | None = None) -> None:
     names = list(required) if required is not None else [
         "PREPROCESSOR_PATH",
@@ -62,6 +132,7 @@ def log_artifact_paths() -> None:
         "SCALER_PATH": SCALER_PATH,
         "CNN_ONNX_PATH": CNN_ONNX_PATH,
         "PARAMS_JSON_PATH": PARAMS_JSON_PATH,
+        "X_VAL_PATH": X_VAL_PATH,
     }
     for k, v in paths.items():
         log.info("%s = %s", k, v)
@@ -70,7 +141,17 @@ __all__ = [
     "REPO_ROOT",
     "DATA_DIR", "MODELS_DIR", "PROCESSED_DIR", "FEATURES_DIR",
     "PREPROCESSOR_PATH", "FEATURE_LIST_PATH", "TARGET_MAP_PATH",
-    "TAB_MODEL_PATH", "FUSE_MODEL_PATH", "SCALER_PATH",
+    "TAB_MODEL_PATH", "TAB_PACKED_PATH", "FUSE_MODEL_PATH", "SCALER_PATH",
     "CNN_ONNX_PATH", "PARAMS_JSON_PATH",
+    "X_VAL_PATH", "Y_VAL_PATH", "MODEL_WATCH_INTERVAL", "ADMIN_TOKEN",
+    "PREDICT_BATCH_WINDOW_MS", "PREDICT_BATCH_MAX_ROWS", "PREDICT_STREAM_CHUNK_ROWS",
+    "UPLOAD_CACHE_MB", "UPLOAD_CACHE_DIR", "UPLOAD_CACHE_DISK_MB",
+    "PREDICT_CACHE_MB", "PREDICT_CACHE_TTL_S", "PREDICT_CACHE_MAX_ROWS",
+    "FEATURE_STORE_DTYPE", "CURVE_DETREND",
+    "CURVE_BATCH_SIZE", "CURVE_PREP_WORKERS", "CURVE_BATCH_MAX_CURVES", "CURVE_BATCH_MAX_MB",
+    "CURVE_BLS_MIN_SNR", "CURVE_BLS_WORKERS", "CURVE_QUALITY_BITMASK",
+    "CURVE_ARCHIVE_MAX_FILES", "CURVE_ARCHIVE_MAX_MB",
+    "TAB_BACKEND", "TAB_PACKED_MAX_ROWS", "TAB_FOLD_SCALER",
+    "INFERENCE_WORKERS", "INFERENCE_QUEUE_INTERACTIVE", "INFERENCE_QUEUE_BULK", "INFERENCE_BULK_ROWS",
     "assert_artifacts_available", "log_artifact_paths",
 ]
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+import os
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# On-disk feature matrices that open without decoding:
+#
+#     <stem>.npy   contiguous C-order array (float32 by default), plain NumPy format
+#     <stem>.json  {"format", "version", "feature_list", "dtype", "shape"}
+#
+# ``open_features`` memory-maps the .npy read-only, so opening is O(1), pages are
+# only faulted in when touched and every process mapping the same file shares
+# them through the page cache instead of holding a private decoded copy.
+
+FORMAT = "starharbor-feature-store"
+VERSION = 1
+
+PathLike = Union[str, Path]
+
+
+def _paths(stem: PathLike) -> Tuple[Path, Path]:
+    stem = Path(stem)
+    if stem.suffix in (".npy", ".json", ".parquet"):
+        stem = stem.with_suffix("")
+    return stem.with_suffix(".npy"), stem.with_suffix(".json")
+
+
+@dataclass(frozen=True)
+class FeatureMatrix:
+    values: np.ndarray  # read-only np.memmap when opened with mmap=True
+    feature_list: Tuple[str, ...]
+
+    def __len__(self) -> int:
+        return int(self.values.shape[0])
+
+    def frame(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """DataFrame over the mapped array; no copy unless ``columns`` reorders/selects."""
+        df = pd.DataFrame(self.values, columns=list(self.feature_list), copy=False)
+        if columns is None or tuple(columns) == self.feature_list:
+            return df
+        return df[list(columns)]
+
+
+def exists(stem: PathLike) -> bool:
+    data, header = _paths(stem)
+    return data.exists() and header.exists()
+
+
+def write_features(stem: PathLike,
+                   X: Union[pd.DataFrame, np.ndarray],
+                   feature_list: Optional[Sequence[str]] = None,
+                   dtype: Union[str, np.dtype] = np.float32) -> Path:
+    """Write ``X`` (2-D; a 1-D vector is stored as one column) as ``<stem>.npy`` + ``<stem>.json``.
+
+    Both files go through a temp name and ``os.replace``; the header is renamed
+    last, so a reader that sees it also sees the matching array.
+    """
+    data_path, header_path = _paths(stem)
+    if isinstance(X, pd.DataFrame):
+        feature_list = list(X.columns) if feature_list is None else list(feature_list)
+        arr = X.to_numpy(dtype=dtype)
+    else:
+        arr = np.asarray(X, dtype=dtype)
+    if arr.ndim == 1:
+        arr = arr.reshape(-1, 1)
+    if feature_list is None:
+        feature_list = [str(i) for i in range(arr.shape[1])]
+    if len(feature_list) != arr.shape[1]:
+        raise ValueError(f"feature_list has {len(feature_list)} names for {arr.shape[1]} columns")
+
+    data_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_data = data_path.with_name(data_path.name + ".tmp")
+    with open(tmp_data, "wb") as f:
+        np.save(f, np.ascontiguousarray(arr), allow_pickle=False)
+    header = {
+        "format": FORMAT,
+        "version": VERSION,
+        "feature_list": [str(c) for c in feature_list],
+        "dtype": arr.dtype.str,
+        "shape": list(arr.shape),
+    }
+    tmp_header = header_path.with_name(header_path.name + ".tmp")
+    tmp_header.write_text(json.dumps(header, indent=2), encoding="utf-8")
+    os.replace(tmp_data, data_path)
+    os.replace(tmp_header, header_path)
+    return data_path
+
+
+def open_features(stem: PathLike, mmap: bool = True) -> FeatureMatrix:
+    """Open ``<stem>.npy`` described by ``<stem>.json``; ``mmap=False`` reads it into memory."""
+    data_path, header_path = _paths(stem)
+    header = json.loads(header_path.read_text(encoding="utf-8"))
+    if header.get("format") != FORMAT or int(header.get("version", 0)) > VERSION:
+        raise ValueError(f"{header_path} is not a v{VERSION} feature store header")
+    values = np.load(data_path, mmap_mode="r" if mmap else None, allow_pickle=False)
+    if list(values.shape) != list(header["shape"]) or values.dtype.str != header["dtype"]:
+        raise ValueError(f"{data_path} does not match its header ({values.dtype}{values.shape} vs "
+                         f"{header['dtype']}{tuple(header['shape'])})")
+    return FeatureMatrix(values=values, feature_list=tuple(header["feature_list"]))
+
+
+def read_matrix(stem: PathLike, columns: Optional[Sequence[str]] = None,
+                dtype: Union[str, np.dtype, None] = None) -> pd.DataFrame:
+    """Feature store if present, else ``<stem>.parquet``; optionally selecting ``columns``.
+
+    With ``dtype``, a store written in another dtype (e.g. float32 for
+    float64 data) is only used when there is no Parquet file to fall back on.
+    """
+    parquet = _paths(stem)[0].with_suffix(".parquet")
+    if exists(stem):
+        fm = open_features(stem)
+        if dtype is None or fm.values.dtype == np.dtype(dtype) or not parquet.exists():
+            return fm.frame(columns)
+    return pd.read_parquet(parquet, columns=list(columns) if columns is not None else None)
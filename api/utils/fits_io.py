@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import io as _io
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Column-selective FITS binary-table reader.
+#
+# astropy only parses the headers (``lazy_load_hdus``); table data is then
+# viewed in place as a big-endian record array -- np.memmap over a file,
+# np.frombuffer over uploaded bytes -- and only the requested columns are
+# copied out as native float64/int64 arrays. Nothing else in the table is
+# decoded, and no astropy Table or DataFrame is built on the way.
+#
+# Columns with TSCAL/TZERO, TNULL or variable-length formats fall back to
+# astropy's own (fully decoded) field access.
+
+Source = Union[str, Path, bytes]
+
+# QUALITY bits that mark cadences taken during spacecraft events, same meaning for Kepler, K2 and TESS:
+# attitude tweak (1), safe mode (2), coarse point (4), earth point (8), desaturation (32), manual exclude (128)
+QUALITY_BITMASKS: Dict[str, int] = {"none": 0, "default": 1 | 2 | 4 | 8 | 32 | 128, "hard": -1}
+
+# header keywords naming the sector (TESS), quarter (Kepler) or campaign (K2) of a light curve
+SEGMENT_KEYWORDS = ("SECTOR", "QUARTER", "CAMPAIGN")
+
+
+def quality_bitmask(spec: Union[str, int, None]) -> int:
+    """``"none"``, ``"default"``, ``"hard"`` (any flag) or an explicit integer bitmask."""
+    if spec is None:
+        return 0
+    if isinstance(spec, (int, np.integer)):
+        return int(spec)
+    spec = str(spec).strip().lower()
+    if spec in QUALITY_BITMASKS:
+        return QUALITY_BITMASKS[spec]
+    try:
+        return int(spec, 0)
+    except ValueError:
+        raise ValueError(f"Unknown quality bitmask {spec!r}; expected one of {list(QUALITY_BITMASKS)} or an integer")
+
+
+@dataclass(frozen=True)
+class Segment:
+    """One light-curve table: finite, quality-filtered samples in file order."""
+    name: str
+    time: np.ndarray
+    flux: np.ndarray
+    segment: Optional[int] = None  # sector / quarter / campaign, if the headers say
+
+
+def _open(src: Source):
+    from astropy.io import fits
+
+    if isinstance(src, (str, Path)):
+        return fits.open(str(src), memmap=True, lazy_load_hdus=True)
+    return fits.open(_io.BytesIO(src), lazy_load_hdus=True)
+
+
+def _raw_records(src: Source, hdul, index: int, hdu) -> np.ndarray:
+    if hdu.header.get("XTENSION") != "BINTABLE":
+        raise ValueError("not a binary table")  # ASCII tables are parsed by astropy
+    rows = int(hdu.header.get("NAXIS2", 0))
+    dtype = hdu.columns.dtype.newbyteorder(">")
+    if dtype.itemsize != int(hdu.header.get("NAXIS1", -1)):
+        raise ValueError("unexpected row layout")
+    offset = hdul.fileinfo(index)["datLoc"]
+    if rows == 0:
+        return np.zeros(0, dtype=dtype)
+    if isinstance(src, (str, Path)):
+        return np.memmap(str(src), dtype=dtype, mode="r", offset=offset, shape=(rows,))
+    return np.frombuffer(src, dtype=dtype, count=rows, offset=offset)
+
+
+def _plain(hdu, name: str) -> bool:
+    col = hdu.columns[name]
+    return (col.bscale in (None, 1) and col.bzero in (None, 0) and col.null is None
+            and not str(col.format).upper().lstrip("0123456789").startswith(("P", "Q")))
+
+
+def _column(src: Source, hdul, index: int, hdu, name: str, dtype, cache: Dict[int, np.ndarray]) -> np.ndarray:
+    if _plain(hdu, name):
+        try:
+            raw = cache.get(index)
+            if raw is None:
+                raw = cache[index] = _raw_records(src, hdul, index, hdu)
+            return np.asarray(raw[name], dtype=dtype)
+        except ValueError:
+            pass
+    return np.asarray(hdu.data.field(name), dtype=dtype)
+
+
+def _pick(names: Sequence[str], candidates: Sequence[str]) -> Optional[str]:
+    lower = {n.lower(): n for n in names}
+    for c in candidates:
+        if c.lower() in lower:
+            return lower[c.lower()]
+    return None
+
+
+def read_segments(
+    src: Source,
+    *,
+    time_columns: Sequence[str],
+    flux_columns: Sequence[str],
+    quality: Union[str, int, None] = "default",
+) -> List[Segment]:
+    """Every table HDU of ``src`` that has a time and a flux column, as a :class:`Segment`.
+
+    The first present name of ``time_columns``/``flux_columns`` is used
+    (case-insensitive). Samples with a non-finite time or flux, or with a
+    ``QUALITY`` flag in ``quality`` (see :func:`quality_bitmask`), are dropped.
+    """
+    from astropy.io import fits
+
+    mask_bits = quality_bitmask(quality)
+    segments: List[Segment] = []
+    with _open(src) as hdul:
+        primary = hdul[0].header
+        cache: Dict[int, np.ndarray] = {}
+        for i, hdu in enumerate(hdul):
+            if not isinstance(hdu, (fits.BinTableHDU, fits.TableHDU)):
+                continue
+            names = hdu.columns.names
+            t_col, f_col = _pick(names, time_columns), _pick(names, flux_columns)
+            if t_col is None or f_col is None:
+                continue
+            t = _column(src, hdul, i, hdu, t_col, np.float64, cache)
+            f = _column(src, hdul, i, hdu, f_col, np.float64, cache)
+            keep = np.isfinite(t) & np.isfinite(f)
+            q_col = _pick(names, ("QUALITY", "SAP_QUALITY"))
+            if mask_bits and q_col is not None:
+                keep &= (_column(src, hdul, i, hdu, q_col, np.int64, cache) & mask_bits) == 0
+            number = next((hdr[k] for k in SEGMENT_KEYWORDS for hdr in (hdu.header, primary) if k in hdr), None)
+            segments.append(Segment(f"{hdu.name or 'HDU'}[{i}]", t[keep], f[keep],
+                                    int(number) if number is not None else None))
+        cache.clear()  # drop the memmaps before the file closes
+    return segments
+
+
+def stitch(segments: Sequence[Segment]) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenate segments into one time-sorted curve.
+
+    With more than one segment each is first divided by its median flux, so
+    sectors/quarters with different aperture or detector levels line up.
+    """
+    if not segments:
+        return np.zeros(0), np.zeros(0)
+    if len(segments) == 1:
+        seg = segments[0]
+        order = np.argsort(seg.time, kind="stable")
+        return seg.time[order], seg.flux[order]
+    times, fluxes = [], []
+    for seg in segments:
+        if not len(seg.flux):
+            continue
+        level = np.median(seg.flux)
+        times.append(seg.time)
+        fluxes.append(seg.flux / level if level else seg.flux)
+    if not times:
+        return np.zeros(0), np.zeros(0)
+    t, f = np.concatenate(times), np.concatenate(fluxes)
+    order = np.argsort(t, kind="stable")
+    return t[order], f[order]
+
+
+def read_table(src: Source) -> pd.DataFrame:
+    """First HDU with data as a DataFrame.
+
+    Plain 1-D numeric columns are copied straight out of the record view;
+    anything else (strings, scaled or null-flagged columns, vectors) takes
+    astropy's Table conversion.
+    """
+    from astropy.io import fits
+    from astropy.table import Table
+
+    with _open(src) as hdul:
+        # judged by the header, so the data of skipped HDUs is never read
+        index, hdu = next(((i, h) for i, h in enumerate(hdul) if h.header.get("NAXIS", 0) > 0), (None, None))
+        if hdu is None:
+            raise ValueError("No table HDU found in FITS.")
+        if isinstance(hdu, fits.BinTableHDU) and all(
+            _plain(hdu, c.name) and hdu.columns.dtype[c.name].kind in "fiu" and hdu.columns.dtype[c.name].shape == ()
+            for c in hdu.columns
+        ):
+            try:
+                raw = _raw_records(src, hdul, index, hdu)
+                df = pd.DataFrame({name: raw[name].astype(raw.dtype[name].newbyteorder("="))
+                                   for name in raw.dtype.names})
+                del raw
+                return df
+            except ValueError:
+                pass
+        df = Table(hdu.data).to_pandas()
+        df.columns = [c.decode() if isinstance(c, bytes) else c for c in df.columns]
+        return df
@@ -1,27 +1,97 @@
 from __future__ import annotations
-from typing import Optional, Union
+from typing import IO, Iterator, Optional, Union
 import importlib
+import logging
 from pathlib import Path
 import pandas as pd
 import csv
 import io as _io
 
+log = logging.getLogger(__name__)
+
+# Common kwargs for all CSV reading attempts
+_CSV_KWARGS = {
+    "engine": "python",
+    "encoding": "utf-8-sig",
+    "quotechar": '"',
+    "doublequote": True,
+    "escapechar": "\\",
+    "on_bad_lines": "skip",
+    "skip_blank_lines": True,
+    "comment": "#",  # Skip comment lines starting with #
+}
+
+# Single-pass reader: C engine, round-trip float parsing so values match the python engine bit for bit
+_CSV_FAST_KWARGS = {**_CSV_KWARGS, "engine": "c", "float_precision": "round_trip"}
+
+_CSV_SEPS = (",", ";", "\t", "|")
+_SNIFF_BYTES = 64 * 1024
+
+
+def _csv_prefix(path_or_buf) -> str:
+    """First ``_SNIFF_BYTES`` of the file as text; buffers are left where they were."""
+    if isinstance(path_or_buf, (str, Path)):
+        with open(path_or_buf, "rb") as f:
+            raw = f.read(_SNIFF_BYTES)
+    else:
+        pos = path_or_buf.tell()
+        raw = path_or_buf.read(_SNIFF_BYTES)
+        path_or_buf.seek(pos)
+    text = raw.decode("utf-8-sig", errors="replace")
+    if len(raw) == _SNIFF_BYTES:
+        text = text.rsplit("\n", 1)[0]  # drop the (probably cut) last line
+    return text
+
+
+def _sniff_sep(head: str, sep_hint: Optional[str] = None) -> Optional[str]:
+    """
+    Delimiter of the data below the ``#`` comment header, or None if ``head`` has no data lines.
+    The hint wins whenever it occurs in the header row.
+    """
+    lines = [ln for ln in head.splitlines() if ln.strip() and not ln.lstrip().startswith("#")][:10]
+    if not lines:
+        return None
+    if sep_hint in _CSV_SEPS and sep_hint in lines[0]:
+        return sep_hint
+    try:
+        return csv.Sniffer().sniff("\n".join(lines), delimiters=list(_CSV_SEPS)).delimiter
+    except csv.Error:
+        counts = {s: lines[0].count(s) for s in _CSV_SEPS}
+        best = max(counts, key=counts.get)
+        return best if counts[best] else sep_hint
+
+
+def _rewind(path_or_buf) -> None:
+    if hasattr(path_or_buf, "seek"):
+        path_or_buf.seek(0)
+
+
 def _read_csv_robust(path_or_buf, *, sep_hint: Optional[str] = None):
     """
     Read CSV with robust handling of NASA Exoplanet Archive files that contain comment headers.
+
+    The delimiter is sniffed once from a small prefix and the file is parsed in a
+    single C-engine pass; files that parser rejects (or that come out as a single
+    column) go through the original python-engine cascade.
     """
-    # Common kwargs for all reading attempts
-    common_kwargs = {
-        "engine": "python",
-        "encoding": "utf-8-sig",
-        "quotechar": '"',
-        "doublequote": True,
-        "escapechar": "\\",
-        "on_bad_lines": "skip",
-        "skip_blank_lines": True,
-        "comment": "#",  # Skip comment lines starting with #
-    }
-    
+    sep = _sniff_sep(_csv_prefix(path_or_buf), sep_hint)
+    if sep is not None:
+        try:
+            df = pd.read_csv(path_or_buf, sep=sep, low_memory=False, **_CSV_FAST_KWARGS)
+            if df.shape[1] > 1:
+                return df
+        except Exception as e:
+            log.debug("Fast CSV parse failed (%s); falling back to the python engine", e)
+        _rewind(path_or_buf)
+    return _read_csv_cascade(path_or_buf, sep_hint=sep_hint)
+
+
+def _read_csv_cascade(path_or_buf, *, sep_hint: Optional[str] = None):
+    """
+    Python-engine fallback: try the hinted separator, sniffing and each common separator in turn.
+    """
+    common_kwargs = _CSV_KWARGS
+
     if sep_hint in (",", "\t", ";", "|"):
         try:
             return pd.read_csv(path_or_buf, sep=sep_hint, **common_kwargs)
@@ -78,16 +148,8 @@ def read_table(path_or_bytes: Union[str, Path, bytes], *, suffix: Optional[str]
         if sfx in {".parquet", ".pq"}:
             return pd.read_parquet(p)
         if sfx in {".fits", ".fit"}:
-            from astropy.io import fits
-            from astropy.table import Table
-            with fits.open(str(p)) as hdul:
-                h = next((h for h in hdul if getattr(h, "data", None) is not None), None)
-                if h is None:
-                    raise ValueError("No table HDU found in FITS.")
-                tab = Table(h.data)
-                df = tab.to_pandas()
-                df.columns = [c.decode() if isinstance(c, bytes) else c for c in df.columns]
-                return df
+            from api.utils import fits_io
+            return fits_io.read_table(p)
         raise ValueError(f"Unsupported file type: {sfx}")
 
     sfx = (suffix or "").lower()
@@ -97,19 +159,71 @@ def read_table(path_or_bytes: Union[str, Path, bytes], *, suffix: Optional[str]
     if sfx in {".parquet", ".pq"}:
         return pd.read_parquet(_io.BytesIO(path_or_bytes))
     if sfx in {".fits", ".fit"}:
-        from astropy.io import fits
-        from astropy.table import Table
-        with fits.open(_io.BytesIO(path_or_bytes)) as hdul:
-            h = next((h for h in hdul if getattr(h, "data", None) is not None), None)
-            if h is None:
-                raise ValueError("No table HDU found in FITS.")
-            tab = Table(h.data)
-            df = tab.to_pandas()
-            df.columns = [c.decode() if isinstance(c, bytes) else c for c in df.columns]
-            return df
+        from api.utils import fits_io
+        return fits_io.read_table(path_or_bytes)
 
     raise ValueError("Provide a valid suffix ('.csv' | '.tsv' | '.parquet' | '.fits') for bytes input.")
 
+def _read_csv_chunks(fh: IO[bytes], sep: str, chunk_rows: int) -> Iterator[pd.DataFrame]:
+    # C engine first; if it cannot even produce the first chunk, restart with the python engine
+    try:
+        reader = pd.read_csv(fh, sep=sep, chunksize=chunk_rows, **_CSV_FAST_KWARGS)
+        first = next(reader, None)
+    except Exception as e:
+        log.debug("Fast CSV parse failed (%s); falling back to the python engine", e)
+        fh.seek(0)
+        reader = pd.read_csv(fh, sep=sep, chunksize=chunk_rows, **_CSV_KWARGS)
+        first = next(reader, None)
+    with reader:
+        if first is not None:
+            yield first
+        yield from reader
+
+
+def read_table_chunks(
+    source: Union[str, Path, bytes, IO[bytes]],
+    *,
+    suffix: Optional[str] = None,
+    chunk_rows: int = 5000,
+) -> Iterator[pd.DataFrame]:
+    """
+    Yield ``source`` as DataFrames of at most ``chunk_rows`` rows.
+
+    ``source`` may be a path, raw bytes or a seekable binary file object (e.g.
+    ``UploadFile.file``). CSV/TSV and Parquet are read incrementally, so only
+    one chunk is held in memory at a time; FITS tables are read whole (a path
+    memory-mapped) and sliced.
+    """
+    if isinstance(source, (str, Path)):
+        p = Path(source)
+        sfx = (suffix or p.suffix).lower()
+        fh: IO[bytes] = open(p, "rb")
+    else:
+        sfx = (suffix or "").lower()
+        fh = _io.BytesIO(source) if isinstance(source, bytes) else source
+
+    try:
+        if sfx in {".csv", ".tsv"}:
+            default = "," if sfx == ".csv" else "\t"
+            sep = _sniff_sep(_csv_prefix(fh), default) or default
+            yield from _read_csv_chunks(fh, sep, chunk_rows)
+        elif sfx in {".parquet", ".pq"}:
+            import pyarrow.parquet as pq
+            for batch in pq.ParquetFile(fh).iter_batches(batch_size=chunk_rows):
+                yield batch.to_pandas()
+        elif sfx in {".fits", ".fit"}:
+            from api.utils import fits_io
+            # a path is memory-mapped rather than read into memory
+            df = fits_io.read_table(p if isinstance(source, (str, Path)) else fh.read())
+            for start in range(0, len(df), chunk_rows):
+                yield df.iloc[start:start + chunk_rows]
+        else:
+            raise ValueError(f"Unsupported file type: {sfx or '(none)'}")
+    finally:
+        if fh is not source:
+            fh.close()
+
+
 def normalize_schema(df: pd.DataFrame, mission: Optional[str]) -> pd.DataFrame:
     if not mission:
         return df
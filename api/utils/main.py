@@ -3,8 +3,20 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.concurrency import run_in_threadpool
 
-from api.utils.constants import log_artifact_paths, assert_artifacts_available
+from api.utils.constants import (
+    log_artifact_paths,
+    assert_artifacts_available,
+    MODELS_DIR,
+    MODEL_WATCH_INTERVAL,
+    ADMIN_TOKEN,
+)
+from api.services.registry import REGISTRY, ArtifactWatcher
+from api.services.batching import BATCHER
+from api.services.executor import EXECUTOR
+from api.utils.timing import TimingMiddleware
+from api.utils import prefork
 from api.routers import inference
 
 import logging
@@ -19,8 +31,24 @@ async def lifespan(app: FastAPI):
         log.info("Artifacts check: OK")
     except Exception as e:
         log.warning("Artifacts check failed: %s", e)
+    # preload the model bundle so the first request doesn't pay for joblib.load
+    try:
+        bundle = await run_in_threadpool(REGISTRY.load)
+        log.info("Model bundle ready: version=%s", bundle.version)
+    except Exception as e:
+        log.warning("Model bundle preload failed: %s", e)
+
+    watcher = None
+    # under the pre-fork master, it polls and rolls the workers instead
+    if MODEL_WATCH_INTERVAL > 0 and prefork.master_pid() is None:
+        watcher = ArtifactWatcher(REGISTRY, MODELS_DIR, interval=MODEL_WATCH_INTERVAL)
+        watcher.start()
     yield
     # ── shutdown (cleanup) ────────────────────────────────
+    if watcher is not None:
+        watcher.stop()
+    BATCHER.stop()
+    EXECUTOR.stop()
 
 app = FastAPI(
     title="Exoplanet Vetting API",
@@ -38,15 +66,23 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
+# per-stage latency histograms (/metrics/runtime) and a Server-Timing header on every response
+app.add_middleware(TimingMiddleware)
 
 # Routers
 app.include_router(inference.router)
 
-from api.routers import files, metrics, report
+from api.routers import files, metrics, report, admin
 app.include_router(files.router)
 app.include_router(metrics.router)
 app.include_router(report.router)
+# /admin can load pickles and drop caches: only mounted when a token guards it
+if ADMIN_TOKEN:
+    app.include_router(admin.router)
+else:
+    log.info("ADMIN_TOKEN not set, /admin routes disabled")
 
 # option B
 def _try_include(module: str):
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import gc
+import logging
+import os
+import signal
+import socket
+import time
+from typing import Dict, Optional, Set
+
+# Pre-fork serving: the master imports the app and loads the model bundle once,
+# then forks the uvicorn workers, which all accept() on one inherited socket.
+# The forest and preprocessor are inherited copy-on-write instead of each worker
+# unpickling tab_xgb.pkl; ``gc.freeze()`` before forking keeps the collector from
+# writing to (and so un-sharing) the pages that hold them.
+#
+# The master never serves requests and runs no threads (fork() only copies the
+# calling thread). It owns model reloads: SIGHUP, or MODEL_WATCH_INTERVAL
+# polling, reloads and validates in the master, then replaces the workers one
+# at a time so they inherit the new bundle. Workers that die are restarted.
+
+MASTER_PID_ENV = "STARHARBOR_PREFORK_MASTER"
+
+log = logging.getLogger("api.prefork")
+
+
+def master_pid() -> Optional[int]:
+    """PID of the pre-fork master when called in one of its workers, else None."""
+    pid = os.getenv(MASTER_PID_ENV)
+    if not pid or int(pid) == os.getpid():
+        return None
+    return int(pid)
+
+
+def request_reload() -> int:
+    """Ask the master to reload the model and roll the workers; returns its PID."""
+    pid = master_pid()
+    if pid is None:
+        raise RuntimeError("not running in a pre-fork worker")
+    os.kill(pid, signal.SIGHUP)
+    return pid
+
+
+def bind_socket(host: str, port: int, backlog: int = 2048) -> socket.socket:
+    family = socket.AF_INET6 if ":" in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+class PreforkServer:
+    """Load once, fork ``workers`` uvicorn servers, supervise them."""
+
+    def __init__(self,
+                 app: str = "api.utils.main:app",
+                 host: str = "0.0.0.0",
+                 port: int = 8000,
+                 workers: int = 2,
+                 log_level: str = "info",
+                 watch_interval: Optional[float] = None,
+                 graceful_timeout: float = 30.0,
+                 model_jobs: Optional[int] = 1) -> None:
+        self.app = app
+        self.host = host
+        self.port = port
+        self.workers = max(1, int(workers))
+        self.log_level = log_level
+        self.watch_interval = watch_interval
+        self.graceful_timeout = graceful_timeout
+        self.model_jobs = model_jobs
+        self._children: Dict[int, float] = {}  # pid -> start time
+        self._retiring: Set[int] = set()
+        self._stopping = False
+        self._reload_requested = False
+
+    # ── master ────────────────────────────────────────────
+    def run(self) -> None:
+        import uvicorn
+        from uvicorn.importer import import_from_string
+        from api.services.registry import REGISTRY, ArtifactWatcher
+        from api.utils.constants import MODELS_DIR, MODEL_WATCH_INTERVAL
+
+        self.sock = bind_socket(self.host, self.port)
+        os.environ[MASTER_PID_ENV] = str(os.getpid())
+        # configures logging once; the workers inherit it
+        self.config = uvicorn.Config(import_from_string(self.app), log_level=self.log_level, lifespan="on")
+        try:
+            bundle = REGISTRY.load()
+            log.info("Master %d loaded model bundle %s", os.getpid(), bundle.version)
+        except Exception as e:
+            log.warning("Model bundle preload failed, workers will load it: %s", e)
+
+        interval = MODEL_WATCH_INTERVAL if self.watch_interval is None else self.watch_interval
+        watcher = ArtifactWatcher(REGISTRY, MODELS_DIR, interval=interval) if interval > 0 else None
+
+        signal.signal(signal.SIGTERM, self._on_stop)
+        signal.signal(signal.SIGINT, self._on_stop)
+        signal.signal(signal.SIGHUP, self._on_reload)
+
+        self._freeze()
+        for _ in range(self.workers):
+            self._spawn()
+        log.info("Pre-fork master %d serving http://%s:%d with %d workers",
+                 os.getpid(), self.host, self.port, self.workers)
+
+        next_poll = time.monotonic() + interval if watcher else float("inf")
+        while not self._stopping:
+            time.sleep(0.2)
+            self._reap()
+            if self._reload_requested:
+                self._reload_requested = False
+                self._reload(REGISTRY, MODELS_DIR)
+            if watcher is not None and time.monotonic() >= next_poll:
+                next_poll = time.monotonic() + interval
+                if watcher.poll():
+                    self._roll()
+        self._shutdown()
+
+    def _on_stop(self, signum, frame) -> None:
+        self._stopping = True
+
+    def _on_reload(self, signum, frame) -> None:
+        self._reload_requested = True
+
+    @staticmethod
+    def _freeze() -> None:
+        # move everything live out of the collector's reach; unfreezing first
+        # lets a replaced bundle be collected in the master
+        gc.unfreeze()
+        gc.collect()
+        gc.freeze()
+
+    def _reload(self, registry, models_dir) -> None:
+        before = registry.status()["version"]
+        try:
+            bundle = registry.reload(models_dir)
+        except Exception as e:
+            log.warning("Reload rejected, workers keep the current bundle: %s", e)
+            return
+        if bundle.version != before:
+            self._roll()
+        else:
+            log.info("Reload: bundle %s unchanged", bundle.version)
+
+    def _roll(self) -> None:
+        """Replace the workers one by one; old ones finish in-flight requests."""
+        self._freeze()
+        for pid in list(self._children):
+            if pid in self._retiring:
+                continue
+            self._spawn()
+            self._retiring.add(pid)
+            self._signal(pid, signal.SIGTERM)
+        log.info("Rolled %d workers onto the new bundle", self.workers)
+
+    def _spawn(self) -> int:
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                self._worker()
+            except BaseException:
+                log.exception("Worker %d crashed", os.getpid())
+                code = 1
+            finally:
+                os._exit(code)
+        self._children[pid] = time.monotonic()
+        return pid
+
+    def _reap(self) -> None:
+        while self._children:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            started = self._children.pop(pid, None)
+            if pid in self._retiring:
+                self._retiring.discard(pid)
+                continue
+            if started is None or self._stopping:
+                continue
+            log.warning("Worker %d exited (status %d), restarting", pid, os.waitstatus_to_exitcode(status))
+            if time.monotonic() - started < 1.0:
+                time.sleep(1.0)  # crash loop; don't spin
+            self._spawn()
+
+    def _signal(self, pid: int, sig: int) -> None:
+        try:
+            os.kill(pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def _shutdown(self) -> None:
+        log.info("Stopping %d workers", len(self._children))
+        for pid in self._children:
+            self._signal(pid, signal.SIGTERM)
+        deadline = time.monotonic() + self.graceful_timeout
+        while self._children and time.monotonic() < deadline:
+            time.sleep(0.1)
+            self._reap()
+        for pid in self._children:
+            self._signal(pid, signal.SIGKILL)
+        self.sock.close()
+
+    # ── worker ────────────────────────────────────────────
+    def _worker(self) -> None:
+        import uvicorn
+        from api.services.registry import REGISTRY
+
+        for sig in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+            signal.signal(sig, signal.SIG_DFL)  # uvicorn installs its own
+        REGISTRY.after_fork(self.model_jobs)
+        uvicorn.Server(self.config).run(sockets=[self.sock])
@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# seconds; Prometheus-style upper bounds (+Inf is implicit)
+BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram plus a running row counter."""
+
+    __slots__ = ("counts", "sum", "count", "rows", "_lock")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, rows: Optional[int] = None) -> None:
+        i = bisect.bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += seconds
+            self.count += 1
+            if rows:
+                self.rows += int(rows)
+
+    def snapshot(self) -> Tuple[List[int], float, int, int]:
+        with self._lock:
+            return list(self.counts), self.sum, self.count, self.rows
+
+
+class _Family:
+    def __init__(self) -> None:
+        self._items: Dict[str, Histogram] = {}
+        self._lock = threading.Lock()
+
+    def get(self, label: str) -> Histogram:
+        h = self._items.get(label)
+        if h is None:
+            with self._lock:
+                h = self._items.setdefault(label, Histogram())
+        return h
+
+    def items(self) -> List[Tuple[str, Histogram]]:
+        with self._lock:
+            return sorted(self._items.items())
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+STAGES = _Family()    # label: stage name
+REQUESTS = _Family()  # label: route path template
+
+# (stage, seconds) recorded during the current request; None outside a request
+_request_stages: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("request_stages", default=None)
+
+
+class _Stage:
+    __slots__ = ("rows",)
+
+    def __init__(self, rows: Optional[int]) -> None:
+        self.rows = rows
+
+
+@contextmanager
+def stage(name: str, rows: Optional[int] = None) -> Iterator[_Stage]:
+    """Time a block into the ``name`` histogram and the current request's Server-Timing.
+
+    The row count can be passed up front or set on the yielded object once known.
+    """
+    st = _Stage(rows)
+    t0 = time.perf_counter()
+    try:
+        yield st
+    finally:
+        record(name, time.perf_counter() - t0, st.rows)
+
+
+def record(name: str, seconds: float, rows: Optional[int] = None) -> None:
+    """Add an already measured duration, like the one a ``stage(name)`` block would have taken."""
+    STAGES.get(name).observe(seconds, rows)
+    stages = _request_stages.get()
+    if stages is not None:
+        stages.append((name, seconds))
+
+
+def _server_timing(stages: List[Tuple[str, float]], total: float) -> bytes:
+    merged: Dict[str, float] = {}
+    for name, dt in stages:
+        merged[name] = merged.get(name, 0.0) + dt
+    parts = [f"{name};dur={dt * 1e3:.2f}" for name, dt in merged.items()]
+    # untimed remainder: routing, request validation and response serialization
+    other = max(total - sum(merged.values()), 0.0)
+    parts.append(f"other;dur={other * 1e3:.2f}")
+    parts.append(f"total;dur={total * 1e3:.2f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+class TimingMiddleware:
+    """Pure ASGI middleware: per-request stage collection and a ``Server-Timing`` header.
+
+    ``total`` in the header is measured up to the response start, so it covers
+    the handler and response serialization (``other`` is whatever no stage
+    accounted for); the request histogram is observed once the body has been sent.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stages: List[Tuple[str, float]] = []
+        token = _request_stages.set(stages)
+        t0 = time.perf_counter()
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", _server_timing(stages, time.perf_counter() - t0)))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_stages.reset(token)
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            REQUESTS.get(path).observe(time.perf_counter() - t0)
+
+
+def _esc(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(metric: str, label: str, family: _Family) -> List[str]:
+    lines: List[str] = []
+    for key, h in family.items():
+        counts, total, count, _ = h.snapshot()
+        lbl = f'{label}="{_esc(key)}"'
+        acc = 0
+        for bound, c in zip(BUCKETS, counts):
+            acc += c
+            lines.append(f'{metric}_bucket{{{lbl},le="{bound}"}} {acc}')
+        lines.append(f'{metric}_bucket{{{lbl},le="+Inf"}} {count}')
+        lines.append(f"{metric}_sum{{{lbl}}} {total:.6f}")
+        lines.append(f"{metric}_count{{{lbl}}} {count}")
+    return lines
+
+
+def render_prometheus(extra: Optional[Dict[str, Tuple[str, str, Dict[str, float]]]] = None) -> str:
+    """Prometheus text exposition of stage/request histograms.
+
+    ``extra`` maps metric name -> (type, help, {label_value_string: value}) for
+    counters/gauges owned by other modules (e.g. cache hit counts).
+    """
+    out = [
+        "# HELP starharbor_stage_seconds Time spent in a request stage.",
+        "# TYPE starharbor_stage_seconds histogram",
+        *_histogram_lines("starharbor_stage_seconds", "stage", STAGES),
+        "# HELP starharbor_stage_rows_total Rows processed by a request stage.",
+        "# TYPE starharbor_stage_rows_total counter",
+    ]
+    for key, h in STAGES.items():
+        out.append(f'starharbor_stage_rows_total{{stage="{_esc(key)}"}} {h.snapshot()[3]}')
+    out += [
+        "# HELP starharbor_request_seconds End-to-end request time by route.",
+        "# TYPE starharbor_request_seconds histogram",
+        *_histogram_lines("starharbor_request_seconds", "path", REQUESTS),
+    ]
+    for metric, (kind, help_, samples) in (extra or {}).items():
+        out.append(f"# HELP {metric} {help_}")
+        out.append(f"# TYPE {metric} {kind}")
+        for labels, value in samples.items():
+            out.append(f"{metric}{{{labels}}} {value}" if labels else f"{metric} {value}")
+    return "\n".join(out) + "\n"
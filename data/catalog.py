@@ -0,0 +1,218 @@
+from __future__ import annotations
+import logging
+import os
+import re
+from typing import Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+# Append-only store for processed rows, hive-partitioned by mission and ingest date:
+#
+#     <root>/mission=<mission>/date=<YYYYMMDD>/part-<n>.parquet
+#
+# Files are never rewritten. An incremental ingest appends only the rows whose
+# (row_id, content_hash) pair differs from the current version stored for the
+# mission, i.e. new rows and new versions of existing ones (a later updated_at,
+# a changed value or QC flag, or a revert to an earlier value).
+# ``read`` scans it with pyarrow, pruning partitions and pushing filters/columns
+# down so callers only decode what they ask for.
+
+PARTITION_COLUMNS = ("mission", "date")
+PARTITION_SCHEMA = pa.schema([("mission", pa.string()), ("date", pa.string())])
+CONTENT_HASH = "content_hash"
+ROW_GROUP_ROWS = 32_768
+
+# identifiers and free text: numeric for one mission (kepid-like object_id, toi) and text for
+# another (EPIC names), so they are always stored as strings to keep one schema across parts
+TEXT_COLUMNS = ("row_id", "system_key", "object_id", "planet_name", "koi_name", "toi", "label_raw", "label_3way")
+
+_PART_RE = re.compile(r"^part-(\d+)\.parquet$")
+
+
+def partition_dir(root: str, mission: str, date_tag: Optional[str] = None) -> str:
+    path = os.path.join(root, f"mission={mission}")
+    return os.path.join(path, f"date={date_tag}") if date_tag else path
+
+
+def part_files(root: str, mission: str) -> List[str]:
+    """All parts stored for ``mission``, oldest date first."""
+    base = partition_dir(root, mission)
+    if not os.path.isdir(base):
+        return []
+    out = []
+    for date_dir in sorted(d for d in os.listdir(base) if d.startswith("date=")):
+        full = os.path.join(base, date_dir)
+        names = [n for n in os.listdir(full) if _PART_RE.match(n)]
+        out += [os.path.join(full, n) for n in sorted(names, key=lambda n: int(_PART_RE.match(n).group(1)))]
+    return out
+
+
+def all_part_files(root: str) -> List[str]:
+    """Every part in append order: by date, then part number, then mission name."""
+    if not os.path.isdir(root):
+        return []
+    keyed = []
+    for mission_dir in os.listdir(root):
+        if mission_dir.startswith("mission="):
+            for path in part_files(root, mission_dir[len("mission="):]):
+                date_dir = os.path.basename(os.path.dirname(path))
+                keyed.append((date_dir, int(_PART_RE.match(os.path.basename(path)).group(1)), path))
+    return [path for _, _, path in sorted(keyed)]
+
+
+def content_hash(df: pd.DataFrame) -> pd.Series:
+    """64-bit hash of every stored column of a row (column order independent)."""
+    cols = sorted(c for c in df.columns if c not in PARTITION_COLUMNS and c != CONTENT_HASH)
+    return pd.util.hash_pandas_object(df[cols], index=False)
+
+
+def stored_keys(root: str, mission: str) -> Set[Tuple[Optional[str], int]]:
+    """(row_id, content_hash) pairs of the current version of every stored row.
+
+    Like ``read(latest_only=True)``, a row's current version is what the newest
+    part that wrote its ``row_id`` holds; older versions are not counted, so a
+    row that changes back to an earlier value is appended again. Reads just
+    those two columns.
+    """
+    frames = []
+    for i, path in enumerate(part_files(root, mission)):
+        t = pq.read_table(path, columns=[c for c in ("row_id", CONTENT_HASH) if c in pq.read_schema(path).names])
+        ids = t.column("row_id").to_pylist() if "row_id" in t.column_names else [None] * t.num_rows
+        frames.append(pd.DataFrame({"row_id": pd.Series(ids, dtype=object),
+                                    CONTENT_HASH: t.column(CONTENT_HASH).to_numpy(), "part": i}))
+    if not frames:
+        return set()
+    df = pd.concat(frames, ignore_index=True)
+    current = df[df["part"] == df.groupby("row_id", dropna=False)["part"].transform("max")]
+    return set(zip(current["row_id"], current[CONTENT_HASH].tolist()))
+
+
+def new_rows(df: pd.DataFrame, root: str, mission: str) -> pd.DataFrame:
+    """Rows of ``df`` not yet stored for ``mission``, with their ``content_hash`` attached."""
+    df = df.assign(**{CONTENT_HASH: content_hash(df).to_numpy()})
+    known = stored_keys(root, mission)
+    if not known:
+        return df
+    ids = df["row_id"] if "row_id" in df.columns else [None] * len(df)
+    seen = np.fromiter(((rid, h) in known for rid, h in zip(ids, df[CONTENT_HASH].tolist())),
+                       dtype=bool, count=len(df))
+    return df[~seen]
+
+
+def append(df: pd.DataFrame, root: str, mission: str, date_tag: str) -> Optional[str]:
+    """Write ``df`` as the next part of ``mission``/``date_tag``; returns the path (None if empty)."""
+    if df.empty:
+        return None
+    out_dir = partition_dir(root, mission, date_tag)
+    os.makedirs(out_dir, exist_ok=True)
+    taken = [int(m.group(1)) for m in map(_PART_RE.match, os.listdir(out_dir)) if m]
+    path = os.path.join(out_dir, f"part-{max(taken, default=-1) + 1:05d}.parquet")
+    tmp = path + ".tmp"
+    # partition values live in the directory names
+    _fixed_types(df.drop(columns=[c for c in PARTITION_COLUMNS if c in df.columns])).to_parquet(
+        tmp, index=False, row_group_size=ROW_GROUP_ROWS, write_statistics=True)
+    os.replace(tmp, path)
+    logging.info(f"Catalog: appended {len(df)} rows for {mission} -> {path}")
+    return path
+
+
+def _fixed_types(df: pd.DataFrame) -> pd.DataFrame:
+    """``TEXT_COLUMNS`` and any other object column as strings (nulls kept), whatever one ingest inferred."""
+    text = [c for c in df.columns if c in TEXT_COLUMNS or df[c].dtype == object]
+    return df.astype({c: "string" for c in text}) if text else df
+
+
+def _unify(schemas: List[pa.Schema]) -> pa.Schema:
+    try:
+        return pa.unify_schemas(schemas, promote_options="permissive")
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        pass
+    # parts written before TEXT_COLUMNS was enforced: a field typed differently across parts reads as string
+    types = {}
+    for schema in schemas:
+        for f in schema:
+            types.setdefault(f.name, set()).add(f.type)
+    fixed = []
+    for schema in schemas:
+        fixed.append(pa.schema([
+            f.with_type(pa.string()) if len({t for t in types[f.name] if t != pa.null()}) > 1 else f
+            for f in schema
+        ]))
+    return pa.unify_schemas(fixed, promote_options="permissive")
+
+
+def dataset(root: str) -> Optional[ds.Dataset]:
+    """The whole catalog as one pyarrow dataset (None if empty).
+
+    Part schemas are unified first: a column that was all-null in one ingest and
+    typed in another, or int in one and float in another, reads as the wider type;
+    incompatible types (string in one part, double in another) read as string.
+    """
+    files = all_part_files(root)
+    if not files:
+        return None
+    schema = _unify([pq.read_schema(f).remove_metadata() for f in files] + [PARTITION_SCHEMA])
+    return ds.dataset(files, schema=schema, format="parquet", partition_base_dir=root,
+                      partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"))
+
+
+def read(root: str,
+         missions: Optional[Iterable[str]] = None,
+         valid_only: bool = False,
+         drop_superseded: bool = False,
+         latest_only: bool = False,
+         columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Load rows from the catalog.
+
+    ``missions`` prunes whole partitions; ``valid_only`` / ``drop_superseded`` keep
+    the rows ``is_valid == True`` / ``is_superseded != True`` selects (columns that
+    were never written are not filtered on) and are evaluated by the scanner, using
+    row-group statistics. ``latest_only`` keeps, per ``row_id``, only the rows from
+    the newest part that wrote it, i.e. the current version of every row.
+    ``columns`` defaults to every stored column plus ``mission``; names the
+    catalog has never stored are skipped.
+    """
+    dset = dataset(root)
+    if dset is None:
+        return pd.DataFrame(columns=columns or [])
+    names = dset.schema.names
+    if columns is None:
+        columns = [c for c in names if c not in (CONTENT_HASH, "date")]
+    else:
+        columns = [c for c in columns if c in names]  # never-written columns are simply absent
+
+    conds = []
+    if missions is not None:
+        conds.append(ds.field("mission").isin(list(missions)))
+    pruned = conds[0] if conds else None
+    if valid_only and "is_valid" in names:
+        conds.append(ds.field("is_valid") == True)  # noqa: E712 -- null/False both dropped
+    if drop_superseded and "is_superseded" in names:
+        conds.append((ds.field("is_superseded") != True) | ds.field("is_superseded").is_null())  # noqa: E712
+    expr = None
+    for c in conds:
+        expr = c if expr is None else expr & c
+
+    if not (latest_only and "row_id" in names):
+        return dset.to_table(columns=columns, filter=expr).to_pandas()
+
+    # newest part per row_id is decided before the row filters: an old valid
+    # version must not resurface because its replacement was flagged invalid
+    frags = list(dset.get_fragments(filter=pruned))
+    ids = [f.to_table(schema=dset.schema, columns=["row_id"]).column("row_id") for f in frags]
+    newest = (pd.Series(np.repeat(np.arange(len(frags)), [len(a) for a in ids]))
+              .groupby(pa.chunked_array(ids, type=dset.schema.field("row_id").type).to_pandas(), dropna=False)
+              .max())
+
+    wanted = columns + ([] if "row_id" in columns else ["row_id"])
+    tables = [f.to_table(schema=dset.schema, columns=wanted, filter=expr) for f in frags]
+    if not tables:
+        return pd.DataFrame(columns=columns)
+    df = pa.concat_tables(tables).to_pandas()
+    part = np.repeat(np.arange(len(frags)), [t.num_rows for t in tables])
+    keep = part == newest.reindex(df["row_id"]).to_numpy()
+    return df.loc[keep, columns].reset_index(drop=True)
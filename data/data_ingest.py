@@ -1,10 +1,12 @@
 import argparse
+import glob
 import os
 import sys
 import yaml
 import json
 import logging
 import hashlib
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
 from typing import List, Tuple, Dict, Optional
 import numpy as np
@@ -14,6 +16,13 @@ from astropy.io import fits
 from astropy.table import Table
 import importlib
 
+try:
+    from data import catalog
+    from data.labels import labels_3way
+except ImportError:  # run as a script: data/ itself is on sys.path
+    import catalog
+    from labels import labels_3way
+
 try:
     HAS_TABULATE = True
 except Exception:
@@ -32,6 +41,13 @@ def file_checksum(path: str, algo: str = "sha256") -> str:
             h.update(chunk)
     return h.hexdigest()
 
+def checksum_files(paths: List[str], max_workers: int = 4) -> Dict[str, str]:
+    # hashlib releases the GIL on large updates, so threads hash files in parallel
+    if not paths:
+        return {}
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(paths))) as pool:
+        return dict(zip(paths, pool.map(file_checksum, paths)))
+
 def df_to_markdown(df: pd.DataFrame, max_rows: int = 50) -> str:
     if df is None or df.empty:
         return "_No data_"
@@ -57,11 +73,47 @@ def round_period(val: Optional[float], ndigits: int = 4) -> Optional[float]:
     except Exception:
         return np.nan
 
+def round_periods(values: pd.Series, ndigits: int = 4) -> pd.Series:
+    """Column version of ``round_period``; matches Python's ``round`` value for value."""
+    x = pd.to_numeric(values, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+    out = np.round(x, ndigits)
+    # np.round scales before rounding, which can tip a value sitting on a .5
+    # boundary the other way; those few go through the correctly rounded builtin
+    scaled = np.abs(x * 10.0 ** ndigits)
+    with np.errstate(invalid="ignore"):
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) <= 4 * np.spacing(scaled)
+    redo = np.flatnonzero(np.isfinite(x) & (near_tie | (scaled >= 2.0 ** 52)))
+    out[redo] = [round(float(v), ndigits) for v in x[redo]]
+    return pd.Series(out, index=values.index)
+
+def hash_keys(keys: pd.Series, algo: str = "sha256") -> pd.Series:
+    """Stable per-row ids for ``system_key`` strings.
+
+    ``sha256`` is the hex digest used by every ingest so far; ``fast`` is pandas'
+    SipHash-based ``hash_array`` (64-bit, 16 hex chars), stable across runs and
+    platforms but not interchangeable with sha256 ids.
+    """
+    if algo == "sha256":
+        return pd.Series([hashlib.sha256(k.encode("utf-8")).hexdigest() for k in keys],
+                         index=keys.index, dtype=object)
+    if algo == "fast":
+        h = pd.util.hash_array(keys.to_numpy(dtype=object)).astype(">u8")
+        hexed = np.frombuffer(h.tobytes().hex().encode("ascii"), dtype="S16").astype(str)
+        return pd.Series(hexed, index=keys.index, dtype=object)
+    raise ValueError(f"Unknown row id hash: {algo}")
+
+def log_path_for(log_dir: str, timestamp: str) -> str:
+    return os.path.join(log_dir, f"data_ingest_{timestamp}.log")
+
 def setup_logging(log_dir: str) -> str:
     os.makedirs(log_dir, exist_ok=True)
     timestamp = now_ts_for_log()
-    log_path = os.path.join(log_dir, f"data_ingest_{timestamp}.log")
+    attach_log_handlers(log_path_for(log_dir, timestamp))
+    logging.info("Starting data ingestion pipeline")
+    return timestamp
 
+def attach_log_handlers(log_path: str) -> None:
+    # also the worker initializer for --jobs: every process appends to the same log
     logger = logging.getLogger()
     logger.handlers = []  
     logger.setLevel(logging.INFO)
@@ -76,9 +128,6 @@ def setup_logging(log_dir: str) -> str:
     ch.setFormatter(logging.Formatter("%(asctime)s [%(levelname)s] %(message)s"))
     logger.addHandler(ch)
 
-    logging.info("Starting data ingestion pipeline")
-    return timestamp
-
 def parse_args():
     parser = argparse.ArgumentParser(description="NASA Exoplanet Data Ingestion")
     parser.add_argument("--missions", nargs="+", choices=["kepler", "k2", "tess"], required=True)
@@ -89,6 +138,16 @@ def parse_args():
     parser.add_argument("--format", choices=["csv", "parquet"], default="parquet")
     parser.add_argument("--deduplicate", choices=["yes", "no"], default="no")
     parser.add_argument("--emit-qc-report", choices=["yes", "no"], default="no")
+    parser.add_argument("--row-id-hash", choices=["sha256", "fast"], default="sha256",
+                        help="row_id digest of system_key; 'fast' ids are not comparable with sha256 ones")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Missions processed in parallel worker processes (1 = in-process, sequential)")
+    parser.add_argument("--incremental", choices=["yes", "no"], default="no",
+                        help="Skip sources unchanged since the latest metadata_*.json and append only "
+                             "new/changed rows to the catalog instead of rewriting processed files")
+    parser.add_argument("--catalog", choices=["yes", "no"], default="no",
+                        help="Also append processed rows to the partitioned catalog (always on with --incremental)")
+    parser.add_argument("--catalog-dir", default="data/processed/catalog/")
     return parser.parse_args()
 
 def resolve_sources(missions: List[str]) -> List[str]:
@@ -171,17 +230,18 @@ def load_raw(source: str, mission: str, outdir_raw: str, timestamp_for_names: st
     except Exception as e:
         logging.error(f"Failed to save parquet raw for {mission}: {e}")
 
+    sums = checksum_files([p for p in (raw_path, parquet_path) if os.path.exists(p)])
     saved_info = {}
-    if os.path.exists(raw_path):
+    if raw_path in sums:
         saved_info["raw_path"] = raw_path
-        saved_info["raw_checksum_sha256"] = file_checksum(raw_path)
-    if os.path.exists(parquet_path):
+        saved_info["raw_checksum_sha256"] = sums[raw_path]
+    if parquet_path in sums:
         saved_info["raw_parquet_path"] = parquet_path
-        saved_info["raw_parquet_checksum_sha256"] = file_checksum(parquet_path)
+        saved_info["raw_parquet_checksum_sha256"] = sums[parquet_path]
 
     return df, saved_info
 
-def normalize_schema(df: pd.DataFrame, mission: str) -> pd.DataFrame:
+def normalize_schema(df: pd.DataFrame, mission: str, row_id_hash: str = "sha256") -> pd.DataFrame:
     try:
         schema_mod = importlib.import_module(f"data.schema.{mission}")
         if hasattr(schema_mod, "normalize"):
@@ -223,11 +283,14 @@ def normalize_schema(df: pd.DataFrame, mission: str) -> pd.DataFrame:
         else:
             df["object_id"] = np.nan
 
-    key_series = df.apply(
-        lambda r: f"{mission}|{str(r.get('object_id'))}|{round_period(r.get('period_days'))}",
-        axis=1
+    # f"{mission}|{object_id}|{round_period(period_days)}" per row, built column-wise
+    key_series = (
+        f"{mission}|"
+        + df["object_id"].astype(object).astype(str)
+        + "|"
+        + round_periods(safe_series(df, "period_days")).astype(str)
     )
-    df["row_id"] = key_series.apply(lambda s: hashlib.sha256(s.encode("utf-8")).hexdigest())
+    df["row_id"] = hash_keys(key_series, row_id_hash)
     df["system_key"] = key_series
 
     wanted_cols = [
@@ -261,21 +324,7 @@ def normalize_schema(df: pd.DataFrame, mission: str) -> pd.DataFrame:
         mask_convert = df["stellar_radius_rsun"].isna() & df["stellar_radius_m"].notna()
         df.loc[mask_convert, "stellar_radius_rsun"] = pd.to_numeric(df.loc[mask_convert, "stellar_radius_m"], errors="coerce") / RSUN_M
 
-    df["label_3way"] = df.get("label_3way", pd.Series([np.nan] * len(df), index=df.index))
-    raw = df.get("label_raw", pd.Series([np.nan] * len(df), index=df.index)).astype(str).str.upper()
-
-    def map_label(x: str) -> str:
-        if pd.isna(x) or x.strip() == "":
-            return "unknown"
-        if "CONFIRM" in x or x == "C" or x == "CONFIRMED":
-            return "confirmed"
-        if "CANDIDATE" in x or x == "PC":
-            return "candidate"
-        if "FALSE" in x or "FP" in x or "FALSE POSITIVE" in x:
-            return "fp"
-        return "unknown"
-
-    df["label_3way"] = raw.apply(map_label)
+    df["label_3way"] = labels_3way(safe_series(df, "label_raw")).astype(object)
     return df
 
 def load_qc_config(path: str = "data/schema/qc.yaml") -> dict:
@@ -306,7 +355,7 @@ def apply_qc_checks(df: pd.DataFrame, qc_cfg: dict | None = None) -> pd.DataFram
 
 def deduplicate(df: pd.DataFrame) -> pd.DataFrame:
     period = pd.to_numeric(safe_series(df, "period_days"), errors="coerce")
-    df["period_rounded"] = period.apply(lambda v: round_period(v, 4))
+    df["period_rounded"] = round_periods(period, 4)
 
     if "updated_at" not in df.columns:
         df["updated_at"] = pd.NaT
@@ -373,7 +422,9 @@ def save_outputs(df: pd.DataFrame,
                  timestamp_path: str,
                  missions: List[str],
                  raw_artifacts: Dict[str, Dict[str, str]],
-                 deduplicate_enabled: bool) -> Dict[str, str]:
+                 deduplicate_enabled: bool,
+                 row_id_hash: str = "sha256",
+                 catalog_dir: Optional[str] = None) -> Dict[str, str]:
     os.makedirs(outdir_processed, exist_ok=True)
 
     combined_path = os.path.join(outdir_processed, f"exoplanets_common_{timestamp_path}.{fmt}")
@@ -384,8 +435,10 @@ def save_outputs(df: pd.DataFrame,
     logging.info(f"Saved combined file: {combined_path}")
 
     per_mission_paths = {}
+    frames = {}
     for mission in missions:
         df_m = df[df["mission"] == mission]
+        frames[mission] = df_m
         path = os.path.join(outdir_processed, f"{mission}_processed_{timestamp_path}.{fmt}")
         if fmt == "csv":
             df_m.to_csv(path, index=False)
@@ -394,6 +447,7 @@ def save_outputs(df: pd.DataFrame,
         per_mission_paths[mission] = path
         logging.info(f"Saved {mission} file: {path}")
 
+    sums = checksum_files([combined_path, *(per_mission_paths[m] for m in missions)])
     metadata = {
         "timestamp": timestamp_path,
         "row_count": int(len(df)),
@@ -402,27 +456,147 @@ def save_outputs(df: pd.DataFrame,
         "schema_version": "1.0",
         "deduplication_enabled": deduplicate_enabled,
         "deduplication_key": "(mission, object_id, round(period_days, 1e-4))",
+        "row_id_hash": row_id_hash,
         "raw_artifacts": raw_artifacts,
         "processed_checksums": {
-            "combined_sha256": file_checksum(combined_path),
-            **{f"{m}_sha256": file_checksum(per_mission_paths[m]) for m in missions}
+            "combined_sha256": sums[combined_path],
+            **{f"{m}_sha256": sums[per_mission_paths[m]] for m in missions}
         },
-        "library_versions": {
-            "python": sys.version.split(" ")[0],
-            "pandas": pd.__version__,
-            "numpy": np.__version__,
-            "astropy": astropy.__version__,
-            "pyyaml": yaml.__version__,
-            "tabulate_available": HAS_TABULATE
-        }
+        "library_versions": library_versions()
     }
+    if catalog_dir:
+        metadata["catalog"] = append_to_catalog(frames, catalog_dir, timestamp_path)
+    meta_path = write_metadata(metadata, outdir_processed, timestamp_path)
+
+    artifacts = {"combined_path": combined_path, "metadata_path": meta_path, **per_mission_paths}
+    return artifacts
+
+def library_versions() -> Dict[str, object]:
+    return {
+        "python": sys.version.split(" ")[0],
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+        "astropy": astropy.__version__,
+        "pyyaml": yaml.__version__,
+        "tabulate_available": HAS_TABULATE
+    }
+
+def write_metadata(metadata: dict, outdir_processed: str, timestamp_path: str) -> str:
     meta_path = os.path.join(outdir_processed, f"metadata_{timestamp_path}.json")
     with open(meta_path, "w", encoding="utf-8") as f:
         json.dump(metadata, f, indent=2)
     logging.info(f"Saved metadata: {meta_path}")
+    return meta_path
 
-    artifacts = {"combined_path": combined_path, "metadata_path": meta_path, **per_mission_paths}
-    return artifacts
+def load_previous_metadata(outdir_processed: str) -> Tuple[Optional[str], Optional[dict]]:
+    """Latest metadata_<date>.json in ``outdir_processed`` (names sort by date)."""
+    paths = sorted(glob.glob(os.path.join(outdir_processed, "metadata_*.json")))
+    if not paths:
+        return None, None
+    try:
+        with open(paths[-1], "r", encoding="utf-8") as f:
+            return paths[-1], json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Ignoring unreadable metadata {paths[-1]}: {e}")
+        return None, None
+
+def unchanged_sources(missions: List[str], sources: List[str], previous: dict,
+                      catalog_dir: str) -> Dict[int, Dict[str, str]]:
+    """Positions whose source file hashes to the raw checksum recorded last time -> that run's artifacts.
+
+    The raw copy is byte-for-byte the source, so its checksum identifies the input.
+    A mission only counts as unchanged when ``catalog_dir`` already holds its rows:
+    the previous run may not have written a catalog, or written it elsewhere.
+    """
+    prev_raw = previous.get("raw_artifacts") or {}
+    sums = checksum_files(sorted({s for s in sources if os.path.isfile(s)}))
+    out = {}
+    for i, (mission, source) in enumerate(zip(missions, sources)):
+        recorded = (prev_raw.get(mission) or {}).get("raw_checksum_sha256")
+        if recorded and sums.get(source) == recorded and catalog.part_files(catalog_dir, mission):
+            out[i] = prev_raw[mission]
+    return out
+
+def append_to_catalog(frames: Dict[str, pd.DataFrame], catalog_dir: str, timestamp_path: str) -> dict:
+    """Append each mission's unseen rows to the catalog; returns the metadata section."""
+    appended: Dict[str, int] = {}
+    parts: Dict[str, Dict[str, str]] = {}
+    for mission, df in frames.items():
+        delta = catalog.new_rows(df, catalog_dir, mission)
+        path = catalog.append(delta, catalog_dir, mission, timestamp_path)
+        appended[mission] = int(len(delta))
+        if path:
+            parts[mission] = {"path": path, "sha256": file_checksum(path)}
+        logging.info(f"{mission}: {len(delta)} new or changed rows of {len(df)}")
+    return {"root": catalog_dir, "rows_appended": appended, "parts": parts}
+
+def save_incremental_outputs(frames: Dict[str, pd.DataFrame],
+                             catalog_dir: str,
+                             outdir_processed: str,
+                             timestamp_path: str,
+                             missions: List[str],
+                             raw_artifacts: Dict[str, Dict[str, str]],
+                             previous_metadata: Optional[str],
+                             unchanged_missions: List[str],
+                             deduplicate_enabled: bool,
+                             row_id_hash: str = "sha256") -> Dict[str, str]:
+    catalog_meta = append_to_catalog(frames, catalog_dir, timestamp_path)
+    metadata = {
+        "timestamp": timestamp_path,
+        "row_count": int(sum(catalog_meta["rows_appended"].values())),
+        "missions": missions,
+        "format": "parquet",
+        "schema_version": "1.0",
+        "incremental": True,
+        "previous_metadata": previous_metadata,
+        "unchanged_missions": unchanged_missions,
+        "deduplication_enabled": deduplicate_enabled,
+        "deduplication_key": "(mission, object_id, round(period_days, 1e-4))",
+        "row_id_hash": row_id_hash,
+        "raw_artifacts": raw_artifacts,
+        "catalog": catalog_meta,
+        "library_versions": library_versions()
+    }
+    meta_path = write_metadata(metadata, outdir_processed, timestamp_path)
+    return {"metadata_path": meta_path, **{m: p["path"] for m, p in catalog_meta["parts"].items()}}
+
+def run_mission(mission: str, source: str, outdir_raw: str, date_tag: str,
+                deduplicate_enabled: bool, row_id_hash: str = "sha256") -> Tuple[pd.DataFrame, Dict[str, str]]:
+    """load -> normalize -> QC (-> dedup) for one mission; module-level so worker processes can run it."""
+    df_raw, saved_info = load_raw(source, mission, outdir_raw, date_tag)
+    df_norm = normalize_schema(df_raw, mission, row_id_hash=row_id_hash)
+    df_qc = apply_qc_checks(df_norm)
+    if deduplicate_enabled:
+        df_qc = deduplicate(df_qc)
+    return df_qc, saved_info
+
+def run_missions(missions: List[str], sources: List[str], args, date_tag: str,
+                 log_path: str) -> Dict[int, Tuple[pd.DataFrame, Dict[str, str]]]:
+    """Results keyed by position in ``missions``; failed missions are logged and left out."""
+    kwargs = dict(outdir_raw=args.outdir_raw, date_tag=date_tag,
+                  deduplicate_enabled=(args.deduplicate == "yes"), row_id_hash=args.row_id_hash)
+    results: Dict[int, Tuple[pd.DataFrame, Dict[str, str]]] = {}
+    jobs = max(1, min(args.jobs, len(missions)))
+
+    if jobs == 1:
+        for i, (mission, source) in enumerate(zip(missions, sources)):
+            try:
+                results[i] = run_mission(mission, source, **kwargs)
+            except Exception as e:
+                logging.exception(f"Error processing {mission}: {e}")
+        return results
+
+    logging.info(f"Processing {len(missions)} missions with {jobs} worker processes")
+    with ProcessPoolExecutor(max_workers=jobs, initializer=attach_log_handlers, initargs=(log_path,)) as pool:
+        futures = {pool.submit(run_mission, mission, source, **kwargs): i
+                   for i, (mission, source) in enumerate(zip(missions, sources))}
+        for fut in as_completed(futures):
+            i = futures[fut]
+            try:
+                results[i] = fut.result()
+            except Exception as e:
+                logging.exception(f"Error processing {missions[i]}: {e}")
+    return results
 
 def main():
     args = parse_args()
@@ -432,7 +606,7 @@ def main():
     os.makedirs(os.path.join(args.outdir_processed, "qc"), exist_ok=True)
 
     log_timestamp = setup_logging("logs")
-    date_tag = now_ts_for_path()  
+    date_tag = now_ts_for_path()
 
     if args.sources == ["auto"]:
         try:
@@ -446,40 +620,65 @@ def main():
             sys.exit("Error: --missions and --sources must have the same length (or use --sources auto).")
         sources = args.sources
 
-    all_dfs = []
-    raw_artifacts: Dict[str, Dict[str, str]] = {}
-
-    for mission, source in zip(args.missions, sources):
-        try:
-            df_raw, saved_info = load_raw(source, mission, args.outdir_raw, date_tag)
-            raw_artifacts[mission] = saved_info
+    incremental = args.incremental == "yes"
+    previous_path, previous = load_previous_metadata(args.outdir_processed) if incremental else (None, None)
+    skipped = unchanged_sources(args.missions, sources, previous, args.catalog_dir) if previous else {}
+    for i in sorted(skipped):
+        logging.info(f"Source for {args.missions[i]} unchanged since {previous_path}; skipping.")
+    todo = [i for i in range(len(args.missions)) if i not in skipped]
 
-            df_norm = normalize_schema(df_raw, mission)
-            df_qc = apply_qc_checks(df_norm)
+    results = run_missions([args.missions[i] for i in todo], [sources[i] for i in todo],
+                           args, date_tag, log_path_for("logs", log_timestamp))
+    results = {todo[j]: r for j, r in results.items()}
 
-            if args.deduplicate == "yes":
-                df_qc = deduplicate(df_qc)
-
-            all_dfs.append(df_qc)
-            logging.info(f"Completed pipeline for {mission}: rows={len(df_qc)}")
-        except Exception as e:
-            logging.exception(f"Error processing {mission}: {e}")
+    all_dfs = []
+    frames: Dict[str, pd.DataFrame] = {}
+    raw_artifacts: Dict[str, Dict[str, str]] = {}
+    # merge in command-line order, whatever order the workers finished in
+    for i, mission in enumerate(args.missions):
+        if i in skipped:
+            raw_artifacts[mission] = skipped[i]
+        if i not in results:
             continue
-
+        df_qc, saved_info = results[i]
+        raw_artifacts[mission] = saved_info
+        frames[mission] = df_qc
+        all_dfs.append(df_qc)
+        logging.info(f"Completed pipeline for {mission}: rows={len(df_qc)}")
+
+    if incremental and not todo:
+        logging.info("All sources unchanged; nothing to ingest.")
+        return
     if not all_dfs:
         logging.error("No dataframes were successfully processed. Exiting.")
         sys.exit(1)
 
     df_all = pd.concat(all_dfs, ignore_index=True)
-    artifacts = save_outputs(
-        df_all,
-        args.outdir_processed,
-        args.format,
-        date_tag,
-        args.missions,
-        raw_artifacts,
-        deduplicate_enabled=(args.deduplicate == "yes")
-    )
+    if incremental:
+        artifacts = save_incremental_outputs(
+            frames,
+            args.catalog_dir,
+            args.outdir_processed,
+            date_tag,
+            args.missions,
+            raw_artifacts,
+            previous_metadata=previous_path,
+            unchanged_missions=[args.missions[i] for i in sorted(skipped)],
+            deduplicate_enabled=(args.deduplicate == "yes"),
+            row_id_hash=args.row_id_hash,
+        )
+    else:
+        artifacts = save_outputs(
+            df_all,
+            args.outdir_processed,
+            args.format,
+            date_tag,
+            args.missions,
+            raw_artifacts,
+            deduplicate_enabled=(args.deduplicate == "yes"),
+            row_id_hash=args.row_id_hash,
+            catalog_dir=args.catalog_dir if args.catalog == "yes" else None,
+        )
 
     if args.emit_qc_report == "yes":
         qc_dir = os.path.join(args.outdir_processed, "qc")
@@ -0,0 +1,66 @@
+from __future__ import annotations
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+# One disposition -> label table for ingest (data_ingest.map_label), feature prep
+# (prepare_features.map_targets) and retraining (retrain_model.create_labels).
+
+LABELS = ("fp", "candidate", "confirmed", "unknown")
+
+# class index used by target_map.json / the model; unknown trains as fp
+LABEL_CODES = {"fp": 0, "candidate": 1, "confirmed": 2, "unknown": 0}
+TARGET_MAP = {"confirmed": 2, "candidate": 1, "fp": 0}
+
+# upper-cased, stripped archive values (KOI, K2 and TOI/TFOPWG vocabularies)
+DISPOSITIONS = {
+    "CONFIRMED": "confirmed",
+    "CONFIRMED PLANET": "confirmed",
+    "C": "confirmed",
+    "CP": "confirmed",  # TFOPWG: confirmed planet
+    "KP": "confirmed",  # TFOPWG: known planet
+    "CANDIDATE": "candidate",
+    "PLANETARY CANDIDATE": "candidate",
+    "PC": "candidate",
+    "FALSE POSITIVE": "fp",
+    "FP": "fp",
+    "NOT A PLANET": "fp",
+}
+
+# first non-null wins: Kepler/normalized, K2 archive, TESS TFOPWG
+DISPOSITION_COLUMNS = ("label_raw", "disposition", "tfopwg_disposition")
+
+
+def disposition_label(value: Optional[str]) -> str:
+    """Scalar rule: exact table entry, else the free-text fallbacks, else ``unknown``."""
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return "unknown"
+    x = str(value).upper().strip()
+    if x in DISPOSITIONS:
+        return DISPOSITIONS[x]
+    if "CONFIRM" in x:
+        return "confirmed"
+    if "CANDIDATE" in x:
+        return "candidate"
+    if "FALSE" in x or "FP" in x:
+        return "fp"
+    return "unknown"
+
+
+def labels_3way(values: pd.Series) -> pd.Series:
+    """``disposition_label`` over a column, evaluated once per distinct value."""
+    codes, uniques = pd.factorize(values, use_na_sentinel=True)
+    mapped = np.array([LABELS.index(disposition_label(u)) for u in uniques] + [LABELS.index("unknown")], dtype=np.int8)
+    # the NA sentinel (-1) picks the trailing "unknown"
+    return pd.Series(pd.Categorical.from_codes(mapped[codes], categories=list(LABELS)), index=values.index)
+
+
+def coalesce_dispositions(df: pd.DataFrame, columns: Iterable[str] = DISPOSITION_COLUMNS) -> pd.Series:
+    """Per row, the first non-null of ``columns`` (missing columns are skipped)."""
+    out = pd.Series(np.nan, index=df.index, dtype=object)
+    for col in columns:
+        if col in df.columns:
+            out = out.where(out.notna(), df[col].astype(object))
+    return out
+
@@ -12,9 +12,19 @@ from sklearn.pipeline import Pipeline
 from sklearn.compose import ColumnTransformer
 import joblib
 
+try:
+    from data import catalog
+    from data.labels import LABEL_CODES, TARGET_MAP
+except ImportError:  # run as a script: data/ itself is on sys.path
+    import catalog
+    from labels import LABEL_CODES, TARGET_MAP
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Prepare ML features from processed exoplanet dataset")
-    parser.add_argument("--input", required=True)
+    parser.add_argument("--input", required=True,
+                        help="Processed .parquet/.csv file, or a catalog directory (e.g. data/processed/catalog)")
+    parser.add_argument("--columns", nargs="+", default=None,
+                        help="Catalog input only: columns to load (mission, label_3way and the group column are added)")
     parser.add_argument("--missions", nargs="+", choices=["kepler", "k2", "tess", "all"], default=["all"])
     parser.add_argument("--target", choices=["label_3way", "binary"], default="label_3way")
     parser.add_argument("--drop-invalid", choices=["yes", "no"], default="yes")
@@ -35,10 +45,19 @@ def setup_logging():
     logging.getLogger().addHandler(logging.StreamHandler())
     return ts
 
-def load_and_filter(path, missions, drop_invalid):
-    df = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
-    if "all" not in missions:
-        df = df[df["mission"].isin(missions)]
+def load_and_filter(path, missions, drop_invalid, columns=None):
+    if os.path.isdir(path):
+        # mission/validity filters and the projection run inside the Parquet scan
+        df = catalog.read(path,
+                          missions=None if "all" in missions else missions,
+                          valid_only=drop_invalid == "yes",
+                          drop_superseded=drop_invalid == "yes",
+                          latest_only=True,
+                          columns=columns)
+    else:
+        df = pd.read_parquet(path) if path.endswith(".parquet") else pd.read_csv(path)
+        if "all" not in missions:
+            df = df[df["mission"].isin(missions)]
 
     for c in ["period_days", "duration_hours", "depth_ppm"]:
         if c not in df.columns:
@@ -54,10 +73,8 @@ def load_and_filter(path, missions, drop_invalid):
     return df
 
 def map_targets(df, target_mode, outdir):
-    label_map = {"confirmed": 2, "candidate": 1, "fp": 0, "unknown": 0}
-
     df["label_3way"] = df["label_3way"].astype(str).str.lower().str.strip()
-    df["target"] = df["label_3way"].map(label_map)
+    df["target"] = df["label_3way"].map(LABEL_CODES)
 
     if target_mode == "binary":
         df["target"] = df["target"].apply(lambda x: 1 if x in (1, 2) else 0)
@@ -67,7 +84,7 @@ def map_targets(df, target_mode, outdir):
 
     os.makedirs(outdir, exist_ok=True)
     with open(os.path.join(outdir, "target_map.json"), "w") as f:
-        json.dump({"confirmed": 2, "candidate": 1, "fp": 0}, f)  # карта классов для UI/чтения
+        json.dump(TARGET_MAP, f)  # карта классов для UI/чтения
     return df
 
 def engineer_features(df: pd.DataFrame) -> pd.DataFrame:
@@ -273,7 +290,10 @@ def main():
     ts = setup_logging()
     os.makedirs(args.outdir, exist_ok=True)
 
-    df = load_and_filter(args.input, args.missions, args.drop_invalid)
+    columns = None
+    if args.columns:
+        columns = list(dict.fromkeys([*args.columns, "mission", "label_3way", args.group_col]))
+    df = load_and_filter(args.input, args.missions, args.drop_invalid, columns)
     df = map_targets(df, args.target, args.outdir)
     df = engineer_features(df)
     X_proc, y, feature_list = build_preprocessor(df, args.outdir)
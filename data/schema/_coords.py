@@ -0,0 +1,113 @@
+from __future__ import annotations
+import re
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Column-at-a-time parsers shared by the schema modules. The well-formed inputs
+# NASA exports actually contain are matched and converted in Arrow (RE2 + the
+# string->float64 cast, which rounds exactly like float()); anything the fast
+# pattern does not accept goes through the original per-value code, so results
+# are identical to mapping the scalar functions over the column.
+
+
+def _sexagesimal_to_deg(val: Optional[str], is_ra: bool) -> float:
+    if val is None or (isinstance(val, float) and np.isnan(val)):
+        return np.nan
+    s = str(val).strip().replace(" ", "")
+    try:
+        if "h" in s or "d" in s or "m" in s or "s" in s:
+            s = s.lower().replace("h", ":").replace("d", ":").replace("m", ":").replace("s", "")
+        parts = s.split(":")
+        if len(parts) < 2:
+            return np.nan
+        sign = 1.0
+        if not is_ra and parts[0].startswith("-"):
+            sign = -1.0
+        h_d = float(parts[0])
+        m   = float(parts[1]) if len(parts) > 1 else 0.0
+        sec = float(parts[2]) if len(parts) > 2 else 0.0
+        if is_ra:
+            hours = abs(h_d) + m/60.0 + sec/3600.0
+            return hours * 15.0
+        else:
+            deg = abs(h_d) + m/60.0 + sec/3600.0
+            return sign * deg
+    except Exception:
+        return np.nan
+
+
+_UNSIGNED = r"[0-9]+(?:\.[0-9]*)?"
+# "03h34m36.27s", "+20d35m56.47s", "03:34:36.27", "12:30" -- every match parses the same way
+# under the scalar rules (letters -> ':', trailing 's' dropped, missing seconds = 0)
+_SEXAGESIMAL_RE2 = rf"^(?P<a>[+-]?{_UNSIGNED})[hd:](?P<b>{_UNSIGNED})(?:[m:](?P<c>{_UNSIGNED}))?s?$"
+
+# ASCII spelling of r"(EPIC\s*\d+)" with re.IGNORECASE (RE2's \s lacks \v)
+_EPIC_RE2 = r"(?i)(?P<epic>EPIC[ \t\n\r\f\v]*[0-9]+)"
+_EPIC_RE = re.compile(r"(EPIC\s*\d+)", flags=re.IGNORECASE)
+
+
+def _to_arrow_strings(values: pd.Series) -> Optional[pa.Array]:
+    try:
+        arr = pa.array(values.to_numpy(dtype=object), from_pandas=True)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        return None
+    return arr if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type) else None
+
+
+def sexagesimal_to_deg(values: pd.Series, is_ra: bool) -> pd.Series:
+    """Vectorized ``_sexagesimal_to_deg`` over a column; RA hours are scaled by 15."""
+    arr = _to_arrow_strings(values)
+    if arr is None:
+        return values.map(lambda v: _sexagesimal_to_deg(v, is_ra)).astype(np.float64)
+
+    parts = pc.extract_regex(arr, _SEXAGESIMAL_RE2)
+    a = pc.struct_field(parts, "a")
+    h_d = pc.cast(a, pa.float64()).to_numpy(zero_copy_only=False)
+    m = pc.cast(pc.struct_field(parts, "b"), pa.float64()).to_numpy(zero_copy_only=False)
+    c = pc.struct_field(parts, "c")
+    sec = pc.cast(pc.if_else(pc.equal(c, ""), "0", c), pa.float64()).fill_null(0.0).to_numpy(zero_copy_only=False)
+
+    out = np.abs(h_d) + m / 60.0 + sec / 3600.0
+    if is_ra:
+        out = out * 15.0
+    else:
+        neg = pc.starts_with(a, "-").fill_null(False).to_numpy(zero_copy_only=False)
+        out = np.where(neg, -1.0, 1.0) * out
+
+    # present but not in the canonical form: defer to the scalar rules
+    odd = np.flatnonzero((pc.is_valid(arr).to_numpy(zero_copy_only=False)
+                          & ~pc.is_valid(parts).to_numpy(zero_copy_only=False)))
+    if len(odd):
+        raw = values.to_numpy(dtype=object)
+        out[odd] = [_sexagesimal_to_deg(raw[i], is_ra) for i in odd]
+    return pd.Series(out, index=values.index)
+
+
+def _extract_epic(name: Optional[str]) -> Optional[str]:
+    if name is None or (isinstance(name, float) and np.isnan(name)):
+        return None
+    m = _EPIC_RE.search(str(name))
+    return m.group(1).upper().replace("  ", " ") if m else None
+
+
+def extract_epic(names: pd.Series) -> pd.Series:
+    """Vectorized ``_extract_epic``: first ``EPIC <digits>`` upper-cased, None where there is none."""
+    arr = _to_arrow_strings(names)
+    if arr is None:
+        return pd.Series([_extract_epic(v) for v in names.to_numpy(dtype=object)], index=names.index, dtype=object)
+
+    epic = pc.struct_field(pc.extract_regex(arr, _EPIC_RE2), "epic")
+    epic = pc.replace_substring(pc.ascii_upper(epic), "  ", " ")
+    out = epic.to_numpy(zero_copy_only=False).astype(object)
+    out[pd.isna(out)] = None
+
+    # RE2 only agrees with Python's Unicode \s, \d and case folding on ASCII text
+    non_ascii = np.flatnonzero(~pc.string_is_ascii(arr).fill_null(True).to_numpy(zero_copy_only=False))
+    if len(non_ascii):
+        raw = names.to_numpy(dtype=object)
+        out[non_ascii] = [_extract_epic(raw[i]) for i in non_ascii]
+    return pd.Series(out, index=names.index, dtype=object)
@@ -4,36 +4,7 @@ import numpy as np
 import pandas as pd
 from typing import Optional
 
-def _sexagesimal_to_deg(val: Optional[str], is_ra: bool) -> float:
-    if val is None or (isinstance(val, float) and np.isnan(val)):
-        return np.nan
-    s = str(val).strip().replace(" ", "")
-    try:
-        if "h" in s or "d" in s or "m" in s or "s" in s:
-            s = s.lower().replace("h", ":").replace("d", ":").replace("m", ":").replace("s", "")
-        parts = s.split(":")
-        if len(parts) < 2:
-            return np.nan
-        sign = 1.0
-        if not is_ra and parts[0].startswith("-"):
-            sign = -1.0
-        h_d = float(parts[0])
-        m   = float(parts[1]) if len(parts) > 1 else 0.0
-        sec = float(parts[2]) if len(parts) > 2 else 0.0
-        if is_ra:
-            hours = abs(h_d) + m/60.0 + sec/3600.0
-            return hours * 15.0
-        else:
-            deg = abs(h_d) + m/60.0 + sec/3600.0
-            return sign * deg
-    except Exception:
-        return np.nan
-
-def _extract_epic(name: Optional[str]) -> Optional[str]:
-    if name is None or (isinstance(name, float) and np.isnan(name)):
-        return None
-    m = re.search(r"(EPIC\s*\d+)", str(name), flags=re.IGNORECASE)
-    return m.group(1).upper().replace("  ", " ") if m else None
+from data.schema._coords import sexagesimal_to_deg, extract_epic
 
 COLUMN_MAP: dict[str, str] = {
     "Planet Name": "planet_name",
@@ -155,7 +126,7 @@ def normalize(df: pd.DataFrame) -> pd.DataFrame:
     
     # Extract EPIC ID from planet name
     if "planet_name" in df.columns:
-        df["epic_id"] = df["planet_name"].apply(_extract_epic)
+        df["epic_id"] = extract_epic(df["planet_name"])
     
     # Set object_id 
     if "object_id" not in df.columns:
@@ -214,9 +185,9 @@ def normalize(df: pd.DataFrame) -> pd.DataFrame:
 
 
     if "ra_sexagesimal" in df.columns:
-        df["ra_deg"] = df["ra_sexagesimal"].apply(lambda x: _sexagesimal_to_deg(x, is_ra=True))
+        df["ra_deg"] = sexagesimal_to_deg(df["ra_sexagesimal"], is_ra=True)
     if "dec_sexagesimal" in df.columns:
-        df["dec_deg"] = df["dec_sexagesimal"].apply(lambda x: _sexagesimal_to_deg(x, is_ra=False))
+        df["dec_deg"] = sexagesimal_to_deg(df["dec_sexagesimal"], is_ra=False)
 
     if "rp_rearth" in df.columns and "rp_rjup" in df.columns:
         mask = df["rp_rearth"].isna() & df["rp_rjup"].notna()
@@ -230,8 +201,8 @@ def normalize(df: pd.DataFrame) -> pd.DataFrame:
             df[dc] = pd.to_datetime(df[dc], errors="coerce")
 
     if "object_id" not in df.columns:
-        epic_from_host = df["host_name"].apply(_extract_epic) if "host_name" in df.columns else pd.Series([None]*len(df))
-        epic_from_plan = df["planet_name"].apply(_extract_epic) if "planet_name" in df.columns else pd.Series([None]*len(df))
+        epic_from_host = extract_epic(df["host_name"]) if "host_name" in df.columns else pd.Series([None]*len(df))
+        epic_from_plan = extract_epic(df["planet_name"]) if "planet_name" in df.columns else pd.Series([None]*len(df))
         obj = epic_from_host.fillna(epic_from_plan)
         if obj.isna().all():
             obj = df.get("planet_name", pd.Series([np.nan]*len(df)))
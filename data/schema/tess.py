@@ -3,30 +3,7 @@ import numpy as np
 import pandas as pd
 from typing import Optional
 
-def _sexagesimal_to_deg(val: Optional[str], is_ra: bool) -> float:
-    if val is None or (isinstance(val, float) and np.isnan(val)):
-        return np.nan
-    s = str(val).strip().replace(" ", "")
-    try:
-        if "h" in s or "d" in s or "m" in s or "s" in s:
-            s = s.lower().replace("h", ":").replace("d", ":").replace("m", ":").replace("s", "")
-        parts = s.split(":")
-        if len(parts) < 2:
-            return np.nan
-        sign = 1.0
-        if not is_ra and parts[0].startswith("-"):
-            sign = -1.0
-        h_d = float(parts[0])
-        m   = float(parts[1]) if len(parts) > 1 else 0.0
-        sec = float(parts[2]) if len(parts) > 2 else 0.0
-        if is_ra:
-            hours = abs(h_d) + m/60.0 + sec/3600.0
-            return hours * 15.0
-        else:
-            deg = abs(h_d) + m/60.0 + sec/3600.0
-            return sign * deg
-    except Exception:
-        return np.nan
+from data.schema._coords import sexagesimal_to_deg
 
 COLUMN_MAP: dict[str, str] = {
     # From actual TESS CSV file column names
@@ -87,9 +64,9 @@ def normalize(df: pd.DataFrame) -> pd.DataFrame:
 
     # Convert sexagesimal coordinates if needed
     if "ra_deg" not in df.columns and "ra_sexagesimal" in df.columns:
-        df["ra_deg"] = df["ra_sexagesimal"].apply(lambda x: _sexagesimal_to_deg(x, is_ra=True))
+        df["ra_deg"] = sexagesimal_to_deg(df["ra_sexagesimal"], is_ra=True)
     if "dec_deg" not in df.columns and "dec_sexagesimal" in df.columns:
-        df["dec_deg"] = df["dec_sexagesimal"].apply(lambda x: _sexagesimal_to_deg(x, is_ra=False))
+        df["dec_deg"] = sexagesimal_to_deg(df["dec_sexagesimal"], is_ra=False)
 
     # Create TIC ID from raw
     if "tic_id" not in df.columns:
@@ -2,14 +2,15 @@
 """
 Debug model output format
 """
-from api.services.pipeline import _lazy_boot_tabular, _TAB_MODEL, _FEATURES, _TARGET_MAP
+from api.services.registry import REGISTRY
 import pandas as pd
 import numpy as np
 
 print("🔍 Debugging model output...")
 
 # Load model
-_lazy_boot_tabular()
+bundle = REGISTRY.load()
+_TAB_MODEL, _FEATURES, _TARGET_MAP = bundle.tab_model, list(bundle.features), bundle.classes
 
 print(f"Model type: {type(_TAB_MODEL)}")
 print(f"Model classes: {getattr(_TAB_MODEL, 'classes_', 'Not available')}")
@@ -64,37 +64,12 @@ def create_labels(df):
     """Create proper labels from disposition columns"""
     log.info("Creating labels from dispositions...")
     
-    # Initialize labels
-    labels = []
-    
-    for _, row in df.iterrows():
-        # Check different label columns based on mission
-        disposition = None
-        
-        # Kepler labels
-        if pd.notna(row.get('label_raw')):
-            disposition = str(row['label_raw']).upper().strip()
-        
-        # K2 labels  
-        elif pd.notna(row.get('disposition')):
-            disposition = str(row['disposition']).upper().strip()
-            
-        # TESS labels
-        elif pd.notna(row.get('tfopwg_disposition')):
-            disposition = str(row['tfopwg_disposition']).upper().strip()
-        
-        # Map dispositions to our classes
-        if disposition in ['CONFIRMED', 'CONFIRMED PLANET']:
-            labels.append(2)  # confirmed
-        elif disposition in ['CANDIDATE', 'PLANETARY CANDIDATE', 'PC', 'CP']:
-            labels.append(1)  # candidate  
-        elif disposition in ['FALSE POSITIVE', 'FP', 'NOT A PLANET']:
-            labels.append(0)  # false positive
-        else:
-            # Default to false positive for unknown/missing labels
-            labels.append(0)
-    
-    labels = np.array(labels)
+    from data.labels import LABEL_CODES, coalesce_dispositions, labels_3way
+
+    # label_raw (Kepler), then disposition (K2), then tfopwg_disposition (TESS);
+    # missing or unrecognised dispositions count as false positives
+    labels = labels_3way(coalesce_dispositions(df)).map(LABEL_CODES).to_numpy(dtype=np.int64)
+
     log.info(f"Label distribution: {np.bincount(labels)}")
     log.info(f"  0 (fp): {np.sum(labels == 0)}")
     log.info(f"  1 (candidate): {np.sum(labels == 1)}")  
@@ -197,6 +172,16 @@ def save_model_artifacts(model, feature_names, X_train, y_train, X_val, y_val, X
     pd.DataFrame({"target": y_train}).to_parquet(models_dir / "y_train.parquet")
     pd.DataFrame({"target": y_val}).to_parquet(models_dir / "y_val.parquet")
     pd.DataFrame({"target": y_test}).to_parquet(models_dir / "y_test.parquet")
+
+    # same splits as memory-mapped .npy + .json for validation/evaluation processes; the scored
+    # splits keep float64 so they match what the server feeds the model
+    from api.utils.constants import FEATURE_STORE_DTYPE
+    from api.utils.feature_store import write_features
+    for name, X_split, dtype in (("X_train", X_train, FEATURE_STORE_DTYPE),
+                                 ("X_val", X_val, np.float64), ("X_test", X_test, np.float64)):
+        write_features(models_dir / name, pd.DataFrame(X_split), dtype=dtype)
+    for name, y_split in (("y_train", y_train), ("y_val", y_val), ("y_test", y_test)):
+        write_features(models_dir / name, np.asarray(y_split), ["target"], dtype=np.int64)
     
     log.info("Saved training data splits")
     
@@ -271,7 +256,8 @@ def main():
         )
         
         log.info("✅ Model retraining completed successfully!")
-        log.info("🔄 Restart the API server to use the new model")
+        log.info("🔄 Running API servers pick up the new model via POST /admin/reload "
+                 "(or automatically when MODEL_WATCH_INTERVAL is set)")
         
     except Exception as e:
         log.error(f"❌ Retraining failed: {e}")
@@ -0,0 +1,71 @@
+"""Throughput of small /inference/predict-sized calls with and without micro-batching.
+
+    python scripts/bench_batching.py --clients 16 --requests 50 --window-ms 3
+"""
+import argparse
+import sys
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+
+from api.utils.io import read_table, normalize_schema
+from api.services.registry import REGISTRY
+from api.services.pipeline import predict_tab
+from api.services.batching import MicroBatcher
+
+
+def run(frames, clients, batcher, bundle):
+    latencies = []
+
+    def call(df):
+        t = time.perf_counter()
+        out = predict_tab(df, bundle=bundle, batcher=batcher)
+        latencies.append(time.perf_counter() - t)
+        return out["proba"]
+
+    t0 = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        results = list(pool.map(call, frames))
+    wall = time.perf_counter() - t0
+    lat = np.sort(np.asarray(latencies)) * 1e3
+    return results, len(frames) / wall, np.percentile(lat, 50), np.percentile(lat, 99)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=50, help="requests per client")
+    ap.add_argument("--window-ms", type=float, default=3.0)
+    ap.add_argument("--max-rows", type=int, default=512)
+    args = ap.parse_args()
+    warnings.filterwarnings("ignore")
+
+    bundle = REGISTRY.load()
+    df = normalize_schema(read_table(REPO_ROOT / "data/sources/kepler.csv"), "kepler")
+    rng = np.random.default_rng(0)
+    frames = []
+    for _ in range(args.clients * args.requests):
+        n = int(rng.integers(1, 21))
+        start = int(rng.integers(0, len(df) - n))
+        frames.append(df.iloc[start:start + n])
+
+    base, rps0, p50_0, p99_0 = run(frames, args.clients, None, bundle)
+    batcher = MicroBatcher(window_ms=args.window_ms, max_rows=args.max_rows)
+    batched, rps1, p50_1, p99_1 = run(frames, args.clients, batcher, bundle)
+    batcher.stop()
+
+    max_diff = max(np.max(np.abs(np.asarray(a) - np.asarray(b))) for a, b in zip(base, batched))
+    print(f"requests={len(frames)} clients={args.clients} window={args.window_ms}ms")
+    print(f"unbatched: {rps0:8.1f} req/s  p50={p50_0:7.2f}ms  p99={p99_0:7.2f}ms")
+    print(f"batched:   {rps1:8.1f} req/s  p50={p50_1:7.2f}ms  p99={p99_1:7.2f}ms")
+    print(f"max |proba diff| = {max_diff:.3g}")
+
+
+if __name__ == "__main__":
+    main()
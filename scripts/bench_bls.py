@@ -0,0 +1,76 @@
+"""Transit period recovery: BLS search (api.services.bls) vs. the old Lomb-Scargle guess.
+
+Injects box transits of random period/duration/depth into noisy synthetic
+curves (TESS-like 2-minute cadence by default) and reports, per method, the
+share of periods recovered within 1% and the time per curve. Lomb-Scargle
+needs astropy and is skipped without it.
+
+    python scripts/bench_bls.py --curves 20 --days 27 --cadence-min 2 --workers 1 4
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+
+from api.services.bls import search_transit
+
+
+def _lomb_scargle(t, y):
+    # the previous curves.guess_period_naive
+    from astropy.timeseries import LombScargle
+
+    baseline = np.nanmax(t) - np.nanmin(t)
+    freq = np.linspace(1.0 / (baseline * 2.0), 24.0, 5000)
+    best = freq[np.argmax(LombScargle(t, y).power(freq))]
+    return 1.0 / best
+
+
+def _curve(rng, days, cadence_min):
+    t = np.arange(0, days, cadence_min / 1440.0)
+    t = t[rng.random(len(t)) > 0.05]
+    period = float(np.exp(rng.uniform(np.log(0.7), np.log(days / 3))))
+    duration = float(rng.uniform(1.0, min(8.0, 0.1 * period * 24)))
+    depth = float(rng.uniform(1.5e-3, 6e-3))
+    y = 1 + rng.normal(0, 1e-3, len(t)) + 2e-3 * np.sin(2 * np.pi * t / 11.0)
+    phase = ((t - rng.uniform(0, period)) / period + 0.5) % 1.0 - 0.5
+    y[np.abs(phase) * period * 24 < duration / 2] -= depth
+    return t, y, period
+
+
+def _run(name, fn, curves):
+    hits, t0 = 0, time.perf_counter()
+    for t, y, period in curves:
+        found = fn(t, y)
+        hits += found is not None and abs(found / period - 1) < 0.01
+    dt = (time.perf_counter() - t0) / len(curves)
+    print(f"{name:<22s} recovered {hits:3d}/{len(curves)}  {dt * 1e3:8.1f} ms/curve")
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--curves", type=int, default=20)
+    ap.add_argument("--days", type=float, default=27.0)
+    ap.add_argument("--cadence-min", type=float, default=2.0)
+    ap.add_argument("--workers", type=int, nargs="+", default=[1])
+    args = ap.parse_args()
+    rng = np.random.default_rng(0)
+    curves = [_curve(rng, args.days, args.cadence_min) for _ in range(args.curves)]
+    print(f"{args.curves} curves, {args.days:g} days at {args.cadence_min:g}-minute cadence "
+          f"(~{len(curves[0][0])} points)")
+
+    try:
+        import astropy  # noqa: F401
+        _run("Lomb-Scargle (5000)", _lomb_scargle, curves)
+    except ImportError:
+        print("astropy not installed; skipping Lomb-Scargle")
+    for w in args.workers:
+        _run(f"BLS, {w} worker(s)", lambda t, y: getattr(search_transit(t, y, workers=w), "period_days", None), curves)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Single-pass CSV reader vs. the python-engine cascade on data/sources/*.csv.
+
+    python scripts/bench_csv_reader.py --repeat 5
+"""
+import argparse
+import io
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from api.utils.io import _read_csv_cascade, _read_csv_robust
+
+
+def _best(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        t = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t)
+    return out, best
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    ok = True
+    for path in sorted((REPO_ROOT / "data" / "sources").glob("*.csv")):
+        raw = path.read_bytes()
+        old, t_old = _best(lambda: _read_csv_cascade(io.BytesIO(raw), sep_hint=","), args.repeat)
+        new, t_new = _best(lambda: _read_csv_robust(io.BytesIO(raw), sep_hint=","), args.repeat)
+        same = old.equals(new) and list(old.dtypes) == list(new.dtypes)
+        ok &= same
+        print(f"{path.name:12s} {len(new):6d} rows  cascade {t_old * 1e3:8.1f} ms  "
+              f"single-pass {t_new * 1e3:7.1f} ms  x{t_old / t_new:5.1f}  identical={same}")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Light-curve detrending (api.services.curves._detrend) on long synthetic curves.
+
+Compares the rolling median with the per-window ``np.nanmedian`` loop it
+replaces (which must agree exactly) and times every method. Transit depth is
+measured on the detrended curve, so methods that eat into the transit show up.
+
+    python scripts/bench_detrend.py --sizes 20000 100000 --loop-max 20000
+"""
+import argparse
+import sys
+import time
+import warnings
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+
+from api.services.curves import DETREND_METHODS, _detrend, _rolling_median, _window
+
+
+def _loop_median(y: np.ndarray, k: int) -> np.ndarray:
+    # the previous fallback
+    pad = k // 2
+    ypad = np.pad(y, (pad, pad), mode="edge")
+    med = np.empty_like(y)
+    for i in range(len(y)):
+        med[i] = np.nanmedian(ypad[i:i + k])
+    return med
+
+
+def _curve(n: int, rng: np.random.Generator):
+    """2-minute cadence: slow systematics, white noise, 1% transits every 3.1 days, a few gaps."""
+    t = np.arange(n) * (2.0 / 1440)
+    trend = 1 + 0.01 * np.sin(2 * np.pi * t / 13.7) + 0.004 * t / max(t[-1], 1)
+    in_transit = ((t % 3.1) < 0.12)
+    y = trend * (1 - 0.01 * in_transit) + rng.normal(0, 5e-4, n)
+    y[rng.random(n) < 0.01] = np.nan
+    return y, in_transit
+
+
+def _time(fn):
+    t = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[20_000, 100_000])
+    ap.add_argument("--loop-max", type=int, default=20_000, help="skip the old loop above this many cadences")
+    args = ap.parse_args()
+    warnings.filterwarnings("ignore")
+    rng = np.random.default_rng(0)
+
+    for n in args.sizes:
+        y, in_transit = _curve(n, rng)
+        k = _window(n)
+        print(f"n={n}  window={k}")
+        fast, t_fast = _time(lambda: _rolling_median(y, k))
+        if n <= args.loop_max:
+            slow, t_slow = _time(lambda: _loop_median(y, k))
+            print(f"  rolling median  loop {t_slow * 1e3:9.1f} ms  skip list {t_fast * 1e3:7.1f} ms  "
+                  f"(x{t_slow / t_fast:5.0f}, identical={np.array_equal(slow, fast, equal_nan=True)})")
+        for method in DETREND_METHODS:
+            out, dt = _time(lambda: _detrend(y, method))
+            ok = np.isfinite(out)
+            depth = np.median(out[ok & ~in_transit]) - np.median(out[ok & in_transit])
+            scatter = 1.4826 * np.median(np.abs(np.diff(out[ok & ~in_transit]))) / np.sqrt(2)
+            print(f"  {method:<9s} {dt * 1e3:8.1f} ms  transit depth {depth * 1e2:5.2f}%  "
+                  f"out-of-transit scatter {scatter * 1e6:6.0f} ppm")
+
+
+if __name__ == "__main__":
+    main()
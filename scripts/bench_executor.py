@@ -0,0 +1,88 @@
+"""Latency of small calls while large /predict-file uploads keep the server busy.
+
+Run the API first (python scripts/run_server.py), then:
+
+    python scripts/bench_executor.py --bulk-clients 4 --bulk-rows 20000 --seconds 20
+
+Bulk clients upload the same CSV in a loop; meanwhile one client alternates
+/inference/health and a 5-row /inference/predict and records their latency.
+503s (bulk lane full) are counted, not retried.
+"""
+import argparse
+import sys
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from api.utils.io import read_table, normalize_schema
+
+
+def _bulk_csv(rows: int) -> bytes:
+    df = pd.read_csv(REPO_ROOT / "data/sources/kepler.csv", comment="#", low_memory=False)
+    reps = -(-rows // len(df))
+    return pd.concat([df] * reps, ignore_index=True).head(rows).to_csv(index=False).encode()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--bulk-clients", type=int, default=4)
+    ap.add_argument("--bulk-rows", type=int, default=20_000)
+    ap.add_argument("--seconds", type=float, default=20.0)
+    args = ap.parse_args()
+
+    payload = _bulk_csv(args.bulk_rows)
+    norm = normalize_schema(read_table(REPO_ROOT / "data/sources/kepler.csv"), "kepler").head(5)
+    small = {"rows": norm.astype(object).where(norm.notna(), None).to_dict(orient="records"), "mission": "kepler"}
+
+    stop = threading.Event()
+    bulk = {"ok": 0, "503": 0, "other": 0}
+    lock = threading.Lock()
+
+    def bulk_client(i):
+        with httpx.Client(base_url=args.url, timeout=600) as c:
+            while not stop.is_set():
+                # distinct bytes per request so the upload cache cannot answer
+                body = payload + f"\n# {i} {time.perf_counter_ns()}\n".encode()
+                r = c.post("/inference/predict-file?mission=kepler", files={"file": ("bulk.csv", body)})
+                with lock:
+                    key = "ok" if r.status_code == 200 else "503" if r.status_code == 503 else "other"
+                    bulk[key] += 1
+                if r.status_code == 503:
+                    time.sleep(float(r.headers.get("retry-after", "1")))
+
+    threads = [threading.Thread(target=bulk_client, args=(i,), daemon=True) for i in range(args.bulk_clients)]
+    for t in threads:
+        t.start()
+    time.sleep(1.0)  # let the bulk uploads get going
+
+    lat = {"health": [], "predict": []}
+    with httpx.Client(base_url=args.url, timeout=600) as c:
+        deadline = time.time() + args.seconds
+        while time.time() < deadline:
+            t = time.perf_counter()
+            c.get("/inference/health").raise_for_status()
+            lat["health"].append(time.perf_counter() - t)
+            t = time.perf_counter()
+            c.post("/inference/predict", json=small).raise_for_status()
+            lat["predict"].append(time.perf_counter() - t)
+    stop.set()
+    for t in threads:
+        t.join(timeout=600)
+
+    print(f"bulk uploads: {bulk['ok']} ok, {bulk['503']} rejected (503), {bulk['other']} other")
+    for name, xs in lat.items():
+        ms = np.asarray(xs) * 1e3
+        print(f"{name:8s} n={len(ms):4d}  p50 {np.percentile(ms, 50):8.1f} ms  p99 {np.percentile(ms, 99):8.1f} ms"
+              f"  max {ms.max():8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
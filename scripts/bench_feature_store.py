@@ -0,0 +1,93 @@
+"""Parquet decode vs. memory-mapped feature store: open time and memory across worker processes.
+
+    python scripts/bench_feature_store.py --rows 1000000 --cols 40 --workers 4
+
+Each worker opens the matrix, touches every value (a column sum) and reports its
+RSS and PSS from /proc/self/smaps_rollup; PSS splits shared pages between the
+processes mapping them, so its sum is the real footprint.
+"""
+import argparse
+import multiprocessing as mp
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+import pandas as pd
+
+from api.utils.feature_store import open_features, write_features
+
+
+def _mem_mb():
+    out = {}
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    out[key] = int(rest.split()[0]) / 1024
+    except OSError:
+        pass
+    return out.get("Rss", float("nan")), out.get("Pss", float("nan"))
+
+
+def _worker(kind, stem, start, results):
+    start.wait()
+    base_rss, base_pss = _mem_mb()
+    t = time.perf_counter()
+    if kind == "parquet":
+        X = pd.read_parquet(f"{stem}.parquet").to_numpy()
+    else:
+        X = open_features(stem).values
+    t_open = time.perf_counter() - t
+    total = float(np.asarray(X.sum(axis=0), dtype=np.float64).sum())
+    t_all = time.perf_counter() - t
+    rss, pss = _mem_mb()
+    results.put((t_open, t_all, rss - base_rss, pss - base_pss, total))
+
+
+def _run(kind, stem, workers):
+    ctx = mp.get_context("fork")
+    start, results = ctx.Barrier(workers + 1), ctx.Queue()
+    procs = [ctx.Process(target=_worker, args=(kind, stem, start, results)) for _ in range(workers)]
+    for p in procs:
+        p.start()
+    start.wait()
+    # collect while the workers are alive so shared pages are still counted once per mapper
+    rows = [results.get() for _ in procs]
+    for p in procs:
+        p.join()
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=1_000_000)
+    ap.add_argument("--cols", type=int, default=40)
+    ap.add_argument("--workers", type=int, default=4)
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame(rng.standard_normal((args.rows, args.cols)).astype(np.float32),
+                      columns=[f"f{i}" for i in range(args.cols)])
+    with tempfile.TemporaryDirectory() as tmp:
+        stem = Path(tmp) / "X_train"
+        df.to_parquet(f"{stem}.parquet")
+        write_features(stem, df)
+        del df
+        for kind in ("parquet", "mmap"):
+            rows = _run(kind, stem, args.workers)
+            t_open = max(r[0] for r in rows)
+            t_all = max(r[1] for r in rows)
+            rss = sum(r[2] for r in rows)
+            pss = sum(r[3] for r in rows)
+            print(f"{kind:8s} workers={args.workers}  open {t_open * 1e3:8.1f} ms  open+scan {t_all * 1e3:8.1f} ms  "
+                  f"sum RSS +{rss:7.1f} MB  sum PSS +{pss:7.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""FITS light-curve reading: column-selective memmap reader (api.utils.fits_io) vs. the old Table -> DataFrame path.
+
+Writes TESS-like SPOC files (a 20-column LIGHTCURVE table with QUALITY flags
+plus an APERTURE image) to a temporary directory, then for each size reports
+the time and peak Python allocation (tracemalloc; memory-mapped pages are not
+counted, they are the page cache's) of turning one file into a time/flux
+curve, and checks both give the same samples. Finally stitches ``--sectors``
+files into one curve.
+
+    python scripts/bench_fits_reader.py --rows 20000 1000000 --sectors 13
+"""
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+
+from api.services import curves
+
+
+def _write_sector(path: Path, sector: int, rows: int, seed: int) -> None:
+    from astropy.io import fits
+
+    rng = np.random.default_rng(seed)
+    t = 1325.3 + 27.4 * (sector - 1) + np.arange(rows) * 2 / 1440.0
+    flux = (12000 + 1000 * sector) * (1 + rng.normal(0, 8e-4, rows))
+    flux[rng.random(rows) < 0.01] = np.nan
+    quality = np.zeros(rows, dtype=np.int32)
+    bad = rng.random(rows) < 0.03
+    quality[bad] = rng.choice([1, 4, 32, 128, 1024, 2048], bad.sum())
+
+    cols = [fits.Column(name="TIME", format="D", array=t),
+            fits.Column(name="TIMECORR", format="E", array=np.zeros(rows)),
+            fits.Column(name="CADENCENO", format="J", array=np.arange(rows))]
+    cols += [fits.Column(name=c, format="E", array=flux * rng.random())
+             for c in ("SAP_FLUX", "SAP_FLUX_ERR", "SAP_BKG", "SAP_BKG_ERR")]
+    cols += [fits.Column(name="PDCSAP_FLUX", format="E", array=flux),
+             fits.Column(name="PDCSAP_FLUX_ERR", format="E", array=np.full(rows, 10.0)),
+             fits.Column(name="QUALITY", format="J", array=quality)]
+    cols += [fits.Column(name=c, format="D", array=rng.random(rows))
+             for c in ("PSF_CENTR1", "PSF_CENTR1_ERR", "PSF_CENTR2", "PSF_CENTR2_ERR", "MOM_CENTR1",
+                       "MOM_CENTR1_ERR", "MOM_CENTR2", "MOM_CENTR2_ERR", "POS_CORR1", "POS_CORR2")]
+    primary = fits.PrimaryHDU()
+    primary.header["SECTOR"] = sector
+    fits.HDUList([primary, fits.BinTableHDU.from_columns(cols, name="LIGHTCURVE"),
+                  fits.ImageHDU(np.ones((11, 11), dtype=np.int32), name="APERTURE")]).writeto(path, overwrite=True)
+
+
+def _old(path: Path):
+    # the previous curves._read_table + _lightcurve_frame
+    from astropy.io import fits
+    from astropy.table import Table
+
+    with fits.open(str(path)) as hdul:
+        h = next(h for h in hdul if getattr(h, "data", None) is not None)
+        df = Table(h.data).to_pandas()
+    return curves._lightcurve_frame(df, curves.TIME_COLUMNS, curves.FLUX_COLUMNS)
+
+
+def _measure(fn, reps: int):
+    tracemalloc.start()
+    out = fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    t = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return out, (time.perf_counter() - t) / reps, peak
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, nargs="*", default=[20000, 1000000])
+    ap.add_argument("--sectors", type=int, default=13)
+    args = ap.parse_args()
+    warnings.filterwarnings("ignore")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for rows in args.rows:
+            path = Path(tmp) / f"lc_{rows}.fits"
+            _write_sector(path, 1, rows, seed=rows)
+            reps = max(1, min(20, 2_000_000 // rows))
+            lc0, t0, m0 = _measure(lambda: _old(path), reps)
+            lc1, t1, m1 = _measure(lambda: curves.load_lightcurve(path, quality="none"), reps)
+            same = len(lc0) == len(lc1) and np.array_equal(lc0.to_numpy(), lc1.to_numpy())
+            n_good = len(curves.load_lightcurve(path))
+            print(f"rows={rows:>8d} ({path.stat().st_size / 1e6:6.1f} MB)  "
+                  f"old {t0 * 1e3:8.2f} ms {m0 / 1e6:7.1f} MB peak  "
+                  f"memmap {t1 * 1e3:8.2f} ms {m1 / 1e6:7.1f} MB peak  (x{t0 / t1:4.1f})  "
+                  f"same={same}  after QUALITY mask {n_good}/{len(lc1)}")
+
+        parts = []
+        for s in range(1, args.sectors + 1):
+            path = Path(tmp) / f"s{s:02d}.fits"
+            _write_sector(path, s, 19000, seed=s)
+            parts.append((path, None))
+        lc, t, m = _measure(lambda: curves.load_stitched(parts), 3)
+        print(f"stitched {args.sectors} sectors: {len(lc)} points, {t * 1e3:.1f} ms, {m / 1e6:.1f} MB peak, "
+              f"median flux {lc['flux'].median():.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Python-loop vs. vectorized gap filling (api.services.curves._nanfix_1d).
+
+Checks both give identical output on curves with random gaps, leading and
+trailing gaps, infinities and no finite samples at all, then times them.
+
+    python scripts/bench_nanfix.py --sizes 1024 2048 100000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+
+from api.services.curves import _nanfix_1d
+
+
+def _loop(x: np.ndarray, fill_value: float = 0.5) -> np.ndarray:
+    # the previous implementation
+    x = x.copy()
+    n = len(x)
+    for i in range(1, n):
+        if not np.isfinite(x[i]) and np.isfinite(x[i - 1]):
+            x[i] = x[i - 1]
+    for i in range(n - 2, -1, -1):
+        if not np.isfinite(x[i]) and np.isfinite(x[i + 1]):
+            x[i] = x[i + 1]
+    x[~np.isfinite(x)] = fill_value
+    return x
+
+
+def _curve(n: int, rng: np.random.Generator, gap_frac: float) -> np.ndarray:
+    y = rng.random(n)
+    y[rng.random(n) < gap_frac] = np.nan
+    if n > 20:
+        y[: rng.integers(0, n // 10)] = np.nan      # interp(left=nan)
+        y[n - rng.integers(0, n // 10):] = np.nan   # interp(right=nan)
+        y[rng.integers(0, n, 3)] = np.inf
+    return y
+
+
+def _time(fn, reps):
+    t = time.perf_counter()
+    for _ in range(reps):
+        out = fn()
+    return out, (time.perf_counter() - t) / reps
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1024, 2048, 100_000])
+    ap.add_argument("--gaps", type=float, default=0.1, help="fraction of samples set to NaN")
+    args = ap.parse_args()
+    rng = np.random.default_rng(0)
+
+    cases = [np.array([]), np.full(7, np.nan), np.array([np.inf, 1.0, np.nan, -np.inf, 2.0, np.nan])]
+    cases += [_curve(n, rng, g) for n in (1, 2, 50, 1000) for g in (0.0, 0.1, 0.9)]
+    assert all(np.array_equal(_loop(c, 0.25), _nanfix_1d(c, 0.25), equal_nan=True) for c in cases)
+    print(f"{len(cases)} edge cases identical")
+
+    for n in args.sizes:
+        y = _curve(n, rng, args.gaps)
+        reps = max(1, min(200, 200_000 // n))
+        a, t_loop = _time(lambda: _loop(y), max(1, reps // 20))
+        b, t_vec = _time(lambda: _nanfix_1d(y), reps)
+        print(f"n={n:>8d}  loop {t_loop * 1e3:9.3f} ms  vectorized {t_vec * 1e3:7.3f} ms  "
+              f"(x{t_loop / t_vec:6.1f}, same={np.array_equal(a, b)})")
+
+
+if __name__ == "__main__":
+    main()
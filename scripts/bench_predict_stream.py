@@ -0,0 +1,89 @@
+"""Peak server RSS of /inference/predict-file, buffered vs. ?stream=true.
+
+Builds a large catalog by repeating data/sources/<mission>.csv, starts a fresh
+uvicorn server per mode (VmHWM is a high-water mark) and uploads the file.
+
+    python scripts/bench_predict_stream.py --mission kepler --repeat 10
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def _build_catalog(mission: str, repeat: int, out: Path) -> int:
+    src = (REPO_ROOT / "data" / "sources" / f"{mission}.csv").read_text(encoding="utf-8")
+    lines = [ln for ln in src.splitlines(keepends=True) if not ln.startswith("#")]
+    header, body = lines[0], lines[1:]
+    with open(out, "w", encoding="utf-8") as f:
+        f.write(header)
+        for _ in range(repeat):
+            f.writelines(body)
+    return len(body) * repeat
+
+
+def _peak_rss_mb(pid: int) -> float:
+    for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+        if line.startswith("VmHWM:"):
+            return int(line.split()[1]) / 1024
+    return float("nan")
+
+
+def _run(mode: str, path: Path, mission: str, port: int) -> None:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api.utils.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=REPO_ROOT, env=dict(os.environ), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base = f"http://127.0.0.1:{port}"
+    try:
+        for _ in range(120):
+            try:
+                if httpx.get(f"{base}/inference/ready", timeout=1).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            time.sleep(0.5)
+        idle = _peak_rss_mb(proc.pid)
+        params = {"mission": mission}
+        if mode == "stream":
+            params["stream"] = "true"
+        t0 = time.perf_counter()
+        n = 0
+        with open(path, "rb") as fh, httpx.Client(timeout=None) as client:
+            with client.stream("POST", f"{base}/inference/predict-file", params=params,
+                               files={"file": (path.name, fh, "text/csv")}) as r:
+                r.raise_for_status()
+                for chunk in r.iter_bytes():
+                    n += len(chunk)
+        dt = time.perf_counter() - t0
+        print(f"{mode:8s} {dt:6.2f}s  response={n / 1e6:6.1f} MB  "
+              f"peak RSS={_peak_rss_mb(proc.pid):7.1f} MB (idle {idle:.1f} MB)")
+    finally:
+        proc.terminate()
+        proc.wait()
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--mission", default="kepler")
+    ap.add_argument("--repeat", type=int, default=10)
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / f"{args.mission}_x{args.repeat}.csv"
+        rows = _build_catalog(args.mission, args.repeat, path)
+        print(f"{path.name}: {rows} rows, {path.stat().st_size / 1e6:.1f} MB")
+        for mode in ("buffered", "stream"):
+            _run(mode, path, args.mission, args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Row-wise vs. column-wise system_key / row_id construction from data/data_ingest.py.
+
+    python scripts/bench_row_id.py --sizes 10000 100000 1000000
+"""
+import argparse
+import hashlib
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+import pandas as pd
+
+from data.data_ingest import round_period, round_periods, hash_keys
+
+
+def _frame(n: int, rng: np.random.Generator) -> pd.DataFrame:
+    ids = rng.integers(1, 10_000, n)
+    period = rng.random(n) * 500
+    period[rng.random(n) < 0.03] = np.nan
+    object_id = pd.Series([f"K{i:05d}.{j:02d}" for i, j in zip(ids, rng.integers(1, 8, n))], dtype=object)
+    object_id[rng.random(n) < 0.02] = None
+    return pd.DataFrame({"object_id": object_id, "period_days": period, "label_raw": "CANDIDATE"})
+
+
+def _old(df: pd.DataFrame, mission: str):
+    keys = df.apply(
+        lambda r: f"{mission}|{str(r.get('object_id'))}|{round_period(r.get('period_days'))}",
+        axis=1
+    )
+    return keys, keys.apply(lambda s: hashlib.sha256(s.encode("utf-8")).hexdigest())
+
+
+def _new(df: pd.DataFrame, mission: str, algo: str):
+    keys = f"{mission}|" + df["object_id"].astype(object).astype(str) + "|" + round_periods(df["period_days"]).astype(str)
+    return keys, hash_keys(keys, algo)
+
+
+def _time(fn):
+    t = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000])
+    args = ap.parse_args()
+    rng = np.random.default_rng(0)
+
+    for n in args.sizes:
+        df = _frame(n, rng)
+        (k_old, id_old), t_old = _time(lambda: _old(df, "kepler"))
+        (k_new, id_new), t_sha = _time(lambda: _new(df, "kepler", "sha256"))
+        (_, id_fast), t_fast = _time(lambda: _new(df, "kepler", "fast"))
+        same = k_old.equals(k_new) and id_old.equals(id_new)
+        print(f"n={n:>8d}  apply {t_old * 1e3:8.1f} ms  |  sha256 {t_sha * 1e3:7.1f} ms (x{t_old / t_sha:4.1f}, same={same})"
+              f"  |  fast {t_fast * 1e3:7.1f} ms (x{t_old / t_fast:4.1f}, unique={id_fast.nunique() == id_new.nunique()})")
+
+
+if __name__ == "__main__":
+    main()
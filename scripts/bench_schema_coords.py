@@ -0,0 +1,64 @@
+"""Per-row vs. vectorized sexagesimal / EPIC parsing used by data/schema normalization.
+
+    python scripts/bench_schema_coords.py --sizes 1000 10000 100000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+import pandas as pd
+
+from data.schema._coords import _sexagesimal_to_deg, _extract_epic, sexagesimal_to_deg, extract_epic
+
+
+def _inputs(n: int, rng: np.random.Generator):
+    h, m, s = rng.integers(0, 24, n), rng.integers(0, 60, n), rng.random(n) * 60
+    sign = rng.choice(["+", "-"], n)
+    ra = pd.Series([f"{a:02d}h{b:02d}m{c:05.2f}s" for a, b, c in zip(h, m, s)], dtype=object)
+    dec = pd.Series([f"{g}{a:02d}d{b:02d}m{c:05.2f}s" for g, a, b, c in zip(sign, h, m, s)], dtype=object)
+    ids = rng.integers(200_000_000, 250_000_000, n)
+    names = pd.Series([f"EPIC {i} b" if i % 3 else f"K2-{i % 1000} b" for i in ids], dtype=object)
+    ra[rng.random(n) < 0.05] = np.nan
+    return ra, dec, names
+
+
+def _time(fn):
+    t = time.perf_counter()
+    out = fn()
+    return out, time.perf_counter() - t
+
+
+def _same(a: pd.Series, b: pd.Series) -> bool:
+    return a.equals(b) or np.array_equal(a.to_numpy(), b.to_numpy(), equal_nan=True)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    args = ap.parse_args()
+    rng = np.random.default_rng(0)
+
+    for n in args.sizes:
+        ra, dec, names = _inputs(n, rng)
+        rows = []
+        for label, old, new in (
+            ("ra", lambda: ra.apply(lambda x: _sexagesimal_to_deg(x, is_ra=True)),
+                   lambda: sexagesimal_to_deg(ra, is_ra=True)),
+            ("dec", lambda: dec.apply(lambda x: _sexagesimal_to_deg(x, is_ra=False)),
+                    lambda: sexagesimal_to_deg(dec, is_ra=False)),
+            ("epic", lambda: names.apply(_extract_epic),
+                     lambda: extract_epic(names)),
+        ):
+            a, t_old = _time(old)
+            b, t_new = _time(new)
+            rows.append(f"{label} {t_old * 1e3:8.1f} -> {t_new * 1e3:7.1f} ms (x{t_old / t_new:4.1f}, same={_same(a, b)})")
+        print(f"n={n:>7d}  " + "  |  ".join(rows))
+
+
+if __name__ == "__main__":
+    main()
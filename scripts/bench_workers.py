@@ -0,0 +1,111 @@
+"""/inference/predict throughput and memory for 1..N pre-forked workers.
+
+Starts scripts/run_server.py --workers W for every W, drives it with concurrent
+clients and reports requests/s, scaling vs. one worker, and the RSS/PSS of every
+worker (PSS counts shared pages once per sharer, so a shared model shows up as a
+small PSS next to a large RSS).
+
+    python scripts/bench_workers.py --workers 1 2 4 --clients 16 --requests 40
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import httpx
+import numpy as np
+
+from api.utils.io import read_table, normalize_schema
+
+
+def _memory_kb(pid: int):
+    """(rss, pss) in kB from /proc/<pid>/smaps_rollup; (None, None) where unavailable."""
+    out = {}
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            for line in f:
+                key, _, rest = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    out[key] = int(rest.split()[0])
+    except OSError:
+        pass
+    return out.get("Rss"), out.get("Pss")
+
+
+def _children(pid: int):
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def _wait_ready(url: str, timeout: float = 120.0) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(url + "/inference/health", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError(f"server at {url} did not become ready")
+
+
+def run(url: str, payloads, clients: int):
+    def call(body):
+        with httpx.Client(base_url=url, timeout=120) as c:
+            r = c.post("/inference/predict", json=body)
+            r.raise_for_status()
+
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        list(pool.map(call, payloads[:clients]))  # warm every worker
+        t0 = time.perf_counter()
+        list(pool.map(call, payloads))
+        return len(payloads) / (time.perf_counter() - t0)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, os.cpu_count() or 1])
+    ap.add_argument("--clients", type=int, default=16)
+    ap.add_argument("--requests", type=int, default=40, help="requests per client")
+    ap.add_argument("--rows", type=int, default=50, help="rows per request")
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+
+    df = normalize_schema(read_table(REPO_ROOT / "data/sources/kepler.csv"), "kepler")
+    rows = df.head(args.rows).astype(object).where(df.head(args.rows).notna(), None).to_dict(orient="records")
+    payloads = [{"rows": rows, "mission": "kepler"}] * (args.clients * args.requests)
+    url = f"http://127.0.0.1:{args.port}"
+    print(f"cpus={os.cpu_count()}  clients={args.clients}  requests={len(payloads)}  rows/request={args.rows}")
+
+    base = None
+    for w in sorted(set(args.workers)):
+        env = dict(os.environ, WORKERS=str(w), LOG_LEVEL="warning")
+        proc = subprocess.Popen([sys.executable, str(REPO_ROOT / "scripts/run_server.py"), "--port", str(args.port)],
+                                env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            _wait_ready(url)
+            rps = run(url, payloads, args.clients)
+            base = base or rps
+            pids = _children(proc.pid) or [proc.pid]
+            mem = [_memory_kb(p) for p in pids]
+            rss = [m[0] for m in mem if m[0] is not None]
+            pss = [m[1] for m in mem if m[1] is not None]
+            print(f"workers={w:>2d}  {rps:8.1f} req/s  x{rps / base:4.2f}"
+                  + (f"  | per worker RSS {np.mean(rss) / 1024:6.1f} MB  PSS {np.mean(pss) / 1024:6.1f} MB" if pss else ""))
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=60)
+
+
+if __name__ == "__main__":
+    main()
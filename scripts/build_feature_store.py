@@ -0,0 +1,52 @@
+"""Convert X_*/y_* Parquet splits in a models directory to the memory-mapped feature store.
+
+    python scripts/build_feature_store.py --models-dir models [--dtype float64]
+
+--dtype applies to X_train; X_val and X_test are scored by validation and
+evaluation, so they are always written as float64.
+
+Writes X_<split>.npy/.json and y_<split>.npy/.json next to the Parquet files,
+which stay in place; registry validation picks the .npy up automatically.
+"""
+import argparse
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np
+import pandas as pd
+
+from api.utils.constants import FEATURE_STORE_DTYPE, MODELS_DIR
+from api.utils.feature_store import open_features, write_features
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--models-dir", type=Path, default=MODELS_DIR)
+    ap.add_argument("--dtype", default=FEATURE_STORE_DTYPE, help="X_train dtype (X_val/X_test are float64, y int64)")
+    args = ap.parse_args()
+
+    found = False
+    for split in ("train", "val", "test"):
+        x_dtype = args.dtype if split == "train" else np.float64
+        for prefix, dtype in (("X", x_dtype), ("y", np.int64)):
+            src = args.models_dir / f"{prefix}_{split}.parquet"
+            if not src.exists():
+                continue
+            found = True
+            df = pd.read_parquet(src)
+            write_features(src, df, dtype=dtype)
+            fm = open_features(src)
+            ref = df.to_numpy(dtype=np.float64)
+            # float32 keeps ~7 significant digits: large ids (tic_id) round, features barely move
+            err = float(np.nanmax(np.abs(fm.values - ref) / np.maximum(np.abs(ref), 1.0))) if len(fm) else 0.0
+            print(f"{src.name:20s} -> {src.with_suffix('.npy').name:14s} {fm.values.dtype}{fm.values.shape}  "
+                  f"max rel diff={err:.2g}")
+    if not found:
+        sys.exit(f"No X_*/y_* Parquet splits in {args.models_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Pack models/tab_xgb.pkl into models/tab_packed.npz for TAB_BACKEND=auto, check and time it.
+
+    python scripts/compile_forest.py                 # pack + fold the scaler, verify on X_val, print timings
+    python scripts/compile_forest.py --no-fold --sizes 1 64 1000 20000
+
+By default the StandardScaler in preprocessor.pkl is folded into the split
+thresholds, so the packed forest scores raw features and requests skip the
+transform pass (the server does the same unless TAB_FOLD_SCALER=0).
+
+The server packs the forest in memory when the file is missing or was built
+from different tab_xgb.pkl / preprocessor.pkl files, so running this only
+saves that step at load.
+"""
+import argparse
+import json
+import sys
+import time
+import warnings
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import joblib
+import numpy as np
+
+from api.services.forest import PackedForest, fold_scaler, foldable, pack_forest, source_id
+from api.utils import feature_store
+
+
+def _time(fn, reps):
+    t = time.perf_counter()
+    for _ in range(reps):
+        out = fn()
+    return out, (time.perf_counter() - t) / reps
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--models-dir", default=str(REPO_ROOT / "models"))
+    ap.add_argument("--out", default=None, help="default: <models-dir>/tab_packed.npz")
+    ap.add_argument("--no-fold", action="store_true", help="keep thresholds in scaled units")
+    ap.add_argument("--sizes", type=int, nargs="*", default=[1, 16, 256, 2000, 20000])
+    args = ap.parse_args()
+    warnings.filterwarnings("ignore")
+
+    d = Path(args.models_dir)
+    model_path = d / "tab_xgb.pkl"
+    out = Path(args.out) if args.out else d / "tab_packed.npz"
+
+    model = joblib.load(model_path)
+    pre = joblib.load(d / "preprocessor.pkl")
+    fold = not args.no_fold and foldable(pre)
+    t = time.perf_counter()
+    if fold:
+        packed = fold_scaler(pack_forest(model, source=source_id(model_path, d / "preprocessor.pkl")), pre)
+    else:
+        packed = pack_forest(model, source=source_id(model_path))
+    packed.save(out)
+    print(f"{type(model).__name__}: {packed.n_trees} trees, {len(packed.nodes)} nodes, depth {packed.depth}, "
+          f"scaler folded: {packed.folded} -> {out} ({out.stat().st_size / 1e6:.2f} MB, {time.perf_counter() - t:.2f}s)")
+    packed = PackedForest.load(out)
+
+    if not (feature_store.exists(d / "X_val") or (d / "X_val.parquet").exists()):
+        print("no X_val split; skipping verification")
+        return
+    features = json.loads((d / "feature_list.json").read_text(encoding="utf-8"))
+    raw = feature_store.read_matrix(d / "X_val", dtype=np.float64)[features].astype(np.float64)
+    diff = np.abs(packed.predict_proba(raw.to_numpy() if fold else pre.transform(raw))
+                  - model.predict_proba(pre.transform(raw))).max()
+    print(f"X_val: {len(raw)} rows, max |packed - sklearn| = {diff:.3g}")
+
+    # timings include the transform each path needs (none for a folded forest)
+    rng = np.random.default_rng(0)
+    for n in args.sizes:
+        Xn = raw.iloc[rng.integers(0, len(raw), n)]
+        reps = max(1, min(50, 2000 // n))
+        p0, t0 = _time(lambda: model.predict_proba(pre.transform(Xn)), reps)
+        if fold:
+            p1, t1 = _time(lambda: packed.predict_proba(Xn.to_numpy()), reps)
+        else:
+            p1, t1 = _time(lambda: packed.predict_proba(pre.transform(Xn)), reps)
+        print(f"n={n:>6d}  sklearn {t0 * 1e3:8.2f} ms  packed {t1 * 1e3:8.2f} ms  (x{t0 / t1:5.1f})  "
+              f"max diff {np.abs(p1 - p0).max():.1e}")
+
+
+if __name__ == "__main__":
+    main()
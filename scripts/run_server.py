@@ -1,3 +1,4 @@
+import argparse
 import sys
 import os
 from pathlib import Path
@@ -8,19 +9,39 @@ sys.path.insert(0, str(REPO_ROOT))
 if __name__ == "__main__":
     import uvicorn
 
+    ap = argparse.ArgumentParser(description="Run the StarHarbor API")
+    ap.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    ap.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    ap.add_argument("--workers", type=int, default=int(os.getenv("WORKERS", "1") or 1),
+                    help="Worker processes; >1 preloads the model once and forks them (default $WORKERS or 1)")
+    ap.add_argument("--log-level", default=os.getenv("LOG_LEVEL", "info"))
+    args = ap.parse_args()
+
     os.environ.setdefault("DATA_DIR", str(REPO_ROOT / "data"))
     os.environ.setdefault("MODEL_DIR", str(REPO_ROOT / "models"))
-    
+
     print(f"Starting StarHarbor API server...")
     print(f"Repository root: {REPO_ROOT}")
     print(f"Data directory: {os.environ['DATA_DIR']}")
     print(f"Model directory: {os.environ['MODEL_DIR']}")
-    print(f"API docs available at: http://localhost:8000/docs")
-    
-    uvicorn.run(
-        "api.utils.main:app",  
-        host="0.0.0.0",
-        port=8000,
-        reload=False,  
-        log_level="info"
-    )
\ No newline at end of file
+    print(f"Workers: {args.workers}")
+    print(f"API docs available at: http://localhost:{args.port}/docs")
+
+    if args.workers > 1:
+        from api.utils.prefork import PreforkServer
+
+        PreforkServer(
+            "api.utils.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            log_level=args.log_level,
+        ).run()
+    else:
+        uvicorn.run(
+            "api.utils.main:app",
+            host=args.host,
+            port=args.port,
+            reload=False,
+            log_level=args.log_level
+        )
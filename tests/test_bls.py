@@ -0,0 +1,39 @@
+import numpy as np
+
+from api.services.bls import grid_oversample, period_grid, search_transit
+
+
+def _curve(days, cadence_min, period, t0, duration_hours, depth, noise=5e-4, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(0.0, days, cadence_min / 1440.0)
+    y = 1.0 + rng.normal(0.0, noise, len(t))
+    phase = ((t - t0) / period + 0.5) % 1.0 - 0.5
+    y[np.abs(phase) * period * 24.0 < duration_hours / 2.0] -= depth
+    return t, y
+
+
+def test_recovers_period_on_sector():
+    t, y = _curve(27.0, 10, 3.7, 1.2, 3.0, 2e-3)
+    found = search_transit(t, y)
+    assert found is not None
+    assert abs(found.period_days - 3.7) / 3.7 < 0.01
+    assert found.snr > 7
+    assert found.oversample >= 2.9
+
+
+def test_recovers_period_on_long_baseline():
+    # ~4 years at 30-minute cadence: the full grid would exceed max_periods, so it is capped
+    days, period, duration = 1400.0, 11.3, 5.0
+    t, y = _curve(days, 30, period, 4.1, duration, 2e-3, seed=1)
+    found = search_transit(t, y, min_period=5.0, max_period=30.0, durations_hours=(4.0, 5.0, 6.0))
+    assert found is not None
+    assert abs(found.period_days - period) / period < 0.001
+    assert found.snr > 7
+
+
+def test_grid_reports_capped_oversampling():
+    periods = period_grid(1400.0, 0.5, 700.0, 1.0 / 24.0, oversample=3.0, max_periods=20000)
+    assert len(periods) == 20000
+    assert grid_oversample(periods, 1400.0, 1.0 / 24.0) < 1.0
+    periods = period_grid(27.0, 0.5, 13.5, 1.0 / 24.0, oversample=3.0)
+    assert abs(grid_oversample(periods, 27.0, 1.0 / 24.0) - 3.0) < 0.01
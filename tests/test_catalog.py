@@ -0,0 +1,74 @@
+import shutil
+import subprocess
+import sys
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from conftest import REPO_ROOT
+from data import catalog
+
+MISSIONS = ("kepler", "k2", "tess")
+
+
+def _ingest(workdir, catalog_dir, *extra):
+    cmd = [sys.executable, str(REPO_ROOT / "data" / "data_ingest.py"),
+           "--missions", *MISSIONS, "--sources", "auto",
+           "--outdir-raw", str(workdir / "raw"), "--outdir-processed", str(workdir / "processed"),
+           "--catalog-dir", str(catalog_dir), *extra]
+    subprocess.run(cmd, cwd=workdir, check=True, capture_output=True)
+
+
+@pytest.fixture
+def workdir(tmp_path):
+    sources = REPO_ROOT / "data" / "sources"
+    if not all((sources / f"{m}.csv").exists() for m in MISSIONS):
+        pytest.skip("mission source files not available")
+    shutil.copytree(sources, tmp_path / "data" / "sources")
+    return tmp_path
+
+
+def test_incremental_ingest_of_all_missions_reads_back(workdir):
+    cat = workdir / "catalog"
+    _ingest(workdir, cat, "--incremental", "yes")
+
+    parts = catalog.all_part_files(str(cat))
+    assert {p.split("mission=")[1].split("/")[0] for p in parts} == set(MISSIONS)
+    schemas = [pq.read_schema(p) for p in parts]
+    for name in catalog.TEXT_COLUMNS:
+        assert {str(s.field(name).type) for s in schemas if name in s.names} <= {"string"}
+    pa.unify_schemas(schemas, promote_options="permissive")
+
+    df = catalog.read(str(cat))
+    assert set(df["mission"]) == set(MISSIONS)
+    assert len(catalog.read(str(cat), missions=["k2"], latest_only=True)) == (df["mission"] == "k2").sum()
+
+
+def test_plain_ingest_with_catalog_reads_back(workdir):
+    cat = workdir / "catalog"
+    _ingest(workdir, cat, "--catalog", "yes")
+    assert set(catalog.read(str(cat))["mission"]) == set(MISSIONS)
+
+
+def test_incremental_after_plain_run_fills_the_catalog(workdir):
+    cat = workdir / "catalog"
+    _ingest(workdir, cat)  # plain run: metadata with raw checksums, no catalog
+    _ingest(workdir, cat, "--incremental", "yes")
+    assert set(catalog.read(str(cat))["mission"]) == set(MISSIONS)
+    # nothing changed since: the next incremental run appends nothing
+    n_parts = len(catalog.all_part_files(str(cat)))
+    _ingest(workdir, cat, "--incremental", "yes")
+    assert len(catalog.all_part_files(str(cat))) == n_parts
+
+
+def test_reverted_row_is_appended_again(tmp_path):
+    root = str(tmp_path / "catalog")
+    pc = pd.DataFrame({"row_id": ["a", "b"], "label_raw": ["PC", "PC"]})
+    fp = pd.DataFrame({"row_id": ["a", "b"], "label_raw": ["FP", "PC"]})
+    for i, df in enumerate((pc, fp, pc)):
+        catalog.append(catalog.new_rows(df, root, "tess"), root, "tess", f"2025010{i}")
+    latest = catalog.read(root, latest_only=True).set_index("row_id")["label_raw"]
+    assert latest.to_dict() == {"a": "PC", "b": "PC"}
+    assert catalog.new_rows(pc, root, "tess").empty
@@ -0,0 +1,29 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data.labels import disposition_label, labels_3way
+
+
+@pytest.mark.parametrize("value, label", [
+    # TOI / TFOPWG
+    ("CP", "confirmed"),
+    ("KP", "confirmed"),
+    ("PC", "candidate"),
+    ("FP", "fp"),
+    # KOI / K2
+    ("CONFIRMED", "confirmed"),
+    ("CANDIDATE", "candidate"),
+    ("FALSE POSITIVE", "fp"),
+    (" cp ", "confirmed"),
+    (None, "unknown"),
+    (np.nan, "unknown"),
+    ("???", "unknown"),
+])
+def test_disposition_label(value, label):
+    assert disposition_label(value) == label
+
+
+def test_labels_3way_matches_scalar_rule():
+    values = pd.Series(["CP", "KP", "PC", "FP", None, "CONFIRMED", "CP"])
+    assert labels_3way(values).tolist() == [disposition_label(v) for v in values]
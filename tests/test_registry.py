@@ -0,0 +1,50 @@
+import json
+import shutil
+
+import joblib
+import pytest
+
+from api.services.registry import ModelRegistry
+from api.utils.constants import MODELS_DIR
+
+TABULAR = ("preprocessor.pkl", "feature_list.json", "target_map.json", "tab_xgb.pkl")
+
+
+@pytest.fixture
+def models_dir(tmp_path):
+    if not all((MODELS_DIR / name).exists() for name in TABULAR):
+        pytest.skip("tabular model artifacts not available")
+    for name in TABULAR:
+        shutil.copy(MODELS_DIR / name, tmp_path / name)
+    return tmp_path
+
+
+def _loaded(models_dir):
+    registry = ModelRegistry()
+    registry.reload(models_dir, validate=False)
+    return registry, registry.get().version
+
+
+def test_reload_unchanged_without_changes(models_dir):
+    registry, version = _loaded(models_dir)
+    registry.reload(models_dir, validate=False)
+    assert registry.status()["last_reload"]["status"] == "unchanged"
+    assert registry.get().version == version
+
+
+def test_reload_swaps_on_params_change(models_dir):
+    registry, version = _loaded(models_dir)
+    (models_dir / "params.json").write_text(json.dumps({"alpha": 0.7}), encoding="utf-8")
+    registry.reload(models_dir, validate=False)
+    assert registry.status()["last_reload"]["status"] == "swapped"
+    assert registry.get().version != version
+    assert registry.get().params["alpha"] == 0.7
+
+
+def test_reload_swaps_on_fuse_change(models_dir):
+    registry, version = _loaded(models_dir)
+    joblib.dump({"weights": [0.5, 0.5]}, models_dir / "fuse.joblib")
+    registry.reload(models_dir, validate=False)
+    assert registry.status()["last_reload"]["status"] == "swapped"
+    assert registry.get().version != version
+    assert registry.get().fuse == {"weights": [0.5, 0.5]}